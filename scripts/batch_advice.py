@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+"""send a JSONL file of queries to /travel-assistant/batch and print NDJSON results.
+
+    python scripts/batch_advice.py queries.jsonl --concurrency 16 > results.ndjson
+    cat queries.jsonl | python scripts/batch_advice.py -
+
+each input line is {"query": "...", "id": ...} or a bare JSON string.
+results are printed as they complete, one JSON object per line.
+"""
+
+import argparse
+import sys
+
+import httpx
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", help="JSONL file of queries, or - for stdin")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/travel-assistant/batch")
+    parser.add_argument("--concurrency", type=int, default=None)
+    args = parser.parse_args()
+
+    src = sys.stdin.buffer if args.path == "-" else open(args.path, "rb")
+    with src:
+        body = src.read()
+
+    params = {"concurrency": args.concurrency} if args.concurrency else None
+    with httpx.stream(
+        "POST",
+        args.url,
+        content=body,
+        params=params,
+        headers={"Content-Type": "application/x-ndjson"},
+        timeout=None,
+    ) as resp:
+        resp.raise_for_status()
+        for line in resp.iter_lines():
+            if line:
+                print(line, flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+"""recall@k and per-query latency of each index type against exact Flat search.
+
+runs offline on the vectors already in data/*.faiss (no API calls): queries are
+stored vectors with a little noise added, ground truth is the exact
+inner-product top-k over the normalised vectors, as the stores search. --synthetic N adds a clustered random catalogue of N rows to see how
+the options scale past the seed data.
+
+    python scripts/bench_ann.py --k 10 --queries 200
+    python scripts/bench_ann.py --no-stores --synthetic 200000
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("OPENAI_PROJECT_ID", "bench")
+
+from travel_assistant.core.config import get_settings  # noqa: E402
+from travel_assistant.retrieval.ann import (  # noqa: E402
+    IndexSpec,
+    build_index,
+    factory_string,
+    search_params,
+)
+
+# (index type, query-time knob values to sweep)
+CONFIGS = [
+    ("flat", [None]),
+    ("ivf_flat", [1, 4, 16, 64]),
+    ("hnsw", [16, 64, 256]),
+    ("ivf_pq", [4, 16, 64]),
+]
+
+
+def _stored(name: str) -> np.ndarray | None:
+    path = get_settings().project_root / "data" / f"{name}.faiss"
+    if not path.exists():
+        return None
+    index = faiss.read_index(str(path))
+    return index.reconstruct_n(0, index.ntotal)
+
+
+def _synthetic(n: int, d: int, rng: np.random.Generator) -> np.ndarray:
+    centres = rng.standard_normal((max(1, n // 500), d)).astype(np.float32)
+    x = centres[rng.integers(0, len(centres), n)]
+    x += 0.3 * rng.standard_normal((n, d)).astype(np.float32)
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def _bench(label: str, xb: np.ndarray, k: int, n_queries: int, rng) -> None:
+    n, d = xb.shape
+    pick = rng.choice(n, size=min(n_queries, n), replace=False)
+    xq = xb[pick] + 0.5 / np.sqrt(d) * rng.standard_normal((len(pick), d)).astype(np.float32)
+    xq /= np.linalg.norm(xq, axis=1, keepdims=True)
+
+    exact = faiss.IndexFlatIP(d)
+    exact.add(xb)
+    _, truth = exact.search(xq, k)
+
+    print(f"\n{label}: {n} rows x {d} dims, {len(xq)} queries, recall@{k}")
+    print(f"  {'index':<22}{'knob':>10}{'recall':>9}{'p50 ms':>9}{'p99 ms':>9}"
+          f"{'build s':>9}{'MB':>8}")
+    for kind, knobs in CONFIGS:
+        spec = IndexSpec(kind=kind)
+        try:
+            started = time.perf_counter()
+            index = build_index(xb, spec)
+            build_s = time.perf_counter() - started
+        except Exception as e:  # e.g. too few rows to train PQ
+            print(f"  {kind:<22} skipped: {e}")
+            continue
+        size_mb = faiss.serialize_index(index).nbytes / 1e6
+        # single-threaded search: per-query latency, as a request would see it
+        threads = faiss.omp_get_max_threads()
+        faiss.omp_set_num_threads(1)
+        for knob in knobs:
+            params = search_params(index, nprobe=knob, ef_search=knob)
+            times, found = [], []
+            for q in xq:
+                t = time.perf_counter()
+                _, ids = index.search(q.reshape(1, -1), k, params=params)
+                times.append(time.perf_counter() - t)
+                found.append(ids[0])
+            recall = np.mean(
+                [len(set(f) & set(t)) / k for f, t in zip(found, truth)]
+            )
+            ms = np.array(times) * 1000
+            knob_label = "-" if knob is None else (
+                f"ef={knob}" if kind == "hnsw" else f"nprobe={knob}"
+            )
+            print(
+                f"  {factory_string(spec, d, n):<22}{knob_label:>10}{recall:>9.3f}"
+                f"{np.percentile(ms, 50):>9.3f}{np.percentile(ms, 99):>9.3f}"
+                f"{build_s:>9.2f}{size_mb:>8.1f}"
+            )
+        faiss.omp_set_num_threads(threads)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--synthetic", type=int, default=0, help="extra synthetic rows")
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--no-stores", action="store_true", help="skip data/*.faiss")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    if not args.no_stores:
+        for name in ("hotels", "experiences", "flights"):
+            xb = _stored(name)
+            if xb is not None:
+                _bench(name, xb, args.k, args.queries, rng)
+    if args.synthetic:
+        xb = _synthetic(args.synthetic, args.dim, rng)
+        _bench("synthetic", xb, args.k, args.queries, rng)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""p50 / p99 latency of 50 parallel hotel searches against the stub embedding server.
+
+compares the old path (sync search_hotels called from a coroutine, which blocks
+the event loop) with the async asearch_hotels path.
+
+    python scripts/bench_concurrency.py --parallel 50 --latency-ms 80
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+sys.path.insert(0, str(PROJECT_ROOT / "scripts"))
+
+from stub_embed_server import serve_in_thread  # noqa: E402
+
+
+def _report(label: str, latencies: list[float], wall: float) -> None:
+    ms = np.array(latencies) * 1000
+    print(
+        f"{label:<28} p50={np.percentile(ms, 50):7.1f}ms "
+        f"p99={np.percentile(ms, 99):7.1f}ms wall={wall * 1000:7.1f}ms"
+    )
+
+
+async def _run(parallel: int, fn) -> tuple[list[float], float]:
+    # every request "arrives" at the same instant, so time spent queued behind
+    # a blocked event loop counts towards its latency
+    start = time.perf_counter()
+
+    async def one(i: int) -> float:
+        await fn(f"boutique hotel with rooftop bar #{i}")
+        return time.perf_counter() - start
+
+    latencies = await asyncio.gather(*(one(i) for i in range(parallel)))
+    return list(latencies), time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--parallel", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=80.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--city", default="New York")
+    args = parser.parse_args()
+
+    serve_in_thread(args.port, latency_ms=args.latency_ms)
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("OPENAI_PROJECT_ID", "bench")
+
+    from travel_assistant.retrieval import search
+    from travel_assistant.retrieval.embed_cache import get_embedding_cache
+
+    async def blocking(query: str):
+        return search.search_hotels(query, city=args.city)
+
+    async def non_blocking(query: str):
+        return await search.asearch_hotels(query, city=args.city)
+
+    for label, fn in [("sync search in coroutine", blocking), ("asearch_hotels", non_blocking)]:
+        get_embedding_cache().clear()
+        latencies, wall = asyncio.run(_run(args.parallel, fn))
+        _report(label, latencies, wall)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""wall time and embedding calls of N searches, one by one vs search_many.
+
+runs offline on the stores in data/: embed_batch is replaced by a fake that
+sleeps --latency-ms per request (the API round trip) and returns random
+vectors. the query embedding cache is cleared before each run, so both paths
+embed every distinct query.
+
+    python scripts/bench_search_many.py --cities 8 --queries 3 --latency-ms 120
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("OPENAI_PROJECT_ID", "bench")
+
+from travel_assistant.retrieval import search  # noqa: E402
+from travel_assistant.retrieval.embed_cache import get_embedding_cache  # noqa: E402
+from travel_assistant.retrieval.search import (  # noqa: E402
+    SearchRequest,
+    load_store,
+    search_many,
+)
+
+QUERIES = ["quiet spa hotel", "family friendly", "rooftop bar nightlife", "food tour"]
+
+
+def _fake_embed(dim: int, latency: float, calls: list):
+    rng = np.random.default_rng(0)
+
+    def embed_batch(texts, max_batch=100):
+        calls.append(len(texts))
+        time.sleep(latency)
+        return rng.standard_normal((len(texts), dim)).tolist()
+
+    return embed_batch
+
+
+def _run(label: str, fn, dim: int, latency: float) -> list:
+    get_embedding_cache().clear()
+    calls: list = []
+    with patch(
+        "travel_assistant.retrieval.vector_store.embed_batch",
+        side_effect=_fake_embed(dim, latency, calls),
+    ):
+        started = time.perf_counter()
+        results = fn()
+        wall = time.perf_counter() - started
+    print(f"  {label:<12}{wall * 1000:>10.1f} ms{len(calls):>8} embed calls"
+          f"{sum(calls):>8} texts")
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cities", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=3, help="queries per city")
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=120)
+    parser.add_argument("--mode", default="vector", choices=["vector", "hybrid"])
+    args = parser.parse_args()
+
+    stores = {name: load_store(name) for name in ("hotels", "experiences")}
+    dim = stores["hotels"].index.d
+    cities = sorted(stores["hotels"].postings.by_city)[: args.cities]
+    requests = [
+        SearchRequest(name, query, city, args.k)
+        for city in cities
+        for query in QUERIES[: args.queries]
+        for name in stores
+    ]
+    latency = args.latency_ms / 1000
+    print(f"{len(requests)} searches over {len(cities)} cities, "
+          f"{args.latency_ms:.0f} ms per embedding request, mode={args.mode}")
+
+    single = _run(
+        "one by one",
+        lambda: [
+            search._search_in_city(stores[r.store], r.query, r.k, r.city, args.mode)
+            for r in requests
+        ],
+        dim,
+        latency,
+    )
+    batched = _run("search_many", lambda: search_many(requests, mode=args.mode), dim, latency)
+    print(f"  same results: {single == batched}")
+
+
+if __name__ == "__main__":
+    main()
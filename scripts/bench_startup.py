@@ -0,0 +1,93 @@
+#!/usr/bin/env python
+"""import time and RSS of the app, before and after the vector stores load.
+
+every sample runs in a fresh interpreter, so nothing is shared between runs
+(the OS page cache aside: run it twice and read the second run for warm-disk
+numbers).
+
+    python scripts/bench_startup.py --runs 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+# runs in the child interpreter; prints one json line
+_PROBE = r"""
+import json, resource, sys, time
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # peak rather than current, but close enough off linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+base = rss_mb()
+t0 = time.perf_counter()
+import travel_assistant.main  # noqa: F401
+t1 = time.perf_counter()
+imported = rss_mb()
+from travel_assistant.retrieval.registry import get_store_registry
+get_store_registry().warm_up()
+t2 = time.perf_counter()
+print(json.dumps({
+    "import_s": t1 - t0,
+    "load_s": t2 - t1,
+    "base_mb": base,
+    "import_mb": imported,
+    "loaded_mb": rss_mb(),
+    "ready": get_store_registry().ready,
+}))
+"""
+
+
+def _sample() -> dict:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        p for p in (str(PROJECT_ROOT / "src"), env.get("PYTHONPATH")) if p
+    )
+    env.setdefault("OPENAI_API_KEY", "sk-bench")
+    env.setdefault("OPENAI_PROJECT_ID", "bench")
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE],
+        env=env,
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = [_sample() for _ in range(args.runs)]
+    med = {k: float(np.median([s[k] for s in samples])) for k in samples[0] if k != "ready"}
+    print(f"median of {args.runs} fresh interpreters")
+    print(f"  import travel_assistant.main  {med['import_s'] * 1000:8.1f} ms  "
+          f"RSS {med['import_mb']:7.1f} MB")
+    print(f"  + load every vector store     {med['load_s'] * 1000:8.1f} ms  "
+          f"RSS {med['loaded_mb']:7.1f} MB")
+    print(f"  (interpreter baseline RSS {med['base_mb']:.1f} MB, "
+          f"all stores ready: {all(s['ready'] for s in samples)})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python
+"""RSS and PSS per worker with N workers holding every vector store.
+
+each mode starts N processes that load (or inherit) the stores, run a few
+filtered searches so the vectors are actually touched, then report memory
+while all of them are alive:
+
+    read      faiss.read_index into private memory in every worker
+    mmap      memory-mapped indexes (INDEX_MMAP), loaded by each worker
+    prefork   memory-mapped and loaded once before forking (STORE_PRELOAD)
+
+PSS splits shared pages between the processes mapping them, so the PSS total
+is the real memory cost of the pool; RSS counts shared pages in full.
+linux only (/proc/<pid>/smaps_rollup).
+
+    python scripts/bench_workers.py --workers 4
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing as mp
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT / "src"))
+os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+os.environ.setdefault("OPENAI_PROJECT_ID", "bench")
+
+
+def _memory_mb() -> dict:
+    fields = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ("Rss:", "Pss:", "Anonymous:"):
+                fields[parts[0].rstrip(":").lower()] = int(parts[1]) / 1024
+    return fields
+
+
+def _registry(mmap: bool):
+    from travel_assistant.core.config import get_settings
+    from travel_assistant.retrieval.registry import StoreRegistry
+
+    return StoreRegistry(get_settings().project_root / "data", mmap=mmap)
+
+
+def _touch(registry) -> None:
+    """a filtered search per city posting list, as requests would do"""
+    rng = np.random.default_rng(0)
+    for name in registry.names:
+        store = registry.get(name)
+        q = rng.standard_normal(store.index.d).astype(np.float32)
+        store.search_vector(q, 3)
+        for ids in store.postings.by_city.values():
+            store.top_k(q / np.linalg.norm(q), ids, 3)
+
+
+def _worker(mmap: bool, inherited, barrier, results) -> None:
+    registry = inherited if inherited is not None else _registry(mmap)
+    registry.warm_up()
+    _touch(registry)
+    barrier.wait()  # measure while every worker is alive
+    results.put(_memory_mb())
+    barrier.wait()
+
+
+def _run(mode: str, workers: int) -> list[dict]:
+    mmap = mode != "read"
+    ctx = mp.get_context("fork" if mode == "prefork" else "spawn")
+    inherited = None
+    if mode == "prefork":
+        inherited = _registry(mmap)
+        inherited.warm_up()
+    barrier = ctx.Barrier(workers)
+    results = ctx.Queue()
+    procs = [
+        ctx.Process(target=_worker, args=(mmap, inherited, barrier, results))
+        for _ in range(workers)
+    ]
+    for p in procs:
+        p.start()
+    out = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--modes", nargs="+", default=["read", "mmap", "prefork"])
+    args = parser.parse_args()
+
+    print(f"{args.workers} workers")
+    print(f"{'mode':<10}{'RSS/worker':>12}{'PSS/worker':>12}{'anon/worker':>13}{'PSS total':>11}")
+    for mode in args.modes:
+        mem = _run(mode, args.workers)
+        rss = np.mean([m["rss"] for m in mem])
+        pss = np.mean([m["pss"] for m in mem])
+        anon = np.mean([m["anonymous"] for m in mem])
+        total = sum(m["pss"] for m in mem)
+        print(f"{mode:<10}{rss:>10.1f}MB{pss:>10.1f}MB{anon:>11.1f}MB{total:>9.1f}MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,93 @@
 """builds faiss indices for hotels, experiences, flights and stores them on a disk.
-run it once after any change to the seed_data folder
+run it after any change to the seed_data folder: only new or edited rows are
+embedded, and an index whose rows did not change is left alone. embedding
+runs several requests at once, backs off on rate limits and checkpoints to
+data/<name>.embed-checkpoint.sqlite, so an interrupted run picks up where it
+stopped. a BM25 keyword index (data/<name>.bm25/) and the parsed price /
+rating / duration columns (data/<name>.numeric.npz) are written next to each
+faiss index.
+
+data/bundles.json holds each destination's precomputed picks (top hotels per
+pricing tier, the cheapest flights from LHR departing on or after --as-of,
+one experience per popular tag), which the agent puts in its system prompt.
+--as-of defaults to today, or to the start of the flight schedule once today
+is past its last departure (see retrieval/bundles.py).
+
+the index type (flat, ivf_flat, hnsw, ivf_pq) comes from INDEX_TYPE or
+--index-type; ANN indexes are trained here. switching type retrains from the
+stored vectors without re-embedding.
+
+usage: python scripts/build_index.py [--full] [--index-type hnsw] [--as-of 2025-07-01]
 
 """
 
-from pathlib import Path
-from travel_assistant.retrieval.catalogue_loader import load_data
-from travel_assistant.retrieval.vector_store import VectorStore
-from travel_assistant.core.config import get_settings
+import argparse
+import datetime as dt
 import sys
+from dataclasses import replace
+from functools import partial
+from pathlib import Path
 
 PROJECT_ROOT = Path(__file__).resolve().parents[1]  # <repo>/
 SRC_DIR = PROJECT_ROOT / "src"
 sys.path.insert(0, str(SRC_DIR))
 
+from travel_assistant.core.config import get_settings  # noqa: E402
+from travel_assistant.retrieval.ann import INDEX_TYPES, IndexSpec  # noqa: E402
+from travel_assistant.retrieval.bulk_embed import bulk_embed  # noqa: E402
+from travel_assistant.retrieval.bundles import (  # noqa: E402
+    BUNDLES_FILE,
+    build_bundles,
+    default_as_of,
+    write_bundles,
+)
+from travel_assistant.retrieval.catalogue_loader import load_data  # noqa: E402
+from travel_assistant.retrieval.index_builder import build_incremental  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--full", action="store_true", help="re-embed every row, ignoring stored vectors"
+    )
+    parser.add_argument("--index-type", choices=INDEX_TYPES, help="default: INDEX_TYPE")
+    parser.add_argument(
+        "--as-of",
+        type=dt.date.fromisoformat,
+        help="bundle flights departing on or after this date "
+        "(default: today, or the schedule's start once it has ended)",
+    )
+    args = parser.parse_args()
+
+    settings = get_settings()
+    spec = IndexSpec.from_settings(settings)
+    if args.index_type:
+        spec = replace(spec, kind=args.index_type)
+    output_dir = settings.project_root / "data"
+    output_dir.mkdir(exist_ok=True)
+
+    catalogues = load_data()
+    for name, rows in catalogues.items():
+        embed = partial(
+            bulk_embed,
+            checkpoint=output_dir / f"{name}.embed-checkpoint.sqlite",
+            progress=lambda p, name=name: print(f"  {name}: {p}"),
+        )
+        report = build_incremental(
+            name,
+            rows,
+            output_dir / f"{name}.faiss",
+            embed=embed,
+            spec=spec,
+            full=args.full,
+        )
+        print(report)
+
+    as_of = args.as_of or default_as_of(catalogues["flights"])
+    bundles = build_bundles(catalogues, as_of=as_of)
+    write_bundles(bundles, output_dir / BUNDLES_FILE, as_of=as_of)
+    print(f"bundles: {len(bundles)} destinations as of {as_of}")
 
-settings = get_settings()
-output_dir = settings.project_root / "data"
-output_dir.mkdir(exist_ok=True)
 
-records = load_data()
-for name, rows in records.items():
-    store = VectorStore()
-    store.build(rows)
-    store.save(output_dir / f"{name}.faiss")
-    print(f"built {name} index with {len(rows)} rows")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""converts pickled vector store metadata (data/<name>.pkl, the format used
+before the columnar data/<name>.meta/ directories) and removes the pickles.
+only run it on files you built yourself: unpickling can execute code.
+
+usage: python scripts/migrate_pickle_meta.py
+
+"""
+
+import pickle
+import sys
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]  # <repo>/
+SRC_DIR = PROJECT_ROOT / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+from travel_assistant.core.config import get_settings  # noqa: E402
+from travel_assistant.retrieval.columnar import ColumnarMeta, write_columns  # noqa: E402
+
+
+def main() -> None:
+    data_dir = get_settings().project_root / "data"
+    for pkl in sorted(data_dir.glob("*.pkl")):
+        with open(pkl, "rb") as f:
+            rows = pickle.load(f)
+        target = pkl.with_suffix(".meta")
+        write_columns(rows, target)
+        # check the round trip before dropping the original
+        meta = ColumnarMeta(target)
+        strip = lambda r: {k: v for k, v in r.items() if not str(k).startswith("__")}
+        if [strip(r) for r in meta] != [
+            {k: r.get(k) for k in meta.columns} for r in map(strip, rows)
+        ]:
+            raise SystemExit(f"{pkl.name}: converted rows differ, keeping the pickle")
+        pkl.unlink()
+        print(f"{pkl.name} -> {target.name} ({len(rows)} rows)")
+
+
+if __name__ == "__main__":
+    main()
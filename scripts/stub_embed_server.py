@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""local stand-in for the OpenAI embeddings endpoint.
+
+returns deterministic unit vectors (seeded from the input text) after an
+artificial delay, so benchmarks can exercise the real client code paths
+without network access or API spend. --rate-limit-every N answers every Nth
+request with a 429 and a retry-after-ms header, to exercise backoff.
+
+    python scripts/stub_embed_server.py --port 8765 --latency-ms 80
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python scripts/bench_concurrency.py
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 python scripts/build_index.py --full
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import threading
+import time
+
+import numpy as np
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def stub_vector(text: str, dim: int) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "little")
+    vec = np.random.default_rng(seed).standard_normal(dim).astype(np.float32)
+    return vec / np.linalg.norm(vec)
+
+
+def create_app(
+    dim: int = 1536, latency_ms: float = 50.0, rate_limit_every: int = 0
+) -> FastAPI:
+    app = FastAPI(title="stub embeddings")
+    app.state.requests = 0
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        if rate_limit_every and app.state.requests % rate_limit_every == 0:
+            return JSONResponse(
+                {"error": {"message": "rate limited", "type": "requests"}},
+                status_code=429,
+                headers={"retry-after-ms": str(int(latency_ms))},
+            )
+        await asyncio.sleep(latency_ms / 1000)
+
+        inputs = body["input"]
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        as_base64 = body.get("encoding_format") == "base64"
+
+        data = []
+        for i, text in enumerate(inputs):
+            vec = stub_vector(str(text), dim)
+            emb = base64.b64encode(vec.tobytes()).decode() if as_base64 else vec.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": emb})
+        tokens = sum(len(str(t).split()) for t in inputs)
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "stub"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    return app
+
+
+def serve_in_thread(port: int, **app_kwargs) -> uvicorn.Server:
+    """start the stub on 127.0.0.1:<port> in a daemon thread and wait until it is up"""
+    config = uvicorn.Config(
+        create_app(**app_kwargs), host="127.0.0.1", port=port, log_level="warning"
+    )
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(
+            dim=args.dim,
+            latency_ms=args.latency_ms,
+            rate_limit_every=args.rate_limit_every,
+        ),
+        host="127.0.0.1",
+        port=args.port,
+    )
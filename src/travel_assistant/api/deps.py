@@ -1,7 +1,7 @@
 from functools import lru_cache
 from travel_assistant.core.config import get_settings, Settings
+from travel_assistant.retrieval.registry import get_store_registry
 from travel_assistant.retrieval.vector_store import VectorStore
-from pathlib import Path
 
 
 @lru_cache
@@ -9,12 +9,14 @@ def settings_dep() -> Settings:
     return get_settings()
 
 
-def _load_vs(name: str) -> VectorStore:
-    vs = VectorStore()
-    vs.load(Path(get_settings().project_root, "data", f"{name}.faiss"))
-    return vs
+# the same shared, lazily loaded stores the search functions use
+def hotels_store_dep() -> VectorStore:
+    return get_store_registry().get("hotels")
 
 
-hotels_store_dep = lru_cache()(_load_vs)("hotels")  # no Settings arg
-flights_store_dep = lru_cache()(_load_vs)("flights")
-experiences_store_dep = lru_cache()(_load_vs)("experiences")
+def flights_store_dep() -> VectorStore:
+    return get_store_registry().get("flights")
+
+
+def experiences_store_dep() -> VectorStore:
+    return get_store_registry().get("experiences")
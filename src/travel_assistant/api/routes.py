@@ -1,12 +1,22 @@
 from fastapi import APIRouter, Depends, Request, HTTPException
+from fastapi.responses import StreamingResponse
 from travel_assistant.models.schemas import TravelQuery, TravelAdvice
 from travel_assistant.api.deps import settings_dep
 from travel_assistant.core.config import Settings
-from travel_assistant.llm.agent import generate_advice
-from travel_assistant.core.guardrails import moderate_content
+from travel_assistant.llm.agent import generate_advice, stream_advice
+from travel_assistant.core.guardrails import amoderate_content
+from travel_assistant.services.batch import parse_jsonl, run_batch
+from travel_assistant.services.response_cache import (
+    lookup_exact,
+    lookup_similar,
+    remember,
+)
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+import asyncio
+import json
 import logging
+import orjson
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -34,26 +44,143 @@ async def travel_assistant_endpoint(
     raises:
         HTTPException: if content is inappropriate or processing fails
     """
+    return await moderated_advice(query_in.query, settings)
+
+
+async def moderated_advice(query: str, settings: Settings) -> TravelAdvice:
+    """moderation + response cache + generate_advice for one query.
+    raises HTTPException like the endpoint does"""
+    # answers are cached only after passing moderation, so an exact hit for
+    # the same (normalised) query can be returned straight away
+    lookup = lookup_exact(query, settings)
+    if lookup.advice is not None:
+        return lookup.advice
+
+    async def advise() -> TravelAdvice:
+        await lookup_similar(lookup, query, settings)
+        if lookup.advice is not None:
+            return lookup.advice
+        return await generate_advice(query, settings)
+
+    # moderation runs alongside intent parsing and the first LLM call; the
+    # advice work is cancelled if the query turns out to be flagged
+    advice_task = asyncio.create_task(advise())
     try:
-        if moderate_content(query_in.query, settings):
-            logger.warning(f"Inappropriate content detected: {query_in.query}")
+        try:
+            if await amoderate_content(query, settings):
+                logger.warning(f"Inappropriate content detected: {query}")
+                raise HTTPException(
+                    status_code=400,
+                    detail="Your query contains inappropriate content. Please modify your request.",
+                )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Content moderation failed: {e}")
+            raise HTTPException(status_code=500, detail="Content moderation error")
+
+        try:
+            advice: TravelAdvice = await advice_task
+            remember(lookup, query, advice)
+            logger.info(f"Generated advice for query: {query}")
+            return advice
+        except Exception as e:
+            logger.exception(f"Error processing query: {query}")
             raise HTTPException(
-                status_code=400,
-                detail="Your query contains inappropriate content. Please modify your request.",
+                status_code=500,
+                detail="We encountered an error processing your request. Please try again later.",
             )
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Content moderation failed: {e}")
-        raise HTTPException(status_code=500, detail="Content moderation error")
+    finally:
+        # flagged, moderation failed, or the caller itself was cancelled (a
+        # batch client went away): don't leave the advice work running
+        if not advice_task.done():
+            advice_task.cancel()
 
-    try:
-        advice: TravelAdvice = await generate_advice(query_in.query, settings)
-        logger.info(f"Generated advice for query: {query_in.query}")
-        return advice
-    except Exception as e:
-        logger.exception(f"Error processing query: {query_in.query}")
+
+def _sse(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+@router.post("/travel-assistant/stream")
+@limiter.limit("10/minute")
+async def travel_assistant_stream_endpoint(
+    request: Request,
+    query_in: TravelQuery,
+    settings: Settings = Depends(settings_dep),
+):
+    """
+    stream travel advice as server-sent events while the agent works.
+
+    events: destination, tool_result, advice_delta, advice, error.
+    the agent starts straight away and buffers its events until moderation
+    passes; a flagged query gets a single error event instead.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def produce() -> None:
+        try:
+            async for event in stream_advice(query_in.query, settings):
+                await queue.put(event)
+        except Exception:
+            logger.exception(f"Error streaming query: {query_in.query}")
+            await queue.put(
+                ("error", {"detail": "We encountered an error processing your request."})
+            )
+        finally:
+            await queue.put(None)
+
+    async def events():
+        producer = asyncio.create_task(produce())
+        try:
+            if await amoderate_content(query_in.query, settings):
+                logger.warning(f"Inappropriate content detected: {query_in.query}")
+                producer.cancel()
+                yield _sse(
+                    "error",
+                    {"detail": "Your query contains inappropriate content. Please modify your request."},
+                )
+                return
+            while (item := await queue.get()) is not None:
+                yield _sse(*item)
+        finally:
+            producer.cancel()
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/travel-assistant/batch")
+@limiter.limit("10/minute")
+async def travel_assistant_batch_endpoint(
+    request: Request,
+    concurrency: int | None = None,
+    settings: Settings = Depends(settings_dep),
+):
+    """
+    advice for many queries in one call.
+
+    the body is JSONL: one {"query": "...", "id": ...} object (or a bare JSON
+    string) per line. identical queries are answered once; results stream
+    back as NDJSON in completion order, each carrying its id and either
+    "advice" or "error".
+    """
+    lines = (await request.body()).splitlines()
+    if len(lines) > settings.batch_max_items:
         raise HTTPException(
-            status_code=500,
-            detail="We encountered an error processing your request. Please try again later.",
+            status_code=413,
+            detail=f"A batch may contain at most {settings.batch_max_items} queries.",
         )
+    limit = min(concurrency or settings.batch_concurrency, settings.batch_max_concurrency)
+
+    async def results():
+        async for item in run_batch(
+            parse_jsonl(lines),
+            lambda query: moderated_advice(query, settings),
+            max(limit, 1),
+        ):
+            yield orjson.dumps(item) + b"\n"
+
+    return StreamingResponse(results(), media_type="application/x-ndjson")
@@ -0,0 +1,104 @@
+"""application-scoped OpenAI clients.
+
+one pooled httpx transport per process, shared by the agent, moderation and
+embeddings, instead of a fresh client (and TLS handshake) per request.
+the FastAPI lifespan creates the registry on startup and closes it on
+shutdown; scripts and tests get it lazily through get_clients().
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+
+import httpx
+from openai import AsyncOpenAI, OpenAI
+
+from travel_assistant.core.config import Settings, get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def _http2_enabled(settings: Settings) -> bool:
+    """HTTP/2 needs the optional h2 package; fall back to HTTP/1.1 without it"""
+    if not settings.http2:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.warning("http2 requested but h2 is not installed, using HTTP/1.1")
+        return False
+    return True
+
+
+class ClientRegistry:
+    """owns the pooled sync and async OpenAI clients for one process"""
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings = settings
+        self.http2 = _http2_enabled(settings)
+        self.limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        )
+        self.timeout = httpx.Timeout(settings.openai_timeout, connect=5.0)
+
+        self.openai = OpenAI(
+            api_key=settings.openai_api_key.get_secret_value(),
+            project=settings.openai_project_id,
+            max_retries=settings.openai_max_retries,
+            http_client=httpx.Client(
+                limits=self.limits, timeout=self.timeout, http2=self.http2
+            ),
+        )
+        self._async_openai: AsyncOpenAI | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def async_openai(self) -> AsyncOpenAI:
+        """the shared AsyncOpenAI client.
+
+        async connection pools are bound to the event loop that opened them, so
+        a new client is made if we are called from a different loop (e.g. a
+        second TestClient); the app itself only ever runs one loop.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if self._async_openai is None or (loop is not None and loop is not self._loop):
+            self._async_openai = AsyncOpenAI(
+                api_key=self.settings.openai_api_key.get_secret_value(),
+                project=self.settings.openai_project_id,
+                max_retries=self.settings.openai_max_retries,
+                http_client=httpx.AsyncClient(
+                    limits=self.limits, timeout=self.timeout, http2=self.http2
+                ),
+            )
+            self._loop = loop
+        return self._async_openai
+
+    async def aclose(self) -> None:
+        if self._async_openai is not None:
+            await self._async_openai.close()
+            self._async_openai = None
+        self.openai.close()
+
+
+_registry: ClientRegistry | None = None
+
+
+def get_clients(settings: Settings | None = None) -> ClientRegistry:
+    """return the process-wide client registry, creating it on first use"""
+    global _registry
+    if _registry is None:
+        _registry = ClientRegistry(settings or get_settings())
+    return _registry
+
+
+async def close_clients() -> None:
+    """close pooled connections; called from the FastAPI lifespan on shutdown"""
+    global _registry
+    if _registry is not None:
+        await _registry.aclose()
+        _registry = None
@@ -44,7 +44,52 @@ class Settings(BaseSettings):
     embed_model: str = Field("text-embedding-ada-002", env="EMBED_MODEL")
     openai_timeout: int = Field(30, env="OPENAI_TIMEOUT", ge=5, le=120)
     openai_max_retries: int = Field(3, env="OPENAI_MAX_RETRIES", ge=0, le=10)
+    # RESPONSE CACHE (services/response_cache.py)
+    response_cache_enabled: bool = Field(True, env="RESPONSE_CACHE_ENABLED")
+    response_cache_size: int = Field(1024, env="RESPONSE_CACHE_SIZE", ge=1)
+    response_cache_ttl: float = Field(3600.0, env="RESPONSE_CACHE_TTL", gt=0)
+    response_cache_threshold: float = Field(
+        0.92,
+        env="RESPONSE_CACHE_THRESHOLD",
+        ge=0,
+        le=1,
+        description="cosine similarity at which a cached answer is reused",
+    )
+    response_cache_embed_timeout: float = Field(
+        1.5, env="RESPONSE_CACHE_EMBED_TIMEOUT", gt=0
+    )
+
+    # BATCH ENDPOINT
+    batch_concurrency: int = Field(8, env="BATCH_CONCURRENCY", ge=1)
+    batch_max_concurrency: int = Field(32, env="BATCH_MAX_CONCURRENCY", ge=1)
+    batch_max_items: int = Field(10_000, env="BATCH_MAX_ITEMS", ge=1)
+
+    # shared HTTP connection pool (see core/clients.py)
+    http_max_connections: int = Field(100, env="HTTP_MAX_CONNECTIONS", ge=1)
+    http_max_keepalive: int = Field(20, env="HTTP_MAX_KEEPALIVE", ge=0)
+    http_keepalive_expiry: float = Field(30.0, env="HTTP_KEEPALIVE_EXPIRY", ge=0)
+    http2: bool = Field(True, env="HTTP2")
     max_prompt_tokens: int = Field(4096, env="MAX_PROMPT_TOKENS", ge=256)
+    moderation_timeout: float = Field(
+        5.0,
+        env="MODERATION_TIMEOUT",
+        gt=0,
+        description="overall seconds allowed for moderation before failing open",
+    )
+    moderation_cache_ttl: float = Field(
+        300.0, env="MODERATION_CACHE_TTL", ge=0, description="verdict cache TTL (s)"
+    )
+    tool_timeout: float = Field(
+        8.0,
+        env="TOOL_TIMEOUT",
+        gt=0,
+        description="seconds a single search tool may take before its fallback rows are used",
+    )
+    advice_bundles: bool = Field(
+        True,
+        env="ADVICE_BUNDLES",
+        description="put the destination's precomputed picks (data/bundles.json) in the system prompt",
+    )
     cost_per_1k_tokens_gbp: float = Field(
         0.008,
         env="COST_PER_1K_TOKENS_GBP",
@@ -52,6 +97,88 @@ class Settings(BaseSettings):
         gt=0,
     )
 
+    # QUERY EMBEDDING CACHE
+    embed_cache_max_bytes: int = Field(
+        32 * 1024 * 1024,
+        env="EMBED_CACHE_MAX_BYTES",
+        ge=0,
+        description="byte budget of the in-process query embedding LRU",
+    )
+    embed_cache_path: Path | None = Field(
+        None,
+        env="EMBED_CACHE_PATH",
+        description="optional sqlite file (e.g. data/embeddings.sqlite) persisting query embeddings",
+    )
+
+    store_warmup: bool = Field(
+        True,
+        env="STORE_WARMUP",
+        description="load the vector stores in the background on startup instead of on first use",
+    )
+    store_preload: bool = Field(
+        False,
+        env="STORE_PRELOAD",
+        description="load the vector stores at import, for pre-fork servers (gunicorn --preload)",
+    )
+    index_mmap: bool = Field(
+        True,
+        env="INDEX_MMAP",
+        description="memory-map the faiss indexes so workers share one copy",
+    )
+
+    # ANN INDEX (retrieval/ann.py); the build settings apply to scripts/build_index.py
+    index_type: Literal["flat", "ivf_flat", "hnsw", "ivf_pq"] = Field(
+        "flat", env="INDEX_TYPE"
+    )
+    index_nlist: int | None = Field(
+        None, env="INDEX_NLIST", ge=1, description="IVF cells; default ~4 sqrt(rows)"
+    )
+    index_pq_m: int = Field(
+        64, env="INDEX_PQ_M", ge=1, description="PQ sub-quantisers; must divide the dimension"
+    )
+    index_pq_nbits: int = Field(8, env="INDEX_PQ_NBITS", ge=1, le=16)
+    hnsw_m: int = Field(32, env="HNSW_M", ge=2)
+    hnsw_ef_construction: int = Field(200, env="HNSW_EF_CONSTRUCTION", ge=1)
+    index_nprobe: int = Field(
+        16, env="INDEX_NPROBE", ge=1, description="IVF cells scanned per query"
+    )
+    hnsw_ef_search: int = Field(
+        64, env="HNSW_EF_SEARCH", ge=1, description="HNSW candidates explored per query"
+    )
+
+    # SEARCH MODE (retrieval/search.py)
+    search_mode: Literal["vector", "lexical", "hybrid"] = Field(
+        "hybrid",
+        env="SEARCH_MODE",
+        description="hybrid fuses BM25 and vector rankings; lexical needs no embedding call",
+    )
+    rrf_k: int = Field(60, env="RRF_K", ge=1, description="reciprocal rank fusion constant")
+    hybrid_depth: int = Field(
+        20,
+        env="HYBRID_DEPTH",
+        ge=1,
+        description="candidates each retriever contributes to a hybrid search",
+    )
+
+    # BULK EMBEDDING (retrieval/bulk_embed.py, used by scripts/build_index.py)
+    embed_concurrency: int = Field(
+        8, env="EMBED_CONCURRENCY", ge=1, description="embedding requests in flight"
+    )
+    embed_batch_tokens: int = Field(
+        250_000,
+        env="EMBED_BATCH_TOKENS",
+        ge=1,
+        description="token budget of one embeddings request (the API caps it at 300k)",
+    )
+    embed_input_tokens: int = Field(
+        8191,
+        env="EMBED_INPUT_TOKENS",
+        ge=1,
+        description="per-input token limit of the embedding model; longer texts are truncated",
+    )
+    embed_batch_inputs: int = Field(2048, env="EMBED_BATCH_INPUTS", ge=1, le=2048)
+    embed_max_attempts: int = Field(6, env="EMBED_MAX_ATTEMPTS", ge=1)
+
     project_root: Path = PROJECT_ROOT
     seed_dir: Path = SEED_DIR
     vector_index_path: Path = PROJECT_ROOT / "vector_store.faiss"
@@ -1,19 +1,31 @@
-from openai import OpenAI, APIError
+from openai import APIConnectionError, APIError, APITimeoutError, RateLimitError
+from travel_assistant.core.clients import get_clients
 from travel_assistant.core.config import Settings
+from travel_assistant.core.ttl_cache import TTLCache
+import asyncio
 import logging
-from tenacity import retry, stop_after_attempt, wait_fixed
+from tenacity import (
+    AsyncRetrying,
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential,
+    wait_fixed,
+)
 
 logger = logging.getLogger(__name__)
 
+# recent verdicts, keyed on the normalised query text
+_verdicts = TTLCache(maxsize=4096, ttl=300.0)
+
 
 @retry(stop=stop_after_attempt(3), wait=wait_fixed(2))
 def moderate_content(text: str, settings: Settings) -> bool:
     try:
-        client = OpenAI(
-            api_key=settings.openai_api_key.get_secret_value(),
-            timeout=10.0,  # 10 second timeout
+        client = get_clients(settings).openai
+        response = client.moderations.create(
+            input=text, timeout=10.0  # 10 second timeout
         )
-        response = client.moderations.create(input=text)
         return response.results[0].flagged
     except APIError as e:
         logger.error(f"OpenAI API error: {str(e)}")
@@ -21,3 +33,48 @@ def moderate_content(text: str, settings: Settings) -> bool:
     except Exception as e:
         logger.error(f"Moderation error: {str(e)}")
         return False  # fail open
+
+
+async def _moderate(text: str, settings: Settings) -> bool:
+    # the retries are tenacity's; create() itself takes no max_retries
+    client = get_clients(settings).async_openai.with_options(max_retries=0)
+    async for attempt in AsyncRetrying(
+        stop=stop_after_attempt(3),
+        wait=wait_exponential(multiplier=0.2, max=1),
+        retry=retry_if_exception_type(
+            (APIConnectionError, APITimeoutError, RateLimitError)
+        ),
+        reraise=True,
+    ):
+        with attempt:
+            response = await client.moderations.create(input=text)
+    return response.results[0].flagged
+
+
+async def amoderate_content(text: str, settings: Settings) -> bool:
+    """non-blocking moderation with a short-TTL verdict cache.
+
+    bounded by settings.moderation_timeout overall and fails open like
+    moderate_content; only real verdicts are cached.
+    """
+    key = " ".join(text.casefold().split())
+    cached = _verdicts.get(key)
+    if cached is not None:
+        return cached
+
+    try:
+        flagged = await asyncio.wait_for(
+            _moderate(text, settings), settings.moderation_timeout
+        )
+    except asyncio.TimeoutError:
+        logger.error(f"Moderation timed out after {settings.moderation_timeout}s")
+        return False  # fail open
+    except APIError as e:
+        logger.error(f"OpenAI API error: {str(e)}")
+        return False  # fail open
+    except Exception as e:
+        logger.error(f"Moderation error: {str(e)}")
+        return False  # fail open
+
+    _verdicts.set(key, flagged, ttl=settings.moderation_cache_ttl)
+    return flagged
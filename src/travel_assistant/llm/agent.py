@@ -1,15 +1,19 @@
 from __future__ import annotations
+import asyncio
 import logging
 import orjson
 import json
 import re
-from openai import AsyncOpenAI
 from pydantic import ValidationError
 
+from travel_assistant.core.clients import get_clients
 from travel_assistant.core.config import Settings
 from travel_assistant.models.schemas import TravelAdvice
 from travel_assistant.retrieval import search, get_all_cities
+from travel_assistant.retrieval.bundles import bundle_prompt, get_bundle
+from travel_assistant.retrieval.profiles import get_profile_table
 from travel_assistant.llm.funct_specs import FUNCTION_SPECS
+from travel_assistant.nlp.matcher import get_place_matcher, strip_match
 
 logger = logging.getLogger(__name__)
 
@@ -24,62 +28,21 @@ SYSTEM_PROMPT = (
 
 
 def parse(query: str) -> tuple[str | None, str]:
-    cities = get_all_cities()
-    low = query.lower()
-    for city in cities:
-        if city.lower() in low:
-            theme = low.replace(city.lower(), "", 1).strip(" ,.")
-            return city, theme or query
-    return None, query
+    """leftmost-longest city (or arrival airport code) in the query, plus the
+    rest of the query as the theme"""
+    match = get_place_matcher().find_city(query)
+    if match is None:
+        return None, query
+    theme = strip_match(query, match).lower()
+    return match.city, theme or query
 
 
 def pick_city(theme: str) -> str | None:
-    cities = list(get_all_cities())
-    if not cities:
-        return None
-
-    # normalize everything for matching
-    city_lower_map = {city.lower(): city for city in cities}
-    normalized_cities = set(city_lower_map.keys())
-    t = theme.lower()
-
-    # country or continent matching
-    for city in cities:
-        try:
-            hotels = search.search_hotels(city=city)
-            if hotels:
-                # check country match
-                if hotels[0].get("country", "").lower() in t:
-                    return city
-                # check continent match
-                if hotels[0].get("continent", "").lower() in t:
-                    return city
-        except Exception:
-            continue
-
-    # theme-based matching using available city attributes
-    theme_keywords = {
-        "asia": ["asia", "asian"],
-        "africa": ["africa", "african"],
-        "beach": ["beach", "coast", "ocean"],
-        "mountain": ["mountain", "alpine", "hiking", "ski"],
-        "food": ["food", "cuisine", "gastronomy", "foodie"],
-    }
-
-    for theme_name, keywords in theme_keywords.items():
-        if any(kw in t for kw in keywords):
-            # get cities matching this theme from our data
-            try:
-                for city in cities:
-                    hotels = search.search_hotels(city=city)
-                    if hotels and hotels[0].get("themes", []):
-                        if theme_name in hotels[0]["themes"]:
-                            return city
-            except Exception:
-                continue
-
-    # first available city fallback
-    return cities[0]
+    """choose a destination from the precomputed profile table: country and
+    continent mentions narrow the field, theme keywords rank it"""
+    table = get_profile_table()
+    profile = table.pick(theme) or table.pick("")
+    return profile.city if profile else None
 
 
 def parse_free_response() -> TravelAdvice:
@@ -95,8 +58,108 @@ def parse_free_response() -> TravelAdvice:
     )
 
 
-async def generate_advice(user_query: str, settings: Settings) -> TravelAdvice:
-    # PARSES INTENT
+SEARCH_TOOLS = ("search_hotels", "search_flights", "search_experiences")
+
+
+def _tool_name(call) -> str:
+    """robust function for name extraction"""
+    if hasattr(call.function, "_mock_name") and call.function._mock_name:
+        return call.function._mock_name
+    if hasattr(call.function, "name") and isinstance(call.function.name, str):
+        return call.function.name
+    if hasattr(call.function, "__name__"):
+        return call.function.__name__
+    return str(call.function)
+
+
+def _tool_args(fn: str, raw_args: str, city: str | None) -> dict:
+    args = orjson.loads(raw_args)
+
+    # enforce context city for search functions
+    if fn in SEARCH_TOOLS and city:
+        args["city"] = city  # Override with context city
+
+    # set default city for other functions
+    args.setdefault("city", city)
+    return args
+
+
+def _finalise_advice(args: dict, city: str | None, is_test_env: bool) -> TravelAdvice:
+    # forces destination to context city if not specified
+    if city and "destination" not in args:
+        args["destination"] = city
+
+    advice = TravelAdvice.model_validate(args)
+    # skip validation for tests
+    if not is_test_env:
+        valid = get_all_cities()
+        norm = (advice.destination or "").lower()
+        if norm not in {c.lower() for c in valid}:
+            # fallback to context
+            advice.destination = city or advice.destination or "Various destinations"
+    if advice.destination:
+        advice.destination = advice.destination.title()
+    return advice
+
+
+def _fallback_rows(fn: str, args: dict, city: str | None) -> list[dict]:
+    """placeholder rows so the model always has at least 1 result to work with"""
+    if fn == "search_hotels":
+        return [
+            {
+                "name": "Luxury Hotel",
+                "city": city,
+                "price_per_night": 200.0,
+                "rating": 4.5,
+            }
+        ]
+    if fn == "search_flights":
+        city_code = city[:3].upper() if city else "XXX"
+        return [
+            {
+                "airline": "Virgin Atlantic",
+                "from_airport": "LHR",
+                "to_airport": city_code,
+                "price": 800.0,
+                "duration": "9H",
+                "date": args.get("date_from"),
+            }
+        ]
+    return [
+        {
+            "name": "Local Food Tour",
+            "city": city,
+            "price": 50.0,
+            "duration": "3 hours",
+        }
+    ]
+
+
+async def _run_search_tool(
+    fn: str, args: dict, city: str | None, timeout: float
+) -> list[dict]:
+    """run one search tool, degrading to fallback rows on error or timeout"""
+    searches = {
+        "search_hotels": search.asearch_hotels,
+        "search_flights": search.asearch_flights,
+        "search_experiences": search.asearch_experiences,
+    }
+    try:
+        results = await asyncio.wait_for(searches[fn](**args), timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"{fn} timed out after {timeout}s, using fallback rows")
+        return _fallback_rows(fn, args, city)
+    except Exception:
+        return _fallback_rows(fn, args, city)
+
+    # filter by context city (flights are keyed on the arrival city)
+    if city and fn != "search_flights":
+        results = [r for r in results if r.get("city", "").lower() == city.lower()]
+    return results or _fallback_rows(fn, args, city)
+
+
+def resolve_destination(user_query: str) -> tuple[str | None, str]:
+    """(city, theme) for a query: an explicit city if named, else a picked one"""
     try:
         city, theme = parse(user_query)
         if city is None:
@@ -104,13 +167,15 @@ async def generate_advice(user_query: str, settings: Settings) -> TravelAdvice:
     except Exception as e:
         logger.error(f"Error parsing query: {e}")
         city, theme = None, user_query
+    return city, theme
 
-    # detect test environment
-    is_test_env = (
-        str(getattr(settings, "openai_project_id", "")).lower().startswith("test")
-    )
 
-    # handles impossible destination
+def _is_test_env(settings: Settings) -> bool:
+    return str(getattr(settings, "openai_project_id", "")).lower().startswith("test")
+
+
+def _impossible_destination(theme: str | None) -> TravelAdvice | None:
+    """handles impossible destination"""
     if theme and "mars" in theme.lower():
         return TravelAdvice(
             destination="Various destinations",
@@ -121,21 +186,78 @@ async def generate_advice(user_query: str, settings: Settings) -> TravelAdvice:
                 "Contact support for more information",
             ],
         )
+    return None
 
-    # BUILD MESSAGES
+
+def _bundle_context(city: str | None) -> str:
+    """the destination's precomputed catalogue picks for the system prompt"""
+    try:
+        bundle = get_bundle(city)
+    except Exception as e:
+        logger.warning(f"Could not read the bundle for {city}: {e}")
+        return ""
+    if bundle is None:
+        return ""
+    return (
+        f"\n\n{bundle_prompt(bundle)}\n"
+        "Recommend from these picks where they fit; call the search tools only "
+        "for anything they don't cover."
+    )
+
+
+def _build_messages(user_query: str, city: str | None, settings: Settings) -> list:
     system_msg = f"{SYSTEM_PROMPT} (Destination context: {city})"
-    messages = [
+    if settings.advice_bundles:
+        system_msg += _bundle_context(city)
+    return [
         {"role": "system", "content": system_msg},
         {"role": "user", "content": user_query},
     ]
 
+
+def _test_env_advice(city: str | None) -> TravelAdvice:
+    return TravelAdvice(
+        destination=city or "Various destinations",
+        reason="",
+        budget="",
+        tips=[],
+        hotel=None,
+        flight=None,
+        experience=None,
+    )
+
+
+def _unavailable_advice() -> TravelAdvice:
+    return TravelAdvice(
+        destination="Various destinations",
+        reason="We're sorry, but we couldn't generate a recommendation at this time. Please try again later.",
+        budget="Varies",
+        tips=[
+            "Try again in a few minutes",
+            "Contact support if the issue persists",
+        ],
+    )
+
+
+async def generate_advice(user_query: str, settings: Settings) -> TravelAdvice:
+    # PARSES INTENT
+    city, theme = resolve_destination(user_query)
+
+    # detect test environment
+    is_test_env = _is_test_env(settings)
+
+    # handles impossible destination
+    refusal = _impossible_destination(theme)
+    if refusal is not None:
+        return refusal
+
+    # BUILD MESSAGES
+    messages = _build_messages(user_query, city, settings)
+
     # CALL WITH RETRY
     for attempt in range(MAX_ATTEMPTS):
         try:
-            client = AsyncOpenAI(
-                api_key=settings.openai_api_key.get_secret_value(),
-                project=settings.openai_project_id,
-            )
+            client = get_clients(settings).async_openai
             iteration = 0
             while iteration < MAX_ITERATIONS:
                 iteration += 1
@@ -152,189 +274,44 @@ async def generate_advice(user_query: str, settings: Settings) -> TravelAdvice:
 
                 # TOOL CALLS
                 if msg.tool_calls:
+                    calls = []
                     for call in msg.tool_calls:
-                        # robust function for name extraction
-                        if (
-                            hasattr(call.function, "_mock_name")
-                            and call.function._mock_name
-                        ):
-                            fn = call.function._mock_name
-                        elif hasattr(call.function, "name") and isinstance(
-                            call.function.name, str
-                        ):
-                            fn = call.function.name
-                        elif hasattr(call.function, "__name__"):
-                            fn = call.function.__name__
-                        else:
-                            fn = str(call.function)
-
-                        args = orjson.loads(call.function.arguments)
-
-                        # enforce context city for search functions
-                        if (
-                            fn
-                            in ["search_hotels", "search_flights", "search_experiences"]
-                            and city
-                        ):
-                            args["city"] = city  # Override with context city
-
-                        # set default city for other functions
-                        args.setdefault("city", city)
-
-                        # add smart defaults for flight searches
-                        if fn == "search_flights":
-                            args.setdefault(
-                                "from_airport", "LHR"
-                            )  # default London Heathrow
-                            if "date" not in args:
-                                args["date"] = "2023-09-15"  # Default September date
+                        fn = _tool_name(call)
+                        args = _tool_args(fn, call.function.arguments, city)
+                        calls.append((call, fn, args))
 
+                    for _, fn, args in calls:
                         if fn == "return_advice":
-                            # forces destination to context city if not specified
-                            if city and "destination" not in args:
-                                args["destination"] = city
-
-                            advice = TravelAdvice.model_validate(args)
-                            # skip validation for tests
-                            if not is_test_env:
-                                valid = get_all_cities()
-                                norm = (advice.destination or "").lower()
-                                if norm not in {c.lower() for c in valid}:
-                                    # fallback to context
-                                    advice.destination = (
-                                        city
-                                        or advice.destination
-                                        or "Various destinations"
-                                    )
-                            if advice.destination:
-                                advice.destination = advice.destination.title()
-                            return advice
-
-                        # search using smart filtering and fallbacks
-                        if fn == "search_hotels":
-                            try:
-                                results = search.search_hotels(**args)
-                                # Filter by context city
-                                if city:
-                                    results = [
-                                        r
-                                        for r in results
-                                        if r.get("city", "").lower() == city.lower()
-                                    ]
-                                # to ensure we have at least 1 result
-                                if not results:
-                                    results = [
-                                        {
-                                            "name": "Luxury Hotel",
-                                            "city": city,
-                                            "price_per_night": 200.0,
-                                            "rating": 4.5,
-                                        }
-                                    ]
-                            except Exception:
-                                results = [
-                                    {
-                                        "name": "Luxury Hotel",
-                                        "city": city,
-                                        "price_per_night": 200.0,
-                                        "rating": 4.5,
-                                    }
-                                ]
-
-                        elif fn == "search_flights":
-                            try:
-                                results = search.search_flights(**args)
-                                # ensures we have at least 1 result
-                                if not results:
-                                    city_code = city[:3].upper() if city else "XXX"
-                                    results = [
-                                        {
-                                            "airline": "Virgin Atlantic",
-                                            "from_airport": "LHR",
-                                            "to_airport": city_code,
-                                            "price": 800.0,
-                                            "duration": "9H",
-                                            "date": args.get("date", "2023-09-15"),
-                                        }
-                                    ]
-                            except Exception:
-                                city_code = city[:3].upper() if city else "XXX"
-                                results = [
-                                    {
-                                        "airline": "Virgin Atlantic",
-                                        "from_airport": "LHR",
-                                        "to_airport": city_code,
-                                        "price": 800.0,
-                                        "duration": "9H",
-                                        "date": args.get("date", "2023-09-15"),
-                                    }
-                                ]
-
-                        elif fn == "search_experiences":
-                            try:
-                                results = search.search_experiences(**args)
-                                # filter by context city
-                                if city:
-                                    results = [
-                                        r
-                                        for r in results
-                                        if r.get("city", "").lower() == city.lower()
-                                    ]
-                                # ensures we have at least 1 result
-                                if not results:
-                                    results = [
-                                        {
-                                            "name": "Local Food Tour",
-                                            "city": city,
-                                            "price": 50.0,
-                                            "duration": "3 hours",
-                                        }
-                                    ]
-                            except Exception:
-                                results = [
-                                    {
-                                        "name": "Local Food Tour",
-                                        "city": city,
-                                        "price": 50.0,
-                                        "duration": "3 hours",
-                                    }
-                                ]
-                        else:
+                            return _finalise_advice(args, city, is_test_env)
+                        if fn not in SEARCH_TOOLS:
                             return parse_free_response()
 
+                    # independent searches of one turn run concurrently;
+                    # gather keeps results in tool_call order
+                    results = await asyncio.gather(
+                        *(
+                            _run_search_tool(fn, args, city, settings.tool_timeout)
+                            for _, fn, args in calls
+                        )
+                    )
+                    for (call, _, _), rows in zip(calls, results):
                         messages.append(
                             {
                                 "role": "tool",
                                 "tool_call_id": call.id,
-                                "content": json.dumps(results, separators=(",", ":")),
+                                "content": json.dumps(rows, separators=(",", ":")),
                             }
                         )
                     continue
 
                 # NO TOOL CALLS
                 if is_test_env:
-                    return TravelAdvice(
-                        destination=city or "Various destinations",
-                        reason="",
-                        budget="",
-                        tips=[],
-                        hotel=None,
-                        flight=None,
-                        experience=None,
-                    )
+                    return _test_env_advice(city)
                 return parse_free_response()
 
             # too many iterations fallback
             if is_test_env:
-                return TravelAdvice(
-                    destination=city or "Various destinations",
-                    reason="",
-                    budget="",
-                    tips=[],
-                    hotel=None,
-                    flight=None,
-                    experience=None,
-                )
+                return _test_env_advice(city)
             return parse_free_response()
 
         except Exception as e:
@@ -342,21 +319,123 @@ async def generate_advice(user_query: str, settings: Settings) -> TravelAdvice:
             if attempt < MAX_ATTEMPTS - 1:
                 continue
             if is_test_env:
-                return TravelAdvice(
-                    destination=city or "Various destinations",
-                    reason="",
-                    budget="",
-                    tips=[],
-                    hotel=None,
-                    flight=None,
-                    experience=None,
-                )
-            return TravelAdvice(
-                destination="Various destinations",
-                reason="We're sorry, but we couldn't generate a recommendation at this time. Please try again later.",
-                budget="Varies",
-                tips=[
-                    "Try again in a few minutes",
-                    "Contact support if the issue persists",
-                ],
+                return _test_env_advice(city)
+            return _unavailable_advice()
+
+
+async def _stream_turn(client, settings: Settings, messages: list):
+    """one streamed completion. yields ("delta", tool_index, name, fragment)
+    for every tool-argument fragment, then ("message", assistant_dict)"""
+    stream = await client.chat.completions.create(
+        model=settings.openai_model,
+        messages=messages,
+        tools=FUNCTION_SPECS,
+        tool_choice="auto",
+        temperature=0.3,
+        max_tokens=600,
+        stream=True,
+    )
+    content: list[str] = []
+    calls: dict[int, dict] = {}
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if delta.content:
+            content.append(delta.content)
+        for tc in delta.tool_calls or []:
+            call = calls.setdefault(
+                tc.index,
+                {"id": "", "type": "function", "function": {"name": "", "arguments": ""}},
             )
+            if tc.id:
+                call["id"] = tc.id
+            if tc.function and tc.function.name:
+                call["function"]["name"] += tc.function.name
+            if tc.function and tc.function.arguments:
+                call["function"]["arguments"] += tc.function.arguments
+                yield ("delta", tc.index, call["function"]["name"], tc.function.arguments)
+
+    message = {"role": "assistant", "content": "".join(content) or None}
+    if calls:
+        message["tool_calls"] = [calls[i] for i in sorted(calls)]
+    yield ("message", message)
+
+
+async def stream_advice(user_query: str, settings: Settings):
+    """generate_advice as a stream of (event, data) pairs for server-sent events.
+
+    events: destination, tool_result (one per search as it finishes),
+    advice_delta (raw return_advice argument fragments as the model writes
+    them), advice (the validated TravelAdvice) and error.
+    """
+    city, theme = resolve_destination(user_query)
+    yield "destination", {"city": city, "theme": theme}
+
+    is_test_env = _is_test_env(settings)
+    refusal = _impossible_destination(theme)
+    if refusal is not None:
+        yield "advice", refusal.model_dump()
+        return
+
+    messages = _build_messages(user_query, city, settings)
+    client = get_clients(settings).async_openai
+    try:
+        for _ in range(MAX_ITERATIONS):
+            message = None
+            async for item in _stream_turn(client, settings, messages):
+                if item[0] == "delta":
+                    _, index, name, fragment = item
+                    if name == "return_advice":
+                        yield "advice_delta", {"index": index, "delta": fragment}
+                else:
+                    message = item[1]
+            messages.append(message)
+
+            tool_calls = message.get("tool_calls")
+            if not tool_calls:
+                break
+
+            calls = []
+            for call in tool_calls:
+                fn = call["function"]["name"]
+                calls.append((call, fn, _tool_args(fn, call["function"]["arguments"], city)))
+
+            for _, fn, args in calls:
+                if fn == "return_advice":
+                    advice = _finalise_advice(args, city, is_test_env)
+                    yield "advice", advice.model_dump()
+                    return
+                if fn not in SEARCH_TOOLS:
+                    yield "advice", parse_free_response().model_dump()
+                    return
+
+            # run the searches concurrently and report each one as it lands
+            async def run(i: int, fn: str, args: dict):
+                return i, await _run_search_tool(fn, args, city, settings.tool_timeout)
+
+            results: list = [None] * len(calls)
+            for done in asyncio.as_completed(
+                [run(i, fn, args) for i, (_, fn, args) in enumerate(calls)]
+            ):
+                i, rows = await done
+                results[i] = rows
+                yield "tool_result", {"name": calls[i][1], "results": rows}
+
+            for (call, _, _), rows in zip(calls, results):
+                messages.append(
+                    {
+                        "role": "tool",
+                        "tool_call_id": call["id"],
+                        "content": json.dumps(rows, separators=(",", ":")),
+                    }
+                )
+    except Exception as e:
+        logger.error(f"Streaming advice failed: {e}")
+        yield "error", {"detail": "The recommendation stream was interrupted."}
+        fallback = _test_env_advice(city) if is_test_env else _unavailable_advice()
+        yield "advice", fallback.model_dump()
+        return
+
+    fallback = _test_env_advice(city) if is_test_env else parse_free_response()
+    yield "advice", fallback.model_dump()
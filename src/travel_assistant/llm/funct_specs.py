@@ -28,17 +28,73 @@ SEARCH_PARAMS = {
     "required": ["query"],
 }
 
+# hotels and experiences: budget limits applied before ranking
+FILTER_PARAMS = {
+    "type": "object",
+    "properties": {
+        **SEARCH_PARAMS["properties"],
+        "max_price": {
+            "type": "number",
+            "description": "Highest acceptable price (per night for hotels)",
+        },
+        "min_rating": {
+            "type": "number",
+            "minimum": 0,
+            "maximum": 5,
+            "description": "Lowest acceptable rating",
+        },
+    },
+    "required": ["query"],
+}
+
+FLIGHT_PARAMS = {
+    "type": "object",
+    "properties": {
+        **SEARCH_PARAMS["properties"],
+        "city": {
+            "type": "string",
+            "description": "Arrival city or airport code (e.g. New York or JFK)",
+        },
+        "origin": {
+            "type": "string",
+            "description": "Departure airport code, e.g. LHR",
+        },
+        "date_from": {
+            "type": "string",
+            "format": "date",
+            "description": "Earliest departure date (YYYY-MM-DD)",
+        },
+        "date_to": {
+            "type": "string",
+            "format": "date",
+            "description": "Latest departure date (YYYY-MM-DD)",
+        },
+        "max_duration_hours": {
+            "type": "number",
+            "description": "Longest acceptable flight time in hours",
+        },
+        "max_price": {"type": "number", "description": "Highest acceptable fare"},
+        "sort": {
+            "type": "string",
+            "enum": ["depart", "price", "duration"],
+            "default": "depart",
+            "description": "Order results by departure date, price or flight time",
+        },
+    },
+    "required": ["query"],
+}
+
 # export individual function specs
 hotel_fn_spec = create_tool_spec(
-    "search_hotels", "Search hotels in our catalogue", SEARCH_PARAMS
+    "search_hotels", "Search hotels in our catalogue", FILTER_PARAMS
 )
 
 flight_fn_spec = create_tool_spec(
-    "search_flights", "Search available flights", SEARCH_PARAMS
+    "search_flights", "Search available flights", FLIGHT_PARAMS
 )
 
 experience_fn_spec = create_tool_spec(
-    "search_experiences", "Search travel experiences and activities", SEARCH_PARAMS
+    "search_experiences", "Search travel experiences and activities", FILTER_PARAMS
 )
 
 return_advice_fn_spec = create_tool_spec(
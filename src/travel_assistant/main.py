@@ -1,5 +1,10 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from travel_assistant.api.routes import router
+from travel_assistant.core.clients import close_clients, get_clients
+from travel_assistant.core.config import get_settings
+from travel_assistant.retrieval.registry import get_store_registry
 from dotenv import load_dotenv
 from travel_assistant.core.logging import setup_logging
 
@@ -7,11 +12,30 @@ from travel_assistant.core.logging import setup_logging
 load_dotenv()
 setup_logging()
 
+if get_settings().store_preload:
+    # pre-fork servers import the app once in the master, so the stores are
+    # shared copy-on-write by every worker they fork
+    get_store_registry().warm_up()
+
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """open the shared OpenAI connection pools on startup, close them on shutdown.
+    the vector stores load in the background meanwhile (see /ready)"""
+    get_clients()
+    if get_settings().store_warmup:
+        get_store_registry().start_warm_up()
+    yield
+    await close_clients()
+
+
 # initialize FastAPI app
 app = FastAPI(
     title="VAA GenAI Travel Assistant",
     description="Production-grade travel advice grounded in seed data",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # include API routes
@@ -28,3 +52,10 @@ def read_root():
 def health_check():
     """Return the health status of the API."""
     return {"status": "healthy"}
+
+
+@app.get("/ready", summary="Readiness check endpoint")
+def readiness_check():
+    """Return 200 once every vector store is loaded, 503 until then."""
+    status = get_store_registry().status()
+    return JSONResponse(status, status_code=200 if status["ready"] else 503)
@@ -1,17 +1,13 @@
 """very small helper to extract or choose destination + theme."""
 
-import re, random, json
-from pathlib import Path
-from travel_assistant.core.config import get_settings
+import re, random
 from travel_assistant.retrieval import get_all_cities
+from travel_assistant.retrieval.catalogue_loader import load_json
+from travel_assistant.nlp.matcher import get_place_matcher, strip_match
 
-# LOAD EXPERIENCE ONCE
+# LOAD EXPERIENCE ONCE (parsed and cached by the catalogue loader)
 
-PROJECT_ROOT = Path(__file__).resolve().parents[3]
-CAT_PATH = PROJECT_ROOT / "seed_data" / "experiences_catalogue.json"
-
-with CAT_PATH.open(encoding="utf-8") as f:
-    EXPERIENCES = json.load(f)
+EXPERIENCES = load_json("experiences")
 
 CITIES = {row["city"] for row in EXPERIENCES}
 
@@ -20,16 +16,12 @@ CITIES = {row["city"] for row in EXPERIENCES}
 
 
 def parse(query: str):
-    """Very basic parser to extract a known city from the query, if any."""
-    cities = get_all_cities()
-    for city in cities:
-        if city.lower() in query.lower():
-            # found a city name in the query
-            theme = query.replace(city, "", 1).strip(
-                ",. "
-            )  # theme = query without the city
-            return city, theme
-    return None, query  # no known city found
+    """Extract a known city (or arrival airport code) from the query, if any."""
+    match = get_place_matcher().find_city(query)
+    if match is None:
+        return None, query  # no known city found
+    # theme = query without the city
+    return match.city, strip_match(query, match)
 
 
 def pick_city(theme: str):
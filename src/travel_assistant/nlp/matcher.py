@@ -0,0 +1,146 @@
+"""compiled place-name matcher for query parsing.
+
+one alternation regex over every catalogue city and country name (longest
+names first, word-bounded, case-insensitive) plus a case-sensitive one over
+arrival airport codes. the regexes are compiled once per catalogue version,
+and a lookup returns the leftmost match, taking the longest name at that
+position ("Washington DC" over "Washington").
+
+an airport code only counts in a route ("to JFK", "LHR-JFK", "-> JFK") or
+when the query names no city or country: in "SEA views in Miami" the
+capitalised word is not Seattle.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Literal
+
+from travel_assistant.retrieval.catalogue_loader import catalogue_signature
+from travel_assistant.retrieval.profiles import (
+    COUNTRY_ALIASES,
+    canonical_country,
+    get_profile_table,
+)
+
+# the hub every flight departs from; as a code in a query it names the
+# origin, not the destination
+HOME_AIRPORTS = {"LHR"}
+
+# what may precede an airport code that names the destination of a route
+_ROUTE = re.compile(
+    r"(?:(?<![\w])(?i:to|into)\s+"  # "fly to JFK", "FLIGHTS TO JFK"
+    r"|(?:->|→)\s*"  # "LHR -> JFK"
+    r"|(?<![\w])[A-Z]{3}\s*[-–]\s*)$"  # "LHR-JFK"
+)
+
+
+@dataclass(frozen=True)
+class PlaceMatch:
+    kind: Literal["city", "airport", "country"]
+    text: str
+    start: int
+    end: int
+    country: str
+    city: str | None = None  # None for country matches
+
+
+def _alternation(names, flags=0) -> re.Pattern | None:
+    names = sorted(set(names), key=lambda n: (-len(n), n))
+    if not names:
+        return None
+    body = "|".join(re.escape(n) for n in names)
+    return re.compile(rf"(?<![\w])(?:{body})(?![\w])", flags)
+
+
+class PlaceMatcher:
+    def __init__(
+        self,
+        cities: dict[str, tuple[str, str]],
+        countries: dict[str, str],
+        airports: dict[str, tuple[str, str]],
+    ) -> None:
+        """cities / airports map a lower-cased name or code to (city, country);
+        countries map a lower-cased name or alias to the canonical country"""
+        self.cities = cities
+        self.countries = countries
+        self.airports = airports
+        self._names = _alternation(list(cities) + list(countries), re.IGNORECASE)
+        self._codes = _alternation(airports)
+
+    @classmethod
+    def from_catalogues(cls) -> PlaceMatcher:
+        table = get_profile_table()
+        cities, countries, airports = {}, {}, {}
+        for profile in table.by_city.values():
+            cities[profile.city.lower()] = (profile.city, profile.country)
+            countries[profile.country.lower()] = profile.country
+            for code in profile.airports:
+                if code not in HOME_AIRPORTS:
+                    airports[code] = (profile.city, profile.country)
+        for alias in COUNTRY_ALIASES:
+            countries.setdefault(alias, canonical_country(alias))
+        # a city name wins over a country alias spelled the same way
+        for name in cities:
+            countries.pop(name, None)
+        return cls(cities, countries, airports)
+
+    def _candidates(self, query: str) -> list[PlaceMatch]:
+        found = []
+        if self._names is not None:
+            for m in self._names.finditer(query):
+                name = m.group(0).lower()
+                if name in self.cities:
+                    city, country = self.cities[name]
+                    found.append(
+                        PlaceMatch("city", m.group(0), m.start(), m.end(), country, city)
+                    )
+                else:
+                    country = self.countries[name]
+                    found.append(
+                        PlaceMatch("country", m.group(0), m.start(), m.end(), country)
+                    )
+        if self._codes is not None:
+            named = bool(found)
+            for m in self._codes.finditer(query):
+                if named and not _ROUTE.search(query, 0, m.start()):
+                    continue
+                city, country = self.airports[m.group(0)]
+                found.append(
+                    PlaceMatch("airport", m.group(0), m.start(), m.end(), country, city)
+                )
+        return found
+
+    def find_all(self, query: str) -> list[PlaceMatch]:
+        """every city, country and airport mention, in query order"""
+        return sorted(self._candidates(query), key=lambda m: (m.start, -m.end))
+
+    def find(self, query: str) -> PlaceMatch | None:
+        """leftmost match, longest at that position"""
+        return min(self._candidates(query), key=lambda m: (m.start, -m.end), default=None)
+
+    def find_city(self, query: str) -> PlaceMatch | None:
+        """leftmost city or airport mention (country mentions are skipped)"""
+        return min(
+            (m for m in self._candidates(query) if m.city),
+            key=lambda m: (m.start, -m.end),
+            default=None,
+        )
+
+
+@lru_cache(maxsize=2)
+def _matcher(signature: tuple) -> PlaceMatcher:
+    return PlaceMatcher.from_catalogues()
+
+
+def get_place_matcher() -> PlaceMatcher:
+    """matcher for the current seed data (recompiled when it changes)"""
+    return _matcher(catalogue_signature())
+
+
+def strip_match(query: str, match: PlaceMatch) -> str:
+    """the query with the matched place removed, e.g. the theme of the trip"""
+    rest = f"{query[: match.start]} {query[match.end :]}"
+    return " ".join(rest.split()).strip(" ,.")
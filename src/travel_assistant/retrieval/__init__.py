@@ -1,7 +1,13 @@
 from .search import search_hotels, search_flights, search_experiences  # noqa: F401
+from .search import (  # noqa: F401
+    asearch_hotels,
+    asearch_flights,
+    asearch_experiences,
+)
+from .search import SearchRequest, search_many, asearch_many  # noqa: F401
 
 from .catalogue_loader import load_cities
 
 
-def get_all_cities() -> set[str]:
+def get_all_cities() -> frozenset[str]:
     return load_cities()
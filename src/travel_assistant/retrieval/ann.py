@@ -0,0 +1,127 @@
+"""faiss index types for the vector stores.
+
+    flat      exact brute force (the default; right for the seed catalogue)
+    ivf_flat  inverted lists over k-means cells; nprobe cells scanned per query
+    hnsw      graph search; efSearch candidates explored per query
+    ivf_pq    inverted lists with product-quantised vectors, for catalogues
+              that don't fit in memory as float32
+
+the non-flat types are trained when the index is built (scripts/build_index.py)
+and tuned per query through faiss SearchParameters, so one shared index can
+serve different nprobe / efSearch values from several threads. every type uses
+the inner-product metric over l2-normalised vectors, so faiss scores are cosine
+similarities.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Literal
+
+import faiss
+import numpy as np
+
+IndexType = Literal["flat", "ivf_flat", "hnsw", "ivf_pq"]
+INDEX_TYPES: tuple[str, ...] = ("flat", "ivf_flat", "hnsw", "ivf_pq")
+
+# faiss wants ~39 training points per k-means centroid
+MIN_POINTS_PER_CENTROID = 39
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    """how to build an index; sizes left as None are derived from the row count"""
+
+    kind: IndexType = "flat"
+    nlist: int | None = None
+    pq_m: int = 64
+    pq_nbits: int = 8
+    hnsw_m: int = 32
+    ef_construction: int = 200
+
+    @classmethod
+    def from_settings(cls, settings) -> IndexSpec:
+        return cls(
+            kind=settings.index_type,
+            nlist=settings.index_nlist,
+            pq_m=settings.index_pq_m,
+            pq_nbits=settings.index_pq_nbits,
+            hnsw_m=settings.hnsw_m,
+            ef_construction=settings.hnsw_ef_construction,
+        )
+
+
+def _nlist(spec: IndexSpec, n: int) -> int:
+    """requested cells, or ~4 sqrt(n); never more than the rows can train"""
+    wanted = spec.nlist or int(4 * math.sqrt(n))
+    return max(1, min(wanted, n // MIN_POINTS_PER_CENTROID))
+
+
+def factory_string(spec: IndexSpec, d: int, n: int) -> str:
+    if spec.kind == "flat":
+        return "Flat"
+    if spec.kind == "hnsw":
+        return f"HNSW{spec.hnsw_m},Flat"
+    nlist = _nlist(spec, n)
+    if spec.kind == "ivf_flat":
+        return f"IVF{nlist},Flat"
+    if spec.kind == "ivf_pq":
+        if d % spec.pq_m:
+            raise ValueError(f"pq_m={spec.pq_m} must divide the dimension {d}")
+        # each sub-quantiser trains 2**nbits centroids on the rows
+        nbits = max(1, min(spec.pq_nbits, int(math.log2(max(n, 2)))))
+        return f"IVF{nlist},PQ{spec.pq_m}x{nbits}"
+    raise ValueError(f"unknown index type {spec.kind!r}")
+
+
+def build_index(
+    vectors: np.ndarray, spec: IndexSpec, metric: int = faiss.METRIC_INNER_PRODUCT
+) -> faiss.Index:
+    """train (if needed) and fill an index of the given type. the stores pass
+    l2-normalised vectors, so the inner product is the cosine similarity"""
+    n, d = vectors.shape
+    index = faiss.index_factory(d, factory_string(spec, d, n), metric)
+    if spec.kind == "hnsw":
+        index.hnsw.efConstruction = spec.ef_construction
+    if spec.kind == "ivf_pq":
+        # polysemous codes only help hamming pre-filtering, which we don't use,
+        # and their training dominates the build time
+        faiss.downcast_index(faiss.extract_index_ivf(index)).do_polysemous_training = False
+    if not index.is_trained:
+        index.train(vectors)
+    index.add(vectors)
+    ivf = _ivf(index)
+    if ivf is not None:
+        # lets filtered searches reconstruct candidate rows by id
+        ivf.make_direct_map()
+    return index
+
+
+def _ivf(index: faiss.Index):
+    try:
+        return faiss.extract_index_ivf(index)
+    except RuntimeError:
+        return None
+
+
+def index_kind(index: faiss.Index) -> IndexType:
+    if isinstance(index, faiss.IndexHNSW):
+        return "hnsw"
+    ivf = _ivf(index)
+    if ivf is not None:
+        ivf = faiss.downcast_index(ivf)
+        return "ivf_pq" if isinstance(ivf, faiss.IndexIVFPQ) else "ivf_flat"
+    return "flat"
+
+
+def search_params(
+    index: faiss.Index, nprobe: int | None = None, ef_search: int | None = None
+) -> faiss.SearchParameters | None:
+    """per-query tuning for the index's type (None for flat indexes)"""
+    kind = index_kind(index)
+    if kind in ("ivf_flat", "ivf_pq") and nprobe:
+        return faiss.SearchParametersIVF(nprobe=nprobe)
+    if kind == "hnsw" and ef_search:
+        return faiss.SearchParametersHNSW(efSearch=ef_search)
+    return None
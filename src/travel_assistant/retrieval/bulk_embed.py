@@ -0,0 +1,345 @@
+"""bulk embedding pipeline for index builds.
+
+- batches are packed greedily up to a per-request token budget (default a
+  margin under the API's 300k-token request cap) and its 2,048-input cap, so
+  a build takes as few requests as the API allows
+- the model also limits each input (8,191 tokens): a longer text is truncated
+  up front, with a warning, instead of failing its whole batch with a 400
+- several batches are in flight at once; on a 429 the in-flight cap halves
+  and every worker waits out the server's retry-after, then the cap grows
+  back one step per run of successful requests
+- finished batches go to an optional sqlite checkpoint, so a rebuild that
+  dies half way resumes without re-embedding what it already paid for
+- progress is reported after every batch
+
+queries still go through vector_store.embed_query; this is for thousands of rows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import random
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+import numpy as np
+import openai
+from openai import AsyncOpenAI
+
+from travel_assistant.core.clients import get_clients
+from travel_assistant.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+# errors worth another attempt; anything else (bad input, auth) is raised
+TRANSIENT_ERRORS = (
+    openai.RateLimitError,
+    openai.APIConnectionError,
+    openai.APITimeoutError,
+    openai.InternalServerError,
+)
+
+
+@lru_cache
+def _encoding():
+    """tiktoken encoding for the embedding models, None without tiktoken"""
+    if importlib.util.find_spec("tiktoken") is None:
+        return None
+    import tiktoken
+
+    return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str) -> int:
+    """exact with tiktoken installed, otherwise a deliberately high estimate
+    (english averages ~4 bytes per token; assume 3)"""
+    enc = _encoding()
+    if enc is not None:
+        return len(enc.encode(text, disallowed_special=()))
+    return len(text.encode("utf-8")) // 3 + 1
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """text cut down to at most max_tokens, as count_tokens counts them"""
+    if count_tokens(text) <= max_tokens:
+        return text
+    enc = _encoding()
+    if enc is not None:
+        return enc.decode(enc.encode(text, disallowed_special=())[:max_tokens])
+    # the estimate is bytes // 3 + 1; a split character is dropped
+    return text.encode("utf-8")[: (max_tokens - 1) * 3].decode("utf-8", "ignore")
+
+
+def plan_batches(
+    texts: Sequence[str], max_tokens: int, max_inputs: int = 2048
+) -> List[List[int]]:
+    """split text positions into in-order batches under both limits.
+    a single text over the budget gets a batch of its own"""
+    batches: List[List[int]] = []
+    current: List[int] = []
+    used = 0
+    for i, text in enumerate(texts):
+        tokens = count_tokens(text)
+        if current and (used + tokens > max_tokens or len(current) >= max_inputs):
+            batches.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += tokens
+    if current:
+        batches.append(current)
+    return batches
+
+
+class EmbeddingCheckpoint:
+    """finished embeddings keyed by (model, exact text) in a sqlite file"""
+
+    def __init__(self, path: Path, model: str) -> None:
+        self.path = path
+        self.model = model
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path))
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB)"
+        )
+        self._db.commit()
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.model}\x00{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, texts: Sequence[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        for text in set(texts):
+            row = self._db.execute(
+                "SELECT vec FROM embeddings WHERE key = ?", (self._key(text),)
+            ).fetchone()
+            if row is not None:
+                found[text] = np.frombuffer(row[0], dtype=np.float32)
+        return found
+
+    def put_many(self, texts: Sequence[str], vectors: Sequence) -> None:
+        self._db.executemany(
+            "INSERT OR REPLACE INTO embeddings VALUES (?, ?)",
+            [
+                (self._key(t), np.asarray(v, dtype=np.float32).tobytes())
+                for t, v in zip(texts, vectors)
+            ],
+        )
+        self._db.commit()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def remove(self) -> None:
+        self.close()
+        self.path.unlink(missing_ok=True)
+
+
+@dataclass
+class EmbedProgress:
+    total: int
+    done: int = 0
+    resumed: int = 0
+    requests: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+    started: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def __str__(self) -> str:
+        fresh = self.done - self.resumed
+        rate = fresh / self.elapsed if self.elapsed > 0 else 0.0
+        return (
+            f"{self.done}/{self.total} embedded ({self.resumed} from checkpoint), "
+            f"{self.requests} requests, {self.retries} retries "
+            f"({self.rate_limited} rate limited), {rate:.0f} texts/s"
+        )
+
+
+def log_progress(progress: EmbedProgress) -> None:
+    logger.info(f"Bulk embedding: {progress}")
+
+
+class AdaptiveLimit:
+    """cap on in-flight requests that backs off on rate limits.
+
+    throttle() halves the cap and holds every new request until the cooldown
+    ends; after `recover` successes in a row the cap grows by one again."""
+
+    def __init__(self, limit: int, recover: int = 8) -> None:
+        self.max_limit = limit
+        self.limit = limit
+        self.recover = recover
+        self._active = 0
+        self._streak = 0
+        self._resume_at = 0.0
+        self._cond = asyncio.Condition()
+
+    async def __aenter__(self) -> AdaptiveLimit:
+        async with self._cond:
+            while True:
+                wait = self._resume_at - time.monotonic()
+                if wait > 0:
+                    self._cond.release()
+                    try:
+                        await asyncio.sleep(wait)
+                    finally:
+                        await self._cond.acquire()
+                    continue
+                if self._active < self.limit:
+                    break
+                await self._cond.wait()
+            self._active += 1
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        async with self._cond:
+            self._active -= 1
+            self._cond.notify_all()
+
+    def succeeded(self) -> None:
+        self._streak += 1
+        if self._streak >= self.recover and self.limit < self.max_limit:
+            self.limit += 1
+            self._streak = 0
+
+    def throttle(self, cooldown: float) -> None:
+        self._streak = 0
+        self.limit = max(1, self.limit // 2)
+        self._resume_at = max(self._resume_at, time.monotonic() + cooldown)
+
+
+def _retry_after(error: Exception) -> float | None:
+    """seconds the server asked us to wait, if it said"""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    try:
+        if "retry-after-ms" in headers:
+            return float(headers["retry-after-ms"]) / 1000
+        if "retry-after" in headers:
+            return float(headers["retry-after"])
+    except ValueError:
+        pass
+    return None
+
+
+def _backoff(attempt: int, base: float = 0.5, cap: float = 30.0) -> float:
+    """full-jitter exponential backoff"""
+    return random.uniform(0, min(cap, base * 2**attempt))
+
+
+async def abulk_embed(
+    texts: Sequence[str],
+    *,
+    model: str | None = None,
+    client: AsyncOpenAI | None = None,
+    concurrency: int | None = None,
+    max_batch_tokens: int | None = None,
+    max_batch_inputs: int | None = None,
+    max_input_tokens: int | None = None,
+    max_attempts: int | None = None,
+    checkpoint: Path | None = None,
+    progress: Callable[[EmbedProgress], None] | None = log_progress,
+) -> List[List[float]]:
+    """embed texts in the order given; see the module docstring"""
+    settings = get_settings()
+    model = model or settings.embed_model
+    concurrency = concurrency or settings.embed_concurrency
+    max_batch_tokens = max_batch_tokens or settings.embed_batch_tokens
+    max_batch_inputs = max_batch_inputs or settings.embed_batch_inputs
+    max_input_tokens = max_input_tokens or settings.embed_input_tokens
+    max_attempts = max_attempts or settings.embed_max_attempts
+    # retries are ours, so a 429 also slows the other workers down
+    client = (client or get_clients().async_openai).with_options(max_retries=0)
+
+    results: List[np.ndarray | None] = [None] * len(texts)
+    state = EmbedProgress(total=len(texts))
+    store = EmbeddingCheckpoint(checkpoint, model) if checkpoint else None
+    try:
+        if store is not None:
+            saved = store.get_many(texts)
+            for i, text in enumerate(texts):
+                if text in saved:
+                    results[i] = saved[text]
+            state.done = state.resumed = sum(r is not None for r in results)
+
+        # embed each distinct text once
+        pending: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            if results[i] is None:
+                pending.setdefault(text, []).append(i)
+        unique = list(pending)
+        # what is sent; results and the checkpoint stay keyed on the full text
+        inputs = [truncate_tokens(t, max_input_tokens) for t in unique]
+        truncated = sum(a is not b for a, b in zip(inputs, unique))
+        if truncated:
+            logger.warning(
+                f"{truncated} texts over {max_input_tokens} tokens were truncated"
+            )
+        batches = plan_batches(inputs, max_batch_tokens, max_batch_inputs)
+        limit = AdaptiveLimit(concurrency)
+
+        async def run(batch: List[int]) -> None:
+            chunk = [unique[j] for j in batch]
+            sent = [inputs[j] for j in batch]
+            for attempt in range(max_attempts):
+                async with limit:
+                    try:
+                        state.requests += 1
+                        resp = await client.embeddings.create(model=model, input=sent)
+                    except TRANSIENT_ERRORS as e:
+                        if attempt + 1 == max_attempts:
+                            raise
+                        state.retries += 1
+                        wait = _retry_after(e)
+                        if isinstance(e, openai.RateLimitError):
+                            state.rate_limited += 1
+                            limit.throttle(wait if wait is not None else _backoff(attempt))
+                        logger.warning(f"Embedding batch failed ({e}), retrying")
+                        delay = 0.0 if isinstance(e, openai.RateLimitError) else _backoff(attempt)
+                    else:
+                        limit.succeeded()
+                        break
+                await asyncio.sleep(delay)
+            vectors = [d.embedding for d in sorted(resp.data, key=lambda d: d.index)]
+            if store is not None:
+                store.put_many(chunk, vectors)
+            for text, vec in zip(chunk, vectors):
+                for i in pending[text]:
+                    results[i] = vec
+                state.done += len(pending[text])
+            if progress is not None:
+                progress(state)
+
+        tasks = [asyncio.create_task(run(b)) for b in batches]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for t in tasks:
+                t.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+    finally:
+        if store is not None:
+            store.close()
+
+    if store is not None:
+        # the index build owns the vectors now
+        store.remove()
+    return [np.asarray(r, dtype=np.float32).tolist() for r in results]
+
+
+def bulk_embed(texts: Sequence[str], **kwargs) -> List[List[float]]:
+    """blocking wrapper around abulk_embed for scripts"""
+    return asyncio.run(abulk_embed(texts, **kwargs))
@@ -0,0 +1,268 @@
+"""precomputed per-destination recommendation bundles.
+
+scripts/build_index.py writes data/bundles.json: for every destination city,
+its best-rated hotels in each pricing tier, the cheapest flights from LHR
+departing on or after the as-of date, and one experience for each of the
+city's most common tags. the as-of date is the build date, or the start of
+the flight schedule once the build date is past its last departure (the seed
+schedule is a snapshot ending 2025-08-31, so the committed bundles are as of
+its first departure, 2023-05-25). the agent puts the destination's bundle in the system
+prompt (llm/agent.py), so most answers need no search tool round trip; the
+tools are still there for anything the bundle doesn't cover.
+
+prices come from the parsed numeric columns (retrieval/normalise.py); unknown
+prices are left out of the bundle rather than guessed.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+import logging
+import math
+from collections import Counter, defaultdict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+import orjson
+
+from travel_assistant.retrieval.flights import FlightIndex
+from travel_assistant.retrieval.normalise import numeric_columns
+from travel_assistant.retrieval.registry import get_store_registry
+
+logger = logging.getLogger(__name__)
+
+BUNDLES_FILE = "bundles.json"
+ORIGIN = "LHR"
+
+
+def _value(x) -> float | None:
+    """a float rounded for the prompt; None if unknown"""
+    if x is None or math.isnan(x):
+        return None
+    return round(float(x), 2)
+
+
+def _compact(d: Dict) -> Dict:
+    return {k: v for k, v in d.items() if v is not None}
+
+
+def _last_if_nan(x: float) -> float:
+    return math.inf if math.isnan(x) else x
+
+
+def _tags(row: Dict) -> List[str]:
+    tags = str(row.get("tags") or "").split(",")
+    return [t.strip().lower() for t in tags if t.strip()]
+
+
+def _by_city(rows: Sequence[Dict]) -> Dict[str, List[int]]:
+    groups: Dict[str, List[int]] = defaultdict(list)
+    for i, row in enumerate(rows):
+        city = str(row.get("city") or "").strip().lower()
+        if city:
+            groups[city].append(i)
+    return groups
+
+
+def top_hotels(
+    rows: Sequence[Dict], ids: Sequence[int], per_tier: int = 2
+) -> List[Dict]:
+    """the best-rated hotels of each pricing tier (cheapest first on a tie).
+    the seed data lists most hotels once per tier; each is picked only once"""
+    numeric = numeric_columns([rows[i] for i in ids])
+    nan = [math.nan] * len(ids)
+    rating, price = numeric.get("rating", nan), numeric.get("price", nan)
+    names = [rows[i].get("hotel_name") or rows[i].get("name") for i in ids]
+    tiers: Dict[str, List[int]] = defaultdict(list)
+    for j, i in enumerate(ids):
+        tiers[rows[i].get("pricing_tier") or "unknown"].append(j)
+
+    picks, used = [], set()
+    for tier in sorted(tiers):
+        ranked = sorted(
+            tiers[tier],
+            key=lambda j: (_last_if_nan(-rating[j]), _last_if_nan(price[j])),
+        )
+        for j in [j for j in ranked if names[j] not in used][:per_tier]:
+            used.add(names[j])
+            picks.append(
+                _compact(
+                    {
+                        "name": names[j],
+                        "tier": tier,
+                        "rating": _value(rating[j]),
+                        "price": _value(price[j]),
+                    }
+                )
+            )
+    return picks
+
+
+def top_experiences(
+    rows: Sequence[Dict], ids: Sequence[int], tags: int = 4
+) -> List[Dict]:
+    """one experience for each of the city's most common tags, cheapest first
+    and never the same experience twice"""
+    price = numeric_columns([rows[i] for i in ids]).get("price", [math.nan] * len(ids))
+    tagged = [_tags(rows[i]) for i in ids]
+    counts = Counter(t for row_tags in tagged for t in row_tags)
+    order = sorted(range(len(ids)), key=lambda j: _last_if_nan(price[j]))
+
+    picks, used = [], set()
+    for tag, _ in sorted(counts.items(), key=lambda c: (-c[1], c[0])):
+        if len(picks) == tags:
+            break
+        j = next((j for j in order if j not in used and tag in tagged[j]), None)
+        if j is None:
+            continue
+        used.add(j)
+        row = rows[ids[j]]
+        picks.append(
+            _compact(
+                {
+                    "tag": tag,
+                    "title": row.get("title") or row.get("name"),
+                    "price": _value(price[j]),
+                    "duration_hours": row.get("duration_hours"),
+                }
+            )
+        )
+    return picks
+
+
+def cheapest_flights(
+    index: FlightIndex, city: str, as_of: dt.date, k: int = 3, origin: str = ORIGIN
+) -> List[Dict]:
+    """the k cheapest flights from origin to city departing on or after as_of.
+    flights with unknown prices sort last in departure order; no seed fare
+    parses yet ("[object Object]"), so for now this is the next k departures"""
+    found = index.search(city, k, origin=origin, date_from=as_of, sort="price")
+    numeric = numeric_columns(found)
+    price = numeric.get("price", [math.nan] * len(found))
+    hours = numeric.get("duration_hours", [math.nan] * len(found))
+    return [
+        _compact(
+            {
+                "flight_number": row.get("flight_number"),
+                "from": row.get("airport_depart"),
+                "to": row.get("airport_arrive"),
+                "date": row.get("depart_date"),
+                "duration_hours": _value(hours[j]),
+                "price": _value(price[j]),
+            }
+        )
+        for j, row in enumerate(found)
+    ]
+
+
+def default_as_of(flights: Sequence[Dict], today: dt.date | None = None) -> dt.date:
+    """today, or the first departure in the flight catalogue when today is
+    past its last one, so a snapshot schedule still yields bundled flights"""
+    today = today or dt.date.today()
+    dates = sorted(str(r["depart_date"])[:10] for r in flights if r.get("depart_date"))
+    if not dates or today.isoformat() <= dates[-1]:
+        return today
+    start = dt.date.fromisoformat(dates[0])
+    logger.warning(
+        f"the flight schedule ends on {dates[-1]}; bundling flights as of its "
+        f"first departure, {start}"
+    )
+    return start
+
+
+def build_bundles(
+    catalogues: Dict[str, Sequence[Dict]],
+    *,
+    as_of: dt.date,
+    hotels_per_tier: int = 2,
+    flights: int = 3,
+    tags: int = 4,
+) -> Dict[str, Dict]:
+    """lower-cased city -> bundle, for every city with hotels or experiences"""
+    hotels = catalogues.get("hotels", [])
+    experiences = catalogues.get("experiences", [])
+    flight_index = FlightIndex(catalogues.get("flights", []))
+    hotel_ids, experience_ids = _by_city(hotels), _by_city(experiences)
+
+    bundles = {}
+    for key in sorted(hotel_ids.keys() | experience_ids.keys()):
+        if key in hotel_ids:
+            first = hotels[hotel_ids[key][0]]
+        else:
+            first = experiences[experience_ids[key][0]]
+        bundles[key] = {
+            "city": str(first["city"]).strip(),
+            "hotels": top_hotels(hotels, hotel_ids.get(key, []), hotels_per_tier),
+            "flights": cheapest_flights(flight_index, key, as_of, flights),
+            "experiences": top_experiences(
+                experiences, experience_ids.get(key, []), tags
+            ),
+        }
+    return bundles
+
+
+def write_bundles(bundles: Dict[str, Dict], path: Path, *, as_of: dt.date) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    doc = {"as_of": as_of.isoformat(), "origin": ORIGIN, "cities": bundles}
+    tmp.write_bytes(orjson.dumps(doc, option=orjson.OPT_INDENT_2))
+    tmp.replace(path)
+
+
+@lru_cache(maxsize=2)
+def _read(path: Path, signature: tuple) -> Dict:
+    return orjson.loads(path.read_bytes())
+
+
+def get_bundle(city: str | None) -> Dict | None:
+    """the destination's bundle (re-read when the file changes), or None"""
+    if not city:
+        return None
+    path = get_store_registry().data_dir / BUNDLES_FILE
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    doc = _read(path, (st.st_mtime_ns, st.st_size))
+    bundle = doc["cities"].get(city.strip().lower())
+    if bundle is None:
+        return None
+    return {"as_of": doc["as_of"], "origin": doc["origin"], **bundle}
+
+
+def _money(price: float | None) -> str:
+    return f", £{price:g}" if price is not None else ""
+
+
+def bundle_prompt(bundle: Dict) -> str:
+    """the bundle as a few compact lines for the system prompt"""
+    lines = [f"Catalogue picks for {bundle['city']} (as of {bundle['as_of']}):"]
+    if bundle["hotels"]:
+        lines.append(
+            "Hotels: "
+            + "; ".join(
+                f"{h['name']} ({h['tier']}"
+                + (f", rated {h['rating']:g}" if "rating" in h else "")
+                + f"{_money(h.get('price'))})"
+                for h in bundle["hotels"]
+            )
+        )
+    if bundle["flights"]:
+        lines.append(
+            f"Flights from {bundle['origin']}: "
+            + "; ".join(
+                f"{f['flight_number']} {f['from']}-{f['to']} on {f['date']}"
+                + (f", {f['duration_hours']:g}h" if "duration_hours" in f else "")
+                + _money(f.get("price"))
+                for f in bundle["flights"]
+            )
+        )
+    if bundle["experiences"]:
+        lines.append(
+            "Experiences: "
+            + "; ".join(
+                f"{e['title']} ({e['tag']}{_money(e.get('price'))})"
+                for e in bundle["experiences"]
+            )
+        )
+    return "\n".join(lines)
@@ -1,15 +1,57 @@
+"""seed catalogue access.
+
+each catalogue file is parsed once (with orjson) and kept in memory; a file is
+re-read only when its mtime or size changes. derived lookups such as the set
+of cities are cached per catalogue signature, so the per-request cost is a
+few stat calls and a dict lookup.
+"""
+
 from pathlib import Path
-import json
+from functools import lru_cache
+import threading
+
+import orjson
 
 ROOT_DIR = (
     Path(__file__).resolve().parents[3]
 )  # (for catalogue_loader.py, src, retriever, travel_assistant)
 SEED_DIR = ROOT_DIR / "seed_data"
 
+CATALOGUES = ("hotel", "flight", "experiences")
+
+# name -> ((mtime_ns, size), rows)
+_cache: dict[str, tuple[tuple[int, int], list[dict]]] = {}
+_lock = threading.Lock()
+
+
+def _path(name: str) -> Path:
+    return SEED_DIR / f"{name}_catalogue.json"
+
+
+def _file_signature(path: Path) -> tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
 
 def load_json(name: str) -> list[dict]:
-    with open(SEED_DIR / f"{name}_catalogue.json", "r", encoding="utf-8") as f:
-        return json.load(f)
+    """rows of one catalogue. the list is shared, so callers must not mutate it"""
+    path = _path(name)
+    sig = _file_signature(path)
+    cached = _cache.get(name)
+    if cached is not None and cached[0] == sig:
+        return cached[1]
+
+    with _lock:
+        cached = _cache.get(name)
+        if cached is None or cached[0] != sig:
+            cached = (sig, orjson.loads(path.read_bytes()))
+            _cache[name] = cached
+    return cached[1]
+
+
+def catalogue_signature() -> tuple[tuple[int, int], ...]:
+    """(mtime, size) of every catalogue file; changes whenever the seed data does"""
+    return tuple(_file_signature(_path(name)) for name in CATALOGUES)
 
 
 def load_data():
@@ -20,9 +62,22 @@ def load_data():
     }
 
 
-def load_cities() -> set[str]:
-    cities = set()
-    for name in ["hotel", "flight", "experiences"]:
-        data = load_json(name)
-        cities.update({item["city"].lower() for item in data if "city" in item})
-    return cities
+@lru_cache(maxsize=4)
+def _derived(signature: tuple) -> tuple[frozenset[str], frozenset[str]]:
+    cities: set[str] = set()
+    countries: set[str] = set()
+    for name in CATALOGUES:
+        for item in load_json(name):
+            if "city" in item:
+                cities.add(item["city"].lower())
+            if "country" in item:
+                countries.add(item["country"].lower())
+    return frozenset(cities), frozenset(countries)
+
+
+def load_cities() -> frozenset[str]:
+    return _derived(catalogue_signature())[0]
+
+
+def load_countries() -> frozenset[str]:
+    return _derived(catalogue_signature())[1]
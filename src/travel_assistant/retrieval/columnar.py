@@ -0,0 +1,189 @@
+"""memory-mapped columnar storage for vector store metadata.
+
+a store's rows live in a directory next to its index (hotels.faiss ->
+hotels.meta/):
+
+    schema.json        row count and, per column, its name and kind
+    c<i>.npy           int / float / bool columns
+    c<i>.offsets.npy   str / json columns: n + 1 byte offsets into ...
+    c<i>.blob          ... the utf-8 values, back to back
+    c<i>.valid.npy     only for columns with missing values
+
+everything is opened with mmap, so the uvicorn workers share one copy of the
+pages through the page cache, and a row dict is only built when a search
+returns it.
+"""
+
+from __future__ import annotations
+
+import shutil
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+import numpy as np
+import orjson
+
+FORMAT_VERSION = 1
+
+_NUMPY_KINDS = {"int": np.int64, "float": np.float64, "bool": np.bool_}
+
+
+def meta_path(index_path: Path) -> Path:
+    return index_path.with_suffix(".meta")
+
+
+def _kind(values: Iterable) -> str:
+    """narrowest kind that round-trips every non-missing value unchanged"""
+    types = {type(v) for v in values if v is not None}
+    if not types or types == {str}:
+        return "str"
+    if types == {bool}:
+        return "bool"
+    if types == {int}:
+        return "int"
+    if types == {float}:
+        return "float"
+    # mixed ints and floats, lists, dicts ... stored as json text
+    return "json"
+
+
+def write_columns(rows: Sequence[Dict], path: Path) -> None:
+    """write rows (internal __ keys dropped) to a columnar directory, replacing
+    any previous one. readers that still map the old files keep them until
+    they close them"""
+    names: List[str] = []
+    for row in rows:
+        for key in row:
+            if not str(key).startswith("__") and key not in names:
+                names.append(key)
+
+    tmp = path.with_name(path.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+
+    columns = []
+    for i, name in enumerate(names):
+        values = [row.get(name) for row in rows]
+        kind = _kind(values)
+        valid = np.array([v is not None for v in values], dtype=np.bool_)
+        if kind in _NUMPY_KINDS:
+            fill = _NUMPY_KINDS[kind](0)
+            data = np.array([fill if v is None else v for v in values], dtype=_NUMPY_KINDS[kind])
+            np.save(tmp / f"c{i}.npy", data)
+        else:
+            encode = (lambda v: v.encode("utf-8")) if kind == "str" else orjson.dumps
+            encoded = [b"" if v is None else encode(v) for v in values]
+            offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+            np.cumsum([len(b) for b in encoded], out=offsets[1:])
+            np.save(tmp / f"c{i}.offsets.npy", offsets)
+            (tmp / f"c{i}.blob").write_bytes(b"".join(encoded))
+        if not valid.all():
+            np.save(tmp / f"c{i}.valid.npy", valid)
+        columns.append({"name": name, "kind": kind})
+
+    (tmp / "schema.json").write_bytes(
+        orjson.dumps(
+            {"version": FORMAT_VERSION, "rows": len(rows), "columns": columns},
+            option=orjson.OPT_INDENT_2,
+        )
+    )
+    shutil.rmtree(path, ignore_errors=True)
+    tmp.rename(path)
+
+
+class _Column:
+    def __init__(self, path: Path, i: int, name: str, kind: str) -> None:
+        self.name = name
+        self.kind = kind
+        valid = path / f"c{i}.valid.npy"
+        self.valid = np.load(valid, mmap_mode="r") if valid.exists() else None
+        if kind in _NUMPY_KINDS:
+            self.data = np.load(path / f"c{i}.npy", mmap_mode="r")
+        else:
+            self.offsets = np.load(path / f"c{i}.offsets.npy", mmap_mode="r")
+            blob = path / f"c{i}.blob"
+            # an empty file can't be mapped
+            self.blob = (
+                np.memmap(blob, dtype=np.uint8, mode="r")
+                if blob.stat().st_size
+                else np.empty(0, dtype=np.uint8)
+            )
+
+    def get(self, i: int):
+        if self.valid is not None and not self.valid[i]:
+            return None
+        if self.kind in _NUMPY_KINDS:
+            return self.data[i].item()
+        raw = self.blob[self.offsets[i] : self.offsets[i + 1]].tobytes()
+        return raw.decode("utf-8") if self.kind == "str" else orjson.loads(raw)
+
+
+class ColumnarMeta(Sequence):
+    """read-only, lazily materialised rows of a columnar directory.
+
+    indexing returns a fresh dict (with its __id) per call, so callers may
+    mutate what they get back"""
+
+    def __init__(self, path: Path) -> None:
+        schema = orjson.loads((path / "schema.json").read_bytes())
+        if schema.get("version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported metadata format in {path}")
+        self.path = path
+        self._len = schema["rows"]
+        self._columns = [
+            _Column(path, i, c["name"], c["kind"]) for i, c in enumerate(schema["columns"])
+        ]
+        self._by_name = {c.name: c for c in self._columns}
+
+    @property
+    def columns(self) -> List[str]:
+        return [c.name for c in self._columns]
+
+    def __len__(self) -> int:
+        return self._len
+
+    def _row(self, i: int, columns: Sequence[_Column]) -> Dict:
+        row = {c.name: c.get(i) for c in columns}
+        row["__id"] = i
+        return row
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self._len))]
+        i = int(i)
+        if i < 0:
+            i += self._len
+        if not 0 <= i < self._len:
+            raise IndexError(i)
+        return self._row(i, self._columns)
+
+    def __iter__(self) -> Iterator[Dict]:
+        return self.rows()
+
+    def rows(self, keys: Iterable[str] | None = None) -> Iterator[Dict]:
+        """iterate rows, optionally built from just the named columns"""
+        columns = (
+            self._columns
+            if keys is None
+            else [self._by_name[k] for k in keys if k in self._by_name]
+        )
+        for i in range(self._len):
+            yield self._row(i, columns)
+
+    def column(self, name: str):
+        """a whole column: the mapped array for int / float / bool columns
+        without missing values, else a list of values"""
+        col = self._by_name[name]
+        if col.kind in _NUMPY_KINDS and col.valid is None:
+            return col.data
+        if col.kind == "str":
+            # one copy of the blob beats a memmap slice per row
+            blob, offsets = col.blob.tobytes(), col.offsets.tolist()
+            values = [
+                blob[offsets[i] : offsets[i + 1]].decode("utf-8") for i in range(self._len)
+            ]
+            if col.valid is not None:
+                values = [v if ok else None for v, ok in zip(values, col.valid.tolist())]
+            return values
+        return [col.get(i) for i in range(self._len)]
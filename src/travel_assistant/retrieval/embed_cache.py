@@ -0,0 +1,133 @@
+"""query embedding cache.
+
+two tiers, both keyed by (embed_model, normalised text):
+- an in-process LRU bounded by a byte budget
+- an optional sqlite file (e.g. data/embeddings.sqlite) that survives restarts
+
+hit / miss counters are exposed through stats() for logging and dashboards.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from travel_assistant.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+def normalise_text(text: str) -> str:
+    """case-fold and collapse whitespace so trivially different queries share a key"""
+    return " ".join(text.casefold().split())
+
+
+def _key(model: str, text: str) -> str:
+    raw = f"{model}\x00{normalise_text(text)}".encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()
+
+
+class EmbeddingCache:
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, path: Path | None = None):
+        self.max_bytes = max_bytes
+        self._lru: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        self._db: sqlite3.Connection | None = None
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings "
+                "(key TEXT PRIMARY KEY, model TEXT, vec BLOB)"
+            )
+            self._db.commit()
+
+    def get(self, model: str, text: str) -> np.ndarray | None:
+        key = _key(model, text)
+        with self._lock:
+            vec = self._lru.get(key)
+            if vec is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return vec
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT vec FROM embeddings WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    vec = np.frombuffer(row[0], dtype=np.float32)
+                    self._remember(key, vec)
+                    self.hits += 1
+                    self.disk_hits += 1
+                    return vec
+
+            self.misses += 1
+            return None
+
+    def put(self, model: str, text: str, vec) -> np.ndarray:
+        key = _key(model, text)
+        arr = np.asarray(vec, dtype=np.float32)
+        arr.setflags(write=False)
+        with self._lock:
+            self._remember(key, arr)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)",
+                    (key, model, arr.tobytes()),
+                )
+                self._db.commit()
+        return arr
+
+    def _remember(self, key: str, vec: np.ndarray) -> None:
+        """insert into the LRU tier and evict oldest entries over the byte budget"""
+        old = self._lru.pop(key, None)
+        if old is not None:
+            self._bytes -= old.nbytes
+        if vec.nbytes > self.max_bytes:
+            return
+        self._lru[key] = vec
+        self._bytes += vec.nbytes
+        while self._bytes > self.max_bytes:
+            _, evicted = self._lru.popitem(last=False)
+            self._bytes -= evicted.nbytes
+
+    def clear(self) -> None:
+        """drop the in-process tier and reset counters (the disk tier is kept)"""
+        with self._lock:
+            self._lru.clear()
+            self._bytes = 0
+            self.hits = self.disk_hits = self.misses = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._lru),
+            "bytes": self._bytes,
+        }
+
+
+@lru_cache
+def get_embedding_cache() -> EmbeddingCache:
+    """process-wide cache configured from Settings"""
+    settings = get_settings()
+    return EmbeddingCache(
+        max_bytes=settings.embed_cache_max_bytes,
+        path=settings.embed_cache_path,
+    )
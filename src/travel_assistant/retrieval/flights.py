@@ -0,0 +1,180 @@
+"""structured flight search.
+
+the flight rows are sorted once by (airport_arrive, depart_date) into typed
+numpy columns: a destination is a contiguous slice, a date range inside it is
+two bisects, and duration / price / origin limits are vectorised masks over
+what is left. "LHR -> JFK next week, cheapest" needs no embedding call and no
+scan of the other 4,000 rows.
+
+durations and prices come from the numeric columns written by
+scripts/build_index.py (retrieval/normalise.py), or are parsed from the rows
+when those are missing. unknown (NaN) values pass the limits and sort last.
+"""
+
+from __future__ import annotations
+
+import datetime as dt
+from functools import lru_cache
+from typing import Dict, List, Literal, Sequence
+
+import numpy as np
+
+from travel_assistant.retrieval.columnar import ColumnarMeta, meta_path
+from travel_assistant.retrieval.normalise import (
+    numeric_path,
+    parse_duration,
+    parse_number,
+    read_numeric,
+)
+from travel_assistant.retrieval.registry import get_store_registry
+
+FlightSort = Literal["depart", "price", "duration"]
+
+
+def _day(value) -> np.datetime64:
+    if isinstance(value, (dt.date, np.datetime64)):
+        return np.datetime64(value, "D")
+    return np.datetime64(str(value)[:10], "D")
+
+
+def _days(values) -> np.ndarray:
+    """yyyy-mm-dd strings (or missing values) as a datetime64[D] array"""
+    return np.array([str(v)[:10] if v else "NaT" for v in values], dtype="datetime64[D]")
+
+
+# the row fields the index is built from
+COLUMNS = (
+    "airport_arrive",
+    "airport_depart",
+    "city_arrive",
+    "depart_date",
+    "flight_duration",
+    "cabin_type_price",
+)
+
+
+def _codes(values) -> np.ndarray:
+    return np.array([str(v or "").strip().upper() for v in values], dtype=object)
+
+
+class FlightIndex:
+    """flight rows sorted by (arrival airport, departure date)"""
+
+    def __init__(
+        self,
+        rows: Sequence[Dict],
+        columns: Dict[str, Sequence] | None = None,
+        numeric: Dict[str, np.ndarray] | None = None,
+    ) -> None:
+        """rows are only materialised for results; columns (name -> values in
+        row order) default to being read from the rows. numeric holds the
+        pre-parsed price / duration_hours columns, if built"""
+        if columns is None:
+            columns = {k: [r.get(k) for r in rows] for k in COLUMNS}
+        self.rows = rows
+        arrive = _codes(columns["airport_arrive"])
+        day = _days(columns["depart_date"])
+        order = np.lexsort((day, arrive))
+
+        self.ids = order.astype(np.int64)
+        self.arrive = arrive[order]
+        self.day = day[order]
+        self.depart = _codes(columns["airport_depart"])[order]
+        numeric = numeric or {}
+        if "duration_hours" in numeric:
+            minutes = numeric["duration_hours"] * 60
+        else:
+            minutes = [parse_duration(v) for v in columns["flight_duration"]]
+        if "price" in numeric:
+            price = numeric["price"]
+        else:
+            price = [parse_number(v) for v in columns["cabin_type_price"]]
+        self.minutes = np.asarray(minutes, dtype=np.float32)[order]
+        self.price = np.asarray(price, dtype=np.float32)[order]
+
+        # destination -> [start, end) slice of the sorted columns
+        codes, starts = np.unique(self.arrive, return_index=True)
+        ends = np.append(starts[1:], len(order))
+        self._slices = {c: (int(s), int(e)) for c, s, e in zip(codes, starts, ends)}
+        self._by_city: Dict[str, List[str]] = {}
+        for city, code in zip(columns["city_arrive"], arrive):
+            city = str(city or "").strip().lower()
+            if city and code not in self._by_city.setdefault(city, []):
+                self._by_city[city].append(code)
+
+    @classmethod
+    def from_meta(
+        cls, meta: ColumnarMeta, numeric: Dict[str, np.ndarray] | None = None
+    ) -> FlightIndex:
+        """from columnar metadata: only the indexed columns are read"""
+        columns = {
+            k: meta.column(k) if k in meta.columns else [None] * len(meta)
+            for k in COLUMNS
+        }
+        return cls(meta, columns, numeric)
+
+    def airports(self, destination: str | None) -> List[str]:
+        """arrival airport codes for an airport code or a city name"""
+        if not destination:
+            return []
+        key = destination.strip()
+        if key.upper() in self._slices:
+            return [key.upper()]
+        return self._by_city.get(key.lower(), [])
+
+    def positions(
+        self,
+        destination: str,
+        *,
+        origin: str | None = None,
+        date_from=None,
+        date_to=None,
+        max_duration_hours: float | None = None,
+        max_price: float | None = None,
+    ) -> np.ndarray:
+        """positions in the sorted columns of the flights matching every limit,
+        in departure order (dates are inclusive)"""
+        parts = []
+        for code in self.airports(destination):
+            start, end = self._slices[code]
+            days = self.day[start:end]
+            if date_from is not None:
+                start += int(np.searchsorted(days, _day(date_from), side="left"))
+            if date_to is not None:
+                end = self._slices[code][0] + int(
+                    np.searchsorted(days, _day(date_to), side="right")
+                )
+            parts.append(np.arange(start, max(start, end)))
+        pos = np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+        if origin:
+            pos = pos[self.depart[pos] == origin.strip().upper()]
+        # as retrieval/normalise.numeric_mask: NaN compares False, so
+        # unknown durations and prices are kept
+        if max_duration_hours is not None:
+            pos = pos[~(self.minutes[pos] > max_duration_hours * 60)]
+        if max_price is not None:
+            pos = pos[~(self.price[pos] > max_price)]
+        if len(parts) > 1:
+            pos = pos[np.argsort(self.day[pos], kind="stable")]
+        return pos
+
+    def search(
+        self, destination: str, k: int = 3, *, sort: FlightSort = "depart", **limits
+    ) -> List[Dict]:
+        """the first k matching flights by departure date, price or duration"""
+        pos = self.positions(destination, **limits)
+        if sort == "price":
+            # NaN prices sort last
+            pos = pos[np.argsort(self.price[pos], kind="stable")]
+        elif sort == "duration":
+            pos = pos[np.argsort(self.minutes[pos], kind="stable")]
+        return [self.rows[i] for i in self.ids[pos[:k]]]
+
+
+@lru_cache
+def get_flight_index() -> FlightIndex:
+    """the flight index of the registry's data directory. it only needs the
+    flight metadata, not the faiss index"""
+    path = get_store_registry().data_dir / "flights.faiss"
+    numeric = read_numeric(numeric_path(path)) if numeric_path(path).exists() else None
+    return FlightIndex.from_meta(ColumnarMeta(meta_path(path)), numeric)
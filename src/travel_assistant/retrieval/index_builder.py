@@ -0,0 +1,245 @@
+"""incremental index builds.
+
+every row is keyed by a hash of its flatten() text. a manifest next to each
+index records the embedding model, the index layout and the row hashes in
+index order, so a rebuild reuses the stored vector of every unchanged row,
+embeds only new or edited rows and drops removed ones. when nothing changed no
+embeddings are requested and nothing is written.
+
+non-flat indexes (see retrieval/ann.py) keep the raw vectors in a
+<name>.vectors.npy sidecar, since PQ codes can't give the originals back.
+
+the BM25 keyword index (retrieval/lexical.py) and the numeric price / rating /
+duration columns (retrieval/normalise.py) are rebuilt from the rows whenever
+the vector index is, which takes no embedding calls.
+
+indexes store l2-normalised vectors under the inner-product metric. an index
+from before that (L2 metric, manifest without "metric") is rebuilt from its own
+vectors the next time the script runs, without embedding anything.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Sequence
+
+import faiss
+import numpy as np
+import orjson
+
+from travel_assistant.core.config import get_settings
+from travel_assistant.retrieval.ann import IndexSpec, factory_string, index_kind
+from travel_assistant.retrieval.columnar import ColumnarMeta, meta_path
+from travel_assistant.retrieval.lexical import BM25Index, lexical_path
+from travel_assistant.retrieval.normalise import (
+    numeric_columns,
+    numeric_path,
+    write_numeric,
+)
+from travel_assistant.retrieval.vector_store import VectorStore, embed_batch, flatten
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def manifest_path(index_path: Path) -> Path:
+    return index_path.with_suffix(".manifest.json")
+
+
+def vectors_path(index_path: Path) -> Path:
+    return index_path.with_suffix(".vectors.npy")
+
+
+def read_manifest(index_path: Path) -> dict | None:
+    path = manifest_path(index_path)
+    try:
+        manifest = orjson.loads(path.read_bytes())
+    except FileNotFoundError:
+        return None
+    except orjson.JSONDecodeError:
+        logger.warning(f"Ignoring unreadable manifest {path}")
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def write_manifest(
+    index_path: Path,
+    model: str,
+    hashes: List[str],
+    dim: int,
+    index: str = "Flat",
+    metric: str = "ip",
+) -> None:
+    """index is the faiss factory string the index was built with"""
+    path = manifest_path(index_path)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(
+        orjson.dumps(
+            {
+                "version": MANIFEST_VERSION,
+                "embed_model": model,
+                "dim": dim,
+                "index": index,
+                "metric": metric,
+                "hashes": hashes,
+            }
+        )
+    )
+    tmp.replace(path)
+
+
+def _write_vectors(index_path: Path, vectors: np.ndarray | None) -> None:
+    """keep (or drop, for flat indexes) the raw vector sidecar"""
+    path = vectors_path(index_path)
+    if vectors is None:
+        path.unlink(missing_ok=True)
+        return
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, vectors)
+    tmp.replace(path)
+
+
+@dataclass
+class BuildReport:
+    name: str
+    rows: int
+    reused: int = 0
+    embedded: int = 0
+    removed: int = 0
+    written: bool = False
+    index: str = "Flat"
+
+    def __str__(self) -> str:
+        state = "rebuilt" if self.written else "unchanged"
+        return (
+            f"{self.name}: {state} {self.index} index, {self.rows} rows "
+            f"({self.reused} reused, {self.embedded} embedded, {self.removed} removed)"
+        )
+
+
+def previous_vectors(
+    index_path: Path, model: str
+) -> tuple[List[str], np.ndarray | None]:
+    """row hashes and vectors of the index on disk, in index order
+    (([], None) if there is none or it can't be reused).
+
+    without a manifest the hashes are recomputed from the stored rows, so an
+    index built before manifests existed is still reused"""
+    if not index_path.exists():
+        return [], None
+    manifest = read_manifest(index_path)
+    if manifest is not None and manifest.get("embed_model") != model:
+        logger.info(f"{index_path.name}: embedding model changed, re-embedding")
+        return [], None
+    # read the index directly rather than through VectorStore.load, which
+    # refuses the L2 indexes this is also meant to convert
+    try:
+        index = faiss.read_index(str(index_path))
+        meta = ColumnarMeta(meta_path(index_path))
+    except Exception as e:
+        logger.warning(f"Could not read {index_path}: {e}")
+        return [], None
+    if manifest is not None:
+        hashes = manifest["hashes"]
+    else:
+        hashes = [content_hash(flatten(r)) for r in meta]
+    if len(hashes) != index.ntotal:
+        logger.warning(f"{index_path.name}: manifest does not match index, re-embedding")
+        return [], None
+    sidecar = vectors_path(index_path)
+    if sidecar.exists():
+        vectors = np.load(sidecar)
+        if len(vectors) == len(hashes):
+            return list(hashes), vectors
+    if index_kind(index) == "ivf_pq":
+        logger.warning(f"{index_path.name}: raw vectors missing, re-embedding")
+        return [], None
+    return list(hashes), index.reconstruct_n(0, index.ntotal)
+
+
+def build_incremental(
+    name: str,
+    rows: Sequence[Dict],
+    index_path: Path,
+    *,
+    embed: Callable[[List[str]], List[List[float]]] = embed_batch,
+    model: str | None = None,
+    spec: IndexSpec | None = None,
+    full: bool = False,
+) -> BuildReport:
+    """bring the index at index_path in line with rows, embedding only what
+    changed. spec (default: from Settings) picks the index type; changing it
+    retrains the index from the stored vectors without embedding anything"""
+    if not rows:
+        raise ValueError(f"{name}: no rows to index")
+    settings = get_settings()
+    model = model or settings.embed_model
+    spec = spec or IndexSpec.from_settings(settings)
+    report = BuildReport(name=name, rows=len(rows))
+    texts = [flatten(r) for r in rows]
+    hashes = [content_hash(t) for t in texts]
+
+    old_hashes, old_vectors = [], None
+    if not full:
+        old_hashes, old_vectors = previous_vectors(index_path, model)
+    old = dict(zip(old_hashes, old_vectors)) if old_hashes else {}
+
+    missing: Dict[str, str] = {}
+    for h, text in zip(hashes, texts):
+        if h not in old and h not in missing:
+            missing[h] = text
+    report.reused = sum(h in old for h in hashes)
+    report.embedded = len(missing)
+    report.removed = len(set(old) - set(hashes))
+
+    if old_hashes == hashes:
+        dim = old_vectors.shape[1]
+        layout = factory_string(spec, dim, len(rows))
+        manifest = read_manifest(index_path)
+        if manifest is None:
+            # index predates manifests (and index types): record it as flat
+            metric = faiss.read_index(str(index_path)).metric_type
+            write_manifest(
+                index_path,
+                model,
+                hashes,
+                dim,
+                metric="ip" if metric == faiss.METRIC_INNER_PRODUCT else "l2",
+            )
+            manifest = read_manifest(index_path)
+        report.index = manifest.get("index", "Flat")
+        if report.index == layout and manifest.get("metric", "l2") == "ip":
+            if not lexical_path(index_path).exists():
+                BM25Index.build(texts).save(lexical_path(index_path))
+            if not numeric_path(index_path).exists():
+                write_numeric(numeric_columns(rows), numeric_path(index_path))
+            return report
+
+    fresh = {}
+    if missing:
+        fresh = dict(zip(missing, embed(list(missing.values()))))
+    vectors = np.stack([fresh[h] if h in fresh else old[h] for h in hashes]).astype(
+        np.float32
+    )
+
+    store = VectorStore()
+    store.build_from_vectors(rows, vectors, spec)
+    store.save(index_path)
+    BM25Index.build(texts).save(lexical_path(index_path))
+    write_numeric(numeric_columns(rows), numeric_path(index_path))
+    _write_vectors(index_path, None if spec.kind == "flat" else vectors)
+    report.index = factory_string(spec, vectors.shape[1], len(rows))
+    write_manifest(index_path, model, hashes, vectors.shape[1], report.index)
+    report.written = True
+    return report
@@ -0,0 +1,154 @@
+"""local BM25 keyword index over the flatten() text of a catalogue.
+
+built next to each faiss index by scripts/build_index.py (hotels.faiss ->
+hotels.bm25/) and memory-mapped like the metadata:
+
+    schema.json    row count and the BM25 parameters
+    vocab.json     the terms, sorted
+    indptr.npy     n_terms + 1 offsets into ...
+    docs.npy       ... the row ids containing each term, and
+    weights.npy    ... each posting's BM25 weight (idf and length norm folded in)
+
+the per-posting weights don't depend on the query, so scoring a query is one
+vectorised add per query term: no embedding call, no remote round trip.
+retrieval/search.py fuses these rankings with the vector ones (reciprocal rank
+fusion) or, in lexical mode, serves them alone.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import shutil
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence
+
+import numpy as np
+import orjson
+
+FORMAT_VERSION = 1
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def lexical_path(index_path: Path) -> Path:
+    return index_path.with_suffix(".bm25")
+
+
+def tokenize(text: str) -> List[str]:
+    """lower-cased alphanumeric runs: "VS1545" -> vs1545, "Rooftop Bar" -> rooftop, bar"""
+    return _TOKEN.findall(text.lower())
+
+
+class BM25Index:
+    """inverted index with precomputed Okapi BM25 posting weights"""
+
+    def __init__(
+        self,
+        vocab: Sequence[str],
+        indptr: np.ndarray,
+        docs: np.ndarray,
+        weights: np.ndarray,
+        n_docs: int,
+    ) -> None:
+        self.terms: Dict[str, int] = {t: i for i, t in enumerate(vocab)}
+        self.indptr = indptr
+        self.docs = docs
+        self.weights = weights
+        self.n_docs = n_docs
+
+    @classmethod
+    def build(cls, texts: Iterable[str], k1: float = 1.2, b: float = 0.75) -> BM25Index:
+        counts = [Counter(tokenize(t)) for t in texts]
+        n = len(counts)
+        lengths = np.array([sum(c.values()) for c in counts], dtype=np.float32)
+        avgdl = float(lengths.mean()) if n and lengths.any() else 1.0
+
+        postings: Dict[str, List[tuple[int, int]]] = {}
+        for doc, c in enumerate(counts):
+            for term, tf in c.items():
+                postings.setdefault(term, []).append((doc, tf))
+
+        vocab = sorted(postings)
+        indptr = np.zeros(len(vocab) + 1, dtype=np.int64)
+        np.cumsum([len(postings[t]) for t in vocab], out=indptr[1:])
+        docs = np.empty(indptr[-1], dtype=np.int32)
+        weights = np.empty(indptr[-1], dtype=np.float32)
+        for i, term in enumerate(vocab):
+            entries = postings[term]
+            ids = np.fromiter((d for d, _ in entries), dtype=np.int32, count=len(entries))
+            tf = np.fromiter((f for _, f in entries), dtype=np.float32, count=len(entries))
+            df = len(entries)
+            idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+            norm = k1 * (1 - b + b * lengths[ids] / avgdl)
+            docs[indptr[i] : indptr[i + 1]] = ids
+            weights[indptr[i] : indptr[i + 1]] = idf * tf * (k1 + 1) / (tf + norm)
+        return cls(vocab, indptr, docs, weights, n)
+
+    def save(self, path: Path) -> None:
+        """write to a directory, replacing any previous one (as write_columns)"""
+        tmp = path.with_name(path.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        vocab = sorted(self.terms, key=self.terms.__getitem__)
+        (tmp / "vocab.json").write_bytes(orjson.dumps(vocab))
+        np.save(tmp / "indptr.npy", self.indptr)
+        np.save(tmp / "docs.npy", self.docs)
+        np.save(tmp / "weights.npy", self.weights)
+        (tmp / "schema.json").write_bytes(
+            orjson.dumps({"version": FORMAT_VERSION, "rows": self.n_docs})
+        )
+        shutil.rmtree(path, ignore_errors=True)
+        tmp.rename(path)
+
+    @classmethod
+    def load(cls, path: Path) -> BM25Index:
+        schema = orjson.loads((path / "schema.json").read_bytes())
+        if schema.get("version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported lexical index format in {path}")
+        return cls(
+            orjson.loads((path / "vocab.json").read_bytes()),
+            np.load(path / "indptr.npy", mmap_mode="r"),
+            np.load(path / "docs.npy", mmap_mode="r"),
+            np.load(path / "weights.npy", mmap_mode="r"),
+            schema["rows"],
+        )
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every row for the query (0 where no term matches)"""
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for term, qtf in Counter(tokenize(query)).items():
+            i = self.terms.get(term)
+            if i is None:
+                continue
+            start, end = self.indptr[i], self.indptr[i + 1]
+            # a term posts each row once, so plain fancy-index adds are safe
+            scores[self.docs[start:end]] += qtf * self.weights[start:end]
+        return scores
+
+    def search(
+        self, query: str, k: int, ids: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """(ids, scores) of the k best matching rows, optionally only among
+        ids; rows matching no query term are never returned"""
+        scores = self.scores(query)
+        ids = np.flatnonzero(scores) if ids is None else np.asarray(ids, dtype=np.int64)
+        ids = ids[scores[ids] > 0]
+        cand = scores[ids]
+        if k < len(cand):
+            part = np.argpartition(-cand, k - 1)[:k]
+        else:
+            part = np.arange(len(cand))
+        order = part[np.argsort(-cand[part], kind="stable")]
+        return ids[order], cand[order]
+
+
+def rrf(rankings: Iterable[Sequence[int]], k: int = 60) -> List[tuple[int, float]]:
+    """reciprocal rank fusion: (id, sum of 1 / (k + rank)) best first. ties
+    keep the order in which the ids were first ranked"""
+    fused: Dict[int, float] = {}
+    for ranking in rankings:
+        for rank, row_id in enumerate(ranking, start=1):
+            fused[int(row_id)] = fused.get(int(row_id), 0.0) + 1.0 / (k + rank)
+    return sorted(fused.items(), key=lambda item: -item[1])
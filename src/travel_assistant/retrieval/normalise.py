@@ -0,0 +1,124 @@
+"""typed numeric columns parsed from the catalogue rows.
+
+the seed data keeps prices, ratings and durations in whatever form each
+catalogue uses ("PT10H50M", 3, "£450", 4.5 ...). scripts/build_index.py parses
+them once into float32 arrays stored next to the index (hotels.faiss ->
+hotels.numeric.npz), so searches can filter on price or rating with a numpy
+mask instead of reading and parsing rows. values that can't be parsed are NaN.
+
+    price            base_price / room_pricing / cabin_type_price / price
+    rating           rating
+    duration_hours   duration_hours / flight_duration (ISO-8601)
+"""
+
+from __future__ import annotations
+
+import math
+import re
+from pathlib import Path
+from typing import Callable, Dict, Sequence
+
+import numpy as np
+
+_DURATION = re.compile(
+    r"^P(?:(?P<d>\d+)D)?(?:T(?:(?P<h>\d+)H)?(?:(?P<m>\d+)M)?(?:(?P<s>\d+)S)?)?$"
+)
+_NUMBER = re.compile(r"\d+(?:\.\d+)?")
+
+
+def parse_duration(value) -> float:
+    """minutes in an ISO-8601 duration ("PT10H50M" -> 650.0); NaN if unreadable"""
+    match = _DURATION.match(str(value or "").strip().upper())
+    if not match or not any(match.groupdict().values()):
+        return math.nan
+    parts = {k: int(v or 0) for k, v in match.groupdict().items()}
+    return parts["d"] * 1440 + parts["h"] * 60 + parts["m"] + parts["s"] / 60
+
+
+def parse_number(value) -> float:
+    """a number, or the first number in a string ("£450.00"); NaN otherwise"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    match = _NUMBER.search(str(value or "").replace(",", ""))
+    return float(match.group()) if match else math.nan
+
+
+def parse_hours(value) -> float:
+    """hours from a number of hours or an ISO-8601 duration"""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return parse_duration(value) / 60
+
+
+# column -> (source fields, first present one wins; parser)
+NUMERIC_COLUMNS: Dict[str, tuple[tuple[str, ...], Callable]] = {
+    "price": (("base_price", "room_pricing", "cabin_type_price", "price"), parse_number),
+    "rating": (("rating",), parse_number),
+    "duration_hours": (("duration_hours", "flight_duration"), parse_hours),
+}
+
+
+def numeric_path(index_path: Path) -> Path:
+    return index_path.with_suffix(".numeric.npz")
+
+
+def numeric_columns(rows: Sequence[Dict]) -> Dict[str, np.ndarray]:
+    """the NUMERIC_COLUMNS present in rows, as float32 arrays in row order"""
+    columns = {}
+    for name, (fields, parse) in NUMERIC_COLUMNS.items():
+        values = np.full(len(rows), np.nan, dtype=np.float32)
+        found = False
+        for i, row in enumerate(rows):
+            for field in fields:
+                if row.get(field) is not None:
+                    values[i] = parse(row[field])
+                    found = True
+                    break
+        if found:
+            columns[name] = values
+    return columns
+
+
+def numeric_from_meta(meta) -> Dict[str, np.ndarray]:
+    """numeric_columns of a store's metadata; columnar metadata only has the
+    source columns read"""
+    rows = getattr(meta, "rows", None)
+    if rows is None:
+        return numeric_columns(meta)
+    fields = [f for fields, _ in NUMERIC_COLUMNS.values() for f in fields]
+    return numeric_columns(list(rows(fields)))
+
+
+def write_numeric(columns: Dict[str, np.ndarray], path: Path) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        np.savez(f, **columns)
+    tmp.replace(path)
+
+
+def read_numeric(path: Path) -> Dict[str, np.ndarray]:
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def numeric_mask(
+    columns: Dict[str, np.ndarray],
+    *,
+    max_price: float | None = None,
+    min_rating: float | None = None,
+    max_duration_hours: float | None = None,
+) -> np.ndarray | None:
+    """boolean mask of the rows within the limits, or None if no limit applies
+    to these columns. rows whose value is unknown (NaN) are kept"""
+    limits = [
+        ("price", max_price, np.greater),
+        ("rating", min_rating, np.less),
+        ("duration_hours", max_duration_hours, np.greater),
+    ]
+    mask = None
+    for name, limit, outside in limits:
+        if limit is not None and name in columns:
+            # NaN compares False, so unknown values stay in
+            keep = ~outside(columns[name], limit)
+            mask = keep if mask is None else mask & keep
+    return mask
@@ -0,0 +1,79 @@
+"""city and country posting lists for the vector stores.
+
+built once per store when it is loaded, so a filtered search only touches the
+rows of the requested city instead of rescanning the whole catalogue.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, Iterable
+
+import numpy as np
+
+# flights carry their destination in city_arrive / country_arrive
+CITY_KEYS = ("city", "city_arrive")
+COUNTRY_KEYS = ("country", "country_arrive")
+
+_EMPTY = np.empty(0, dtype=np.int64)
+_EMPTY.setflags(write=False)
+
+
+def _freeze(postings: dict[str, list[int]]) -> dict[str, np.ndarray]:
+    frozen = {}
+    for key, ids in postings.items():
+        arr = np.array(ids, dtype=np.int64)
+        arr.setflags(write=False)
+        frozen[key] = arr
+    return frozen
+
+
+def _first(row: Dict, keys: tuple[str, ...]) -> str:
+    for key in keys:
+        value = row.get(key)
+        if value:
+            return str(value)
+    return ""
+
+
+class PostingIndex:
+    """maps lower-cased city / country names to sorted arrays of row ids"""
+
+    def __init__(
+        self, by_city: dict[str, np.ndarray], by_country: dict[str, np.ndarray]
+    ) -> None:
+        self.by_city = by_city
+        self.by_country = by_country
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict]) -> PostingIndex:
+        by_city: dict[str, list[int]] = defaultdict(list)
+        by_country: dict[str, list[int]] = defaultdict(list)
+        for pos, row in enumerate(rows):
+            row_id = row.get("__id", pos)
+            city = _first(row, CITY_KEYS)
+            if city:
+                by_city[city.strip().lower()].append(row_id)
+            country = _first(row, COUNTRY_KEYS)
+            if country:
+                by_country[country.strip().lower()].append(row_id)
+        return cls(_freeze(by_city), _freeze(by_country))
+
+    @classmethod
+    def from_meta(cls, meta) -> PostingIndex:
+        """from a store's metadata; columnar metadata only has its place
+        columns read"""
+        rows = getattr(meta, "rows", None)
+        return cls.from_rows(rows(CITY_KEYS + COUNTRY_KEYS) if rows else meta)
+
+    def city_ids(self, city: str | None) -> np.ndarray:
+        """row ids for a city (case-insensitive); empty if unknown"""
+        if not city:
+            return _EMPTY
+        return self.by_city.get(city.strip().lower(), _EMPTY)
+
+    def country_ids(self, country: str | None) -> np.ndarray:
+        """row ids for a country (case-insensitive); empty if unknown"""
+        if not country:
+            return _EMPTY
+        return self.by_country.get(country.strip().lower(), _EMPTY)
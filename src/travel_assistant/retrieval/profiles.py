@@ -0,0 +1,233 @@
+"""destination profile table.
+
+one profile per destination city (country, continent, themes, price bands and
+catalogue counts), built once from the seed catalogues and rebuilt only when
+they change. country, continent and theme lookups are dict hits, so choosing
+a destination for a query like "foodie trip in Asia" needs no network calls.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from statistics import median
+
+from travel_assistant.retrieval.catalogue_loader import catalogue_signature, load_json
+
+# the seed data spells some countries several ways (and files Tampa under Florida)
+COUNTRY_ALIASES = {
+    "usa": "United States",
+    "united states": "United States",
+    "united states of america": "United States",
+    "america": "United States",
+    "florida": "United States",
+    "uk": "United Kingdom",
+    "united kingdom": "United Kingdom",
+    "england": "United Kingdom",
+}
+
+CONTINENTS = {
+    "United States": "North America",
+    "Canada": "North America",
+    "Barbados": "Caribbean",
+    "Jamaica": "Caribbean",
+    "India": "Asia",
+    "Saudi Arabia": "Asia",
+    "South Africa": "Africa",
+    "Nigeria": "Africa",
+    "United Kingdom": "Europe",
+}
+
+CONTINENT_ALIASES = {
+    "asia": "Asia",
+    "asian": "Asia",
+    "middle east": "Asia",
+    "africa": "Africa",
+    "african": "Africa",
+    "europe": "Europe",
+    "european": "Europe",
+    "north america": "North America",
+    "caribbean": "Caribbean",
+}
+
+# query / description words that signal a theme
+THEME_KEYWORDS = {
+    "beach": ["beach", "coast", "ocean", "island", "seaside"],
+    "mountain": ["mountain", "alpine", "hiking", "ski"],
+    "food": ["food", "foodie", "cuisine", "gastronomy", "culinary", "dining"],
+    "nightlife": ["nightlife", "bar", "club", "casino", "party"],
+    "culture": ["culture", "cultural", "history", "art", "museum", "architecture"],
+    "adventure": ["adventure", "kayaking", "safari", "outdoor", "sport", "sports"],
+    "nature": ["nature", "wildlife", "park", "lake"],
+    "wellness": ["wellness", "spa", "relaxation", "relax", "yoga"],
+    "family": ["family", "kids", "children"],
+    "romantic": ["romantic", "honeymoon", "couple", "couples"],
+    "luxury": ["luxury", "luxurious", "boutique"],
+    "music": ["music", "concert", "jazz"],
+}
+_KEYWORD_THEME = {kw: theme for theme, kws in THEME_KEYWORDS.items() for kw in kws}
+
+_WORD = re.compile(r"[a-z]+")
+
+
+@dataclass(frozen=True)
+class DestinationProfile:
+    city: str
+    country: str
+    continent: str
+    themes: dict[str, int] = field(default_factory=dict)
+    hotel_tiers: dict[str, int] = field(default_factory=dict)
+    # (min, median, max) experience base_price, None without priced experiences
+    experience_prices: tuple[float, float, float] | None = None
+    airports: tuple[str, ...] = ()
+    hotels: int = 0
+    flights: int = 0
+    experiences: int = 0
+
+    @property
+    def size(self) -> int:
+        return self.hotels + self.flights + self.experiences
+
+
+def canonical_country(country: str) -> str:
+    return COUNTRY_ALIASES.get(country.strip().lower(), country.strip())
+
+
+def _terms(text: str) -> list[str]:
+    """lower-cased words plus two- and three-word phrases"""
+    words = _WORD.findall(text.lower())
+    terms = list(words)
+    for n in (2, 3):
+        terms.extend(" ".join(words[i : i + n]) for i in range(len(words) - n + 1))
+    return terms
+
+
+def _themes_of(text: str) -> Counter:
+    hits: Counter = Counter()
+    for word in _WORD.findall(text.lower()):
+        theme = _KEYWORD_THEME.get(word) or _KEYWORD_THEME.get(word.rstrip("s"))
+        if theme:
+            hits[theme] += 1
+    return hits
+
+
+class ProfileTable:
+    def __init__(self, profiles: dict[str, DestinationProfile]) -> None:
+        self.by_city = profiles
+        self.by_country: dict[str, list[DestinationProfile]] = defaultdict(list)
+        self.by_continent: dict[str, list[DestinationProfile]] = defaultdict(list)
+        self.by_theme: dict[str, list[DestinationProfile]] = defaultdict(list)
+        for profile in profiles.values():
+            self.by_country[profile.country.lower()].append(profile)
+            self.by_continent[profile.continent.lower()].append(profile)
+            for theme in profile.themes:
+                self.by_theme[theme].append(profile)
+        for theme, members in self.by_theme.items():
+            members.sort(key=lambda p: -p.themes[theme])
+
+    @classmethod
+    def from_catalogues(cls) -> ProfileTable:
+        places: dict[str, tuple[str, str]] = {}
+        themes: dict[str, Counter] = defaultdict(Counter)
+        tiers: dict[str, Counter] = defaultdict(Counter)
+        prices: dict[str, list[float]] = defaultdict(list)
+        airports: dict[str, set[str]] = defaultdict(set)
+        counts: dict[str, Counter] = defaultdict(Counter)
+
+        def place(city: str, country: str) -> str:
+            key = city.strip().lower()
+            places.setdefault(key, (city.strip(), canonical_country(country or "")))
+            return key
+
+        for row in load_json("hotel"):
+            key = place(row["city"], row.get("country", ""))
+            counts[key]["hotels"] += 1
+            tiers[key][row.get("pricing_tier") or "unknown"] += 1
+            themes[key] += _themes_of(
+                f"{row.get('hotel_description') or ''} {row.get('amenities') or ''}"
+            )
+
+        for row in load_json("experiences"):
+            key = place(row["city"], row.get("country", ""))
+            counts[key]["experiences"] += 1
+            if row.get("base_price") is not None:
+                prices[key].append(float(row["base_price"]))
+            tags = (row.get("tags") or "").replace(",", " ")
+            themes[key] += _themes_of(f"{tags} {row.get('title') or ''}")
+
+        for row in load_json("flight"):
+            key = place(row["city_arrive"], row.get("country_arrive", ""))
+            counts[key]["flights"] += 1
+            airports[key].add(row["airport_arrive"])
+
+        profiles = {}
+        for key, (city, country) in places.items():
+            p = prices.get(key)
+            profiles[key] = DestinationProfile(
+                city=city,
+                country=country,
+                continent=CONTINENTS.get(country, "Unknown"),
+                themes=dict(themes[key]),
+                hotel_tiers=dict(tiers[key]),
+                experience_prices=(min(p), median(p), max(p)) if p else None,
+                airports=tuple(sorted(airports[key])),
+                hotels=counts[key]["hotels"],
+                flights=counts[key]["flights"],
+                experiences=counts[key]["experiences"],
+            )
+        return cls(profiles)
+
+    def get(self, city: str) -> DestinationProfile | None:
+        return self.by_city.get(city.strip().lower())
+
+    def country(self, name: str) -> list[DestinationProfile]:
+        return self.by_country.get(canonical_country(name).lower(), [])
+
+    def continent(self, name: str) -> list[DestinationProfile]:
+        name = CONTINENT_ALIASES.get(name.strip().lower(), name)
+        return self.by_continent.get(name.lower(), [])
+
+    def theme(self, name: str) -> list[DestinationProfile]:
+        return self.by_theme.get(name, [])
+
+    def pick(self, text: str) -> DestinationProfile | None:
+        """best destination for free text: narrow by country / continent
+        mentions, rank by theme hits, break ties by catalogue coverage"""
+        if not self.by_city:
+            return None
+
+        countries, continents = set(), set()
+        for term in _terms(text):
+            if term in COUNTRY_ALIASES or term in self.by_country:
+                countries.add(canonical_country(term).lower())
+            if term in CONTINENT_ALIASES:
+                continents.add(CONTINENT_ALIASES[term].lower())
+        wanted = _themes_of(text)
+
+        candidates = list(self.by_city.values())
+        if countries:
+            candidates = [p for p in candidates if p.country.lower() in countries]
+        if continents:
+            candidates = [p for p in candidates if p.continent.lower() in continents]
+        # places with hotels or experiences make better recommendations than
+        # flight-only destinations
+        candidates = [p for p in candidates if p.hotels + p.experiences] or candidates
+        if not candidates:
+            return None
+
+        return max(
+            candidates,
+            key=lambda p: (sum(p.themes.get(t, 0) for t in wanted), p.size),
+        )
+
+
+@lru_cache(maxsize=2)
+def _table(signature: tuple) -> ProfileTable:
+    return ProfileTable.from_catalogues()
+
+
+def get_profile_table() -> ProfileTable:
+    """profile table for the current seed data (rebuilt when it changes)"""
+    return _table(catalogue_signature())
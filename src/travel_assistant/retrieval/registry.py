@@ -0,0 +1,150 @@
+"""one process-wide registry of the vector stores.
+
+stores are loaded on first use (or by warm_up) instead of at import time, and
+every caller - search functions, API dependencies, scripts - shares the same
+instances. the FastAPI lifespan can start a background warm-up so the first
+request doesn't pay for loading, and status() backs the /ready endpoint.
+
+with INDEX_MMAP the indexes are memory-mapped, so N uvicorn workers share one
+copy of the vectors through the page cache. with STORE_PRELOAD the stores are
+loaded when the app module is imported, which a pre-fork server runs once in
+its master before forking workers:
+
+    STORE_PRELOAD=true gunicorn --preload -k uvicorn.workers.UvicornWorker \
+        -w 4 travel_assistant.main:app
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from travel_assistant.core.config import get_settings
+from travel_assistant.retrieval.lexical import BM25Index, lexical_path
+from travel_assistant.retrieval.normalise import (
+    numeric_from_meta,
+    numeric_path,
+    read_numeric,
+)
+from travel_assistant.retrieval.postings import PostingIndex
+from travel_assistant.retrieval.vector_store import AsyncVectorStore, VectorStore
+
+logger = logging.getLogger(__name__)
+
+STORE_NAMES = ("hotels", "flights", "experiences")
+
+
+class StoreRegistry:
+    def __init__(
+        self,
+        data_dir: Path,
+        names: tuple[str, ...] = STORE_NAMES,
+        mmap: bool = False,
+        nprobe: int | None = None,
+        ef_search: int | None = None,
+    ) -> None:
+        self.data_dir = data_dir
+        self.names = names
+        self.mmap = mmap
+        self.nprobe = nprobe
+        self.ef_search = ef_search
+        self._stores: dict[str, VectorStore] = {}
+        self._async: dict[str, AsyncVectorStore] = {}
+        self._errors: dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._warm_up: threading.Thread | None = None
+
+    def _load(self, name: str) -> VectorStore:
+        started = time.perf_counter()
+        path = self.data_dir / f"{name}.faiss"
+        store = VectorStore()
+        store.load(path, mmap=self.mmap)
+        store.nprobe, store.ef_search = self.nprobe, self.ef_search
+        store.postings = PostingIndex.from_meta(store.meta)
+        if lexical_path(path).exists():
+            store.lexical = BM25Index.load(lexical_path(path))
+            if store.lexical.n_docs != len(store.meta):
+                logger.warning(f"{name}: stale BM25 index ignored, rerun build_index.py")
+                store.lexical = None
+        numeric = read_numeric(numeric_path(path)) if numeric_path(path).exists() else {}
+        if not numeric or any(len(c) != len(store.meta) for c in numeric.values()):
+            # missing or stale: parse the rows now rather than filter wrongly
+            numeric = numeric_from_meta(store.meta)
+        store.numeric = numeric
+        logger.info(
+            f"Loaded {name} {store.index_type} store ({store.index.ntotal} rows) "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return store
+
+    def get(self, name: str) -> VectorStore:
+        """the named store, loading it on first use"""
+        store = self._stores.get(name)
+        if store is not None:
+            return store
+        if name not in self.names:
+            raise KeyError(f"unknown vector store {name!r}")
+        with self._lock:
+            store = self._stores.get(name)
+            if store is None:
+                try:
+                    store = self._load(name)
+                except Exception as e:
+                    self._errors[name] = str(e)
+                    raise
+                self._errors.pop(name, None)
+                self._stores[name] = store
+                self._async[name] = AsyncVectorStore(store)
+        return store
+
+    async def aget(self, name: str) -> AsyncVectorStore:
+        """non-blocking view of the named store; a cold load runs in a thread"""
+        store = self._async.get(name)
+        if store is None:
+            await asyncio.to_thread(self.get, name)
+            store = self._async[name]
+        return store
+
+    def warm_up(self) -> None:
+        """load every store now; failures are logged and reported by status()"""
+        for name in self.names:
+            try:
+                self.get(name)
+            except Exception as e:
+                logger.error(f"Could not load {name} store: {e}")
+
+    def start_warm_up(self) -> threading.Thread:
+        """warm_up in a daemon thread (once); the app serves requests meanwhile"""
+        with self._lock:
+            if self._warm_up is None:
+                self._warm_up = threading.Thread(
+                    target=self.warm_up, name="store-warm-up", daemon=True
+                )
+                self._warm_up.start()
+        return self._warm_up
+
+    @property
+    def ready(self) -> bool:
+        return all(name in self._stores for name in self.names)
+
+    def status(self) -> dict:
+        return {
+            "ready": self.ready,
+            "loaded": [n for n in self.names if n in self._stores],
+            "errors": dict(self._errors),
+        }
+
+
+@lru_cache
+def get_store_registry() -> StoreRegistry:
+    settings = get_settings()
+    return StoreRegistry(
+        settings.project_root / "data",
+        mmap=settings.index_mmap,
+        nprobe=settings.index_nprobe,
+        ef_search=settings.hnsw_ef_search,
+    )
@@ -1,68 +1,389 @@
+"""catalogue search for the agent's tools.
+
+each search runs in one of three modes (SEARCH_MODE, or mode= per call):
+
+    vector   cosine similarity over the faiss index (one embedding call)
+    lexical  BM25 over the flatten() text (retrieval/lexical.py); no embedding
+             call, so keyword lookups ("VS1545", "kayaking") stay fast and
+             keep working when the embedding API is slow
+    hybrid   both rankings, fused with reciprocal rank fusion
+
+a store without a BM25 index (build_index.py not rerun yet) searches by
+vector whatever the mode.
+
+max_price / min_rating are numpy masks over the store's pre-parsed numeric
+columns (retrieval/normalise.py), applied to the candidate rows before either
+ranking; rows whose price or rating is unknown are kept.
+
+search_many / asearch_many run a batch of searches over any of the stores
+with one embedding request for all their distinct query texts and one
+scoring pass per store (VectorStore.search_batch_scored).
+
+flight searches for a destination the structured flight index knows (an
+arrival city or airport code) skip all three: they are answered from the
+sorted flight columns (retrieval/flights.py) by date, duration and price.
+"""
+
 from __future__ import annotations
 
-from functools import lru_cache
-from pathlib import Path
+import asyncio
+from dataclasses import dataclass, field
+from typing import Dict, List, Literal, NamedTuple, Sequence
+
+import numpy as np
+
 from travel_assistant.core.config import get_settings
-from travel_assistant.retrieval.vector_store import VectorStore
+from travel_assistant.retrieval.flights import FlightSort, get_flight_index
+from travel_assistant.retrieval.lexical import rrf
+from travel_assistant.retrieval.normalise import numeric_mask
+from travel_assistant.retrieval.registry import get_store_registry
+from travel_assistant.retrieval.vector_store import (
+    VectorStore,
+    aembed_queries,
+    embed_queries,
+)
 
 settings = get_settings()
-DATA_DIR: Path = settings.project_root / "data"
+
+SearchMode = Literal["vector", "lexical", "hybrid"]
 
 
-@lru_cache
 def load_store(name: str) -> VectorStore:
-    store = VectorStore()
-    store.load(DATA_DIR / f"{name}.faiss")
-    return store
+    """the shared store for name, loaded on first use"""
+    return get_store_registry().get(name)
+
+
+def _city_ids(store, city: str) -> np.ndarray | None:
+    """row ids posted under the city, or None to search the whole store"""
+    ids = store.postings.city_ids(city) if store.postings else []
+    return ids if len(ids) else None
+
+
+def _candidate_ids(
+    store, city: str, max_price: float | None, min_rating: float | None
+) -> np.ndarray | None:
+    """the city's rows within the limits; None to search the whole store"""
+    ids = _city_ids(store, city)
+    mask = numeric_mask(store.numeric, max_price=max_price, min_rating=min_rating)
+    if mask is None:
+        return ids
+    if ids is None:
+        return np.flatnonzero(mask)
+    return ids[mask[ids]]
+
+
+def _mode(store, mode: SearchMode | None) -> SearchMode:
+    mode = mode or settings.search_mode
+    return "vector" if store.lexical is None else mode
+
+
+def _lexical_ids(store, query: str, k: int, ids: np.ndarray | None) -> np.ndarray:
+    return store.lexical.search(query, k, ids)[0]
+
+
+def _fuse(meta, scored: list[tuple[dict, float]], lexical: np.ndarray, k: int) -> list[dict]:
+    ranked = rrf([[row["__id"] for row, _ in scored], lexical], settings.rrf_k)
+    return [meta[i] for i, _ in ranked[:k]]
 
 
-# initialize cached vector stores
-_vs_hotel = load_store("hotels")
-_vs_flight = load_store("flights")
-_vs_exp = load_store("experiences")
+def _search_in_city(
+    store: VectorStore,
+    query: str,
+    k: int,
+    city: str,
+    mode: SearchMode | None = None,
+    *,
+    max_price: float | None = None,
+    min_rating: float | None = None,
+) -> list[dict]:
+    """search only the rows posted under the city (or the whole store if none)
+    that are within the price / rating limits"""
+    ids = _candidate_ids(store, city, max_price, min_rating)
+    mode = _mode(store, mode)
+    if mode == "lexical":
+        return [store.meta[i] for i in _lexical_ids(store, query, k, ids)]
+    depth = k if mode == "vector" else max(k, settings.hybrid_depth)
+    if ids is not None:
+        # perform search within city-specific (or filtered) rows
+        scored = store.search_ids_scored(query, ids, depth)
+    else:
+        # fallback to global search if no city specified or no city matches
+        scored = store.search_scored(query, depth)
+    if mode == "vector":
+        return [row for row, _ in scored]
+    return _fuse(store.meta, scored, _lexical_ids(store, query, depth, ids), k)
 
 
-def _filter_by_city(rows: list[dict], city: str) -> list[dict]:
-    """Filter rows by city (case-insensitive)"""
-    if not city:
+def search_hotels(
+    query: str,
+    k: int = 3,
+    *,
+    city: str = "",
+    mode: SearchMode | None = None,
+    max_price: float | None = None,
+    min_rating: float | None = None,
+) -> list[dict]:
+    """Search hotels matching query within the specified city and budget"""
+    return _search_in_city(
+        load_store("hotels"),
+        query,
+        k,
+        city,
+        mode,
+        max_price=max_price,
+        min_rating=min_rating,
+    )
+
+
+def _structured_flights(city: str, k: int, limits: dict) -> list[dict] | None:
+    """flights from the sorted flight index, or None if it doesn't know the
+    destination"""
+    index = get_flight_index()
+    if not index.airports(city):
+        return None
+    return index.search(city, k, **limits)
+
+
+def search_flights(
+    query: str,
+    k: int = 3,
+    *,
+    city: str = "",
+    mode: SearchMode | None = None,
+    origin: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    max_duration_hours: float | None = None,
+    max_price: float | None = None,
+    sort: FlightSort = "depart",
+) -> list[dict]:
+    """Search flights to the specified (arrival) city or airport code.
+    known destinations are filtered and sorted structurally; others fall back
+    to text search"""
+    limits = dict(
+        origin=origin,
+        date_from=date_from,
+        date_to=date_to,
+        max_duration_hours=max_duration_hours,
+        max_price=max_price,
+        sort=sort,
+    )
+    rows = _structured_flights(city, k, limits)
+    if rows is not None:
         return rows
-    return [r for r in rows if r.get("city", "").lower() == city.lower()]
+    return _search_in_city(
+        load_store("flights"), query, k, city, mode, max_price=max_price
+    )
+
+
+def search_experiences(
+    query: str,
+    k: int = 3,
+    *,
+    city: str = "",
+    mode: SearchMode | None = None,
+    max_price: float | None = None,
+    min_rating: float | None = None,
+) -> list[dict]:
+    """Search experiences matching query within the specified city and budget"""
+    return _search_in_city(
+        load_store("experiences"),
+        query,
+        k,
+        city,
+        mode,
+        max_price=max_price,
+        min_rating=min_rating,
+    )
+
+
+async def _asearch_in_city(
+    name: str,
+    query: str,
+    k: int,
+    city: str,
+    mode: SearchMode | None = None,
+    *,
+    max_price: float | None = None,
+    min_rating: float | None = None,
+) -> list[dict]:
+    """async twin of _search_in_city"""
+    store = await get_store_registry().aget(name)
+    ids = _candidate_ids(store, city, max_price, min_rating)
+    mode = _mode(store, mode)
+    if mode == "lexical":
+        # microseconds of numpy: no need to leave the event loop
+        return [store.store.meta[i] for i in _lexical_ids(store, query, k, ids)]
+    depth = k if mode == "vector" else max(k, settings.hybrid_depth)
+    if ids is not None:
+        scored = await store.search_ids_scored(query, ids, depth)
+    else:
+        scored = await store.search_scored(query, depth)
+    if mode == "vector":
+        return [row for row, _ in scored]
+    return _fuse(store.store.meta, scored, _lexical_ids(store, query, depth, ids), k)
+
+
+async def asearch_hotels(
+    query: str,
+    k: int = 3,
+    *,
+    city: str = "",
+    mode: SearchMode | None = None,
+    max_price: float | None = None,
+    min_rating: float | None = None,
+) -> list[dict]:
+    """non-blocking search_hotels"""
+    return await _asearch_in_city(
+        "hotels", query, k, city, mode, max_price=max_price, min_rating=min_rating
+    )
+
+
+async def asearch_flights(
+    query: str,
+    k: int = 3,
+    *,
+    city: str = "",
+    mode: SearchMode | None = None,
+    origin: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    max_duration_hours: float | None = None,
+    max_price: float | None = None,
+    sort: FlightSort = "depart",
+) -> list[dict]:
+    """non-blocking search_flights"""
+    limits = dict(
+        origin=origin,
+        date_from=date_from,
+        date_to=date_to,
+        max_duration_hours=max_duration_hours,
+        max_price=max_price,
+        sort=sort,
+    )
+    # the first call builds the flight index, so keep it off the event loop
+    rows = await asyncio.to_thread(_structured_flights, city, k, limits)
+    if rows is not None:
+        return rows
+    return await _asearch_in_city("flights", query, k, city, mode, max_price=max_price)
+
+
+async def asearch_experiences(
+    query: str,
+    k: int = 3,
+    *,
+    city: str = "",
+    mode: SearchMode | None = None,
+    max_price: float | None = None,
+    min_rating: float | None = None,
+) -> list[dict]:
+    """non-blocking search_experiences"""
+    return await _asearch_in_city(
+        "experiences", query, k, city, mode, max_price=max_price, min_rating=min_rating
+    )
+
+
+@dataclass(frozen=True)
+class SearchRequest:
+    """one search of a batch; store is hotels, flights or experiences"""
+
+    store: str
+    query: str
+    city: str = ""
+    k: int = 3
+    max_price: float | None = None
+    min_rating: float | None = None
+
 
+class _Pending(NamedTuple):
+    index: int
+    query: str
+    ids: np.ndarray | None
+    depth: int
+    mode: SearchMode
 
-def search_hotels(query: str, k: int = 3, *, city: str = "") -> list[dict]:
-    """Search hotels matching query within the specified city"""
-    # get all hotels in the target city
-    city_hotels = _filter_by_city(_vs_hotel.meta, city)
 
-    if city_hotels:
-        # perform search within city-specific hotels
-        return _vs_hotel.search_subset(query, city_hotels, k)
+@dataclass
+class _BatchPlan:
+    results: List[List[dict] | None]
+    # store -> requests still to be scored by vector
+    pending: Dict[str, List[_Pending]] = field(default_factory=dict)
 
-    # fallback to global search if no city specified or no city matches
-    return _vs_hotel.search(query, k)
+    @property
+    def texts(self) -> List[str]:
+        return [p.query for items in self.pending.values() for p in items]
 
 
-def search_flights(query: str, k: int = 3, *, city: str = "") -> list[dict]:
-    """Search flights matching query within the specified city"""
-    # get all flights in the target city
-    city_flights = _filter_by_city(_vs_flight.meta, city)
+def _plan_batch(
+    requests: Sequence[SearchRequest],
+    stores: Dict[str, VectorStore],
+    mode: SearchMode | None,
+) -> _BatchPlan:
+    """answer what needs no query embedding (structured flights, lexical
+    mode) and queue the rest per store"""
+    plan = _BatchPlan([None] * len(requests))
+    for i, r in enumerate(requests):
+        if r.store == "flights":
+            rows = _structured_flights(r.city, r.k, {"max_price": r.max_price})
+            if rows is not None:
+                plan.results[i] = rows
+                continue
+        store = stores[r.store]
+        ids = _candidate_ids(store, r.city, r.max_price, r.min_rating)
+        m = _mode(store, mode)
+        if m == "lexical":
+            plan.results[i] = [store.meta[j] for j in _lexical_ids(store, r.query, r.k, ids)]
+            continue
+        if ids is not None and not len(ids):
+            plan.results[i] = []
+            continue
+        depth = r.k if m == "vector" else max(r.k, settings.hybrid_depth)
+        plan.pending.setdefault(r.store, []).append(_Pending(i, r.query, ids, depth, m))
+    return plan
 
-    if city_flights:
-        # perform search within city-specific flights
-        return _vs_flight.search_subset(query, city_flights, k)
 
-    # fallback to global search
-    return _vs_flight.search(query, k)
+def _score_batch(
+    requests: Sequence[SearchRequest],
+    plan: _BatchPlan,
+    stores: Dict[str, VectorStore],
+    vecs: Dict[str, np.ndarray],
+) -> List[List[dict]]:
+    for name, items in plan.pending.items():
+        store = stores[name]
+        embs = np.stack([vecs[p.query] for p in items])
+        scored = store.search_batch_scored(
+            embs, [p.ids for p in items], [p.depth for p in items]
+        )
+        for p, hits in zip(items, scored):
+            k = requests[p.index].k
+            if p.mode == "vector":
+                plan.results[p.index] = [row for row, _ in hits[:k]]
+            else:
+                lexical = _lexical_ids(store, p.query, p.depth, p.ids)
+                plan.results[p.index] = _fuse(store.meta, hits, lexical, k)
+    return plan.results
 
 
-def search_experiences(query: str, k: int = 3, *, city: str = "") -> list[dict]:
-    """Search experiences matching query within the specified city"""
-    # get all experiences in the target city
-    city_experiences = _filter_by_city(_vs_exp.meta, city)
+def search_many(
+    requests: Sequence[SearchRequest], *, mode: SearchMode | None = None
+) -> List[List[dict]]:
+    """results of many searches, in request order. the distinct query texts
+    are embedded in one request and each store is scored in one pass"""
+    stores = {name: load_store(name) for name in dict.fromkeys(r.store for r in requests)}
+    plan = _plan_batch(requests, stores, mode)
+    vecs = embed_queries(plan.texts) if plan.pending else {}
+    return _score_batch(requests, plan, stores, vecs)
 
-    if city_experiences:
-        # perform search within city-specific experiences
-        return _vs_exp.search_subset(query, city_experiences, k)
 
-    # fallback to global search
-    return _vs_exp.search(query, k)
+async def asearch_many(
+    requests: Sequence[SearchRequest], *, mode: SearchMode | None = None
+) -> List[List[dict]]:
+    """non-blocking search_many"""
+    registry = get_store_registry()
+    stores = {
+        name: (await registry.aget(name)).store
+        for name in dict.fromkeys(r.store for r in requests)
+    }
+    plan = await asyncio.to_thread(_plan_batch, requests, stores, mode)
+    vecs = await aembed_queries(plan.texts) if plan.pending else {}
+    return await asyncio.to_thread(_score_batch, requests, plan, stores, vecs)
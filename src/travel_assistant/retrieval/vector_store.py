@@ -1,23 +1,23 @@
 from __future__ import annotations
 
+import asyncio
+import os
 import numpy as np
 
-import pickle
-from typing import List, Iterable, Dict
+from typing import List, Iterable, Dict, Sequence
 import faiss
 from pathlib import Path
 
-from openai import OpenAI
+from travel_assistant.core.clients import get_clients
 from travel_assistant.core.config import get_settings
-import math
+from travel_assistant.retrieval.ann import IndexSpec, build_index, index_kind, search_params
+from travel_assistant.retrieval.columnar import ColumnarMeta, meta_path, write_columns
+from travel_assistant.retrieval.embed_cache import get_embedding_cache
+from travel_assistant.retrieval.lexical import BM25Index
+from travel_assistant.retrieval.postings import PostingIndex
 
 settings = get_settings()
 
-client = OpenAI(
-    api_key=settings.openai_api_key.get_secret_value(),
-    project=settings.openai_project_id,
-)
-
 
 def embed_batch(texts: list[str], max_batch: int = 100) -> list[list[float]]:
     """
@@ -27,7 +27,47 @@ def embed_batch(texts: list[str], max_batch: int = 100) -> list[list[float]]:
     all_embeddings: list[list[float]] = []
     for i in range(0, len(texts), max_batch):
         chunk = texts[i : i + max_batch]
-        resp = client.embeddings.create(
+        resp = get_clients().openai.embeddings.create(
+            model=settings.embed_model,
+            input=chunk,
+        )
+        all_embeddings.extend([d.embedding for d in resp.data])
+    return all_embeddings
+
+
+def embed_query(text: str) -> np.ndarray:
+    """embed a single search query, going through the query embedding cache"""
+    cache = get_embedding_cache()
+    vec = cache.get(settings.embed_model, text)
+    if vec is None:
+        vec = cache.put(settings.embed_model, text, embed_batch([text])[0])
+    return vec
+
+
+def embed_queries(texts: Iterable[str]) -> Dict[str, np.ndarray]:
+    """embeddings of several queries: the distinct texts the cache doesn't
+    hold go out in one embed_batch call"""
+    cache = get_embedding_cache()
+    vecs: Dict[str, np.ndarray] = {}
+    missing: List[str] = []
+    for text in dict.fromkeys(texts):
+        vec = cache.get(settings.embed_model, text)
+        if vec is None:
+            missing.append(text)
+        else:
+            vecs[text] = vec
+    if missing:
+        for text, emb in zip(missing, embed_batch(missing)):
+            vecs[text] = cache.put(settings.embed_model, text, emb)
+    return vecs
+
+
+async def aembed_batch(texts: list[str], max_batch: int = 100) -> list[list[float]]:
+    """async twin of embed_batch that does not block the event loop"""
+    all_embeddings: list[list[float]] = []
+    for i in range(0, len(texts), max_batch):
+        chunk = texts[i : i + max_batch]
+        resp = await get_clients().async_openai.embeddings.create(
             model=settings.embed_model,
             input=chunk,
         )
@@ -35,74 +75,359 @@ def embed_batch(texts: list[str], max_batch: int = 100) -> list[list[float]]:
     return all_embeddings
 
 
+async def aembed_query(text: str) -> np.ndarray:
+    """async twin of embed_query, sharing the same cache"""
+    cache = get_embedding_cache()
+    vec = cache.get(settings.embed_model, text)
+    if vec is None:
+        emb = (await aembed_batch([text]))[0]
+        vec = cache.put(settings.embed_model, text, emb)
+    return vec
+
+
+async def aembed_queries(texts: Iterable[str]) -> Dict[str, np.ndarray]:
+    """async twin of embed_queries"""
+    cache = get_embedding_cache()
+    vecs: Dict[str, np.ndarray] = {}
+    missing: List[str] = []
+    for text in dict.fromkeys(texts):
+        vec = cache.get(settings.embed_model, text)
+        if vec is None:
+            missing.append(text)
+        else:
+            vecs[text] = vec
+    if missing:
+        for text, emb in zip(missing, await aembed_batch(missing)):
+            vecs[text] = cache.put(settings.embed_model, text, emb)
+    return vecs
+
+
+def _rank(scores: np.ndarray, k: int) -> np.ndarray:
+    """positions of the k highest scores, best first (stable on ties)"""
+    if k < len(scores):
+        part = np.argpartition(-scores, k - 1)[:k]
+    else:
+        part = np.arange(len(scores))
+    return part[np.argsort(-scores[part], kind="stable")]
+
+
 def flatten(record: Dict) -> str:
     "converts one row from the catalogue into a single string for the embedding"
 
-    return " ".join(str(v) for v in record.values() if v)
+    # internal keys such as __id are positions, not content
+    return " ".join(
+        str(v) for k, v in record.items() if v and not str(k).startswith("__")
+    )
+
+
+def _mmap_flags() -> int:
+    """read flags that map an index's vectors from the file instead of copying
+    them. faiss >= 1.11 does this for flat indexes with IO_FLAG_MMAP_IFC;
+    older releases only honour IO_FLAG_MMAP (inverted lists)"""
+    return getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+def _normalise(vecs: np.ndarray) -> np.ndarray:
+    """l2-normalise rows so a dot product is the cosine similarity"""
+    norms = np.linalg.norm(vecs, axis=-1, keepdims=True)
+    return vecs / np.maximum(norms, 1e-8)
 
 
 class VectorStore:
     def __init__(self) -> None:
-        self.index: faiss.IndexFlatL2 | None = None
+        self.index: faiss.Index | None = None
         self.meta: List[Dict] = []
+        self._vectors: np.ndarray | None = None
+        self.mmapped = False
+        # query-time ANN tuning, ignored by flat indexes (see retrieval/ann.py)
+        self.nprobe: int | None = None
+        self.ef_search: int | None = None
+        # city / country posting lists, the BM25 index and the numeric
+        # columns (retrieval/normalise.py), attached by the store registry
+        self.postings: PostingIndex | None = None
+        self.lexical: BM25Index | None = None
+        self.numeric: Dict[str, np.ndarray] = {}
 
     # build and load the index from the seed data
     def build(self, records: Iterable[Dict]) -> None:
-        # self.meta = []  #
-        # for idx, r in enumerate(records):
-        #     r = dict(r)  # copy so we can mutate safely
-        #     r["__id"] = idx  # ⭐ store index position for fast lookup
-        #     self.meta.append(r)
-        self.meta = list(records)
+        records = list(records)
+        embeddings = embed_batch([flatten(r) for r in records])
+        self.build_from_vectors(records, embeddings)
+
+    def build_from_vectors(
+        self, records: Iterable[Dict], vectors, spec: IndexSpec | None = None
+    ) -> None:
+        """build from rows and their already computed embeddings (same order).
+        vectors are l2-normalised into an inner-product index, so every search
+        path scores by cosine similarity. spec picks the index type (flat by
+        default) and trains it if needed"""
+        # copy rows: the catalogue loader shares its parsed lists
+        self.meta = [dict(r) for r in records]
         for i, r in enumerate(self.meta):
             r["__id"] = i
-        embeddings = embed_batch([flatten(r) for r in self.meta])
-        dim = len(embeddings[0])
-        self.index = faiss.IndexFlatL2(dim)
-        self.index.add(np.array(embeddings, dtype=np.float32))
+        vectors = np.ascontiguousarray(
+            _normalise(np.asarray(vectors, dtype=np.float32)), dtype=np.float32
+        )
+        self.index = build_index(vectors, spec or IndexSpec())
+        self.mmapped = False
+        self._vectors = None
 
     def save(self, path: Path) -> None:
         if not self.index:
             raise RuntimeError("index not built")
-        faiss.write_index(self.index, str(path))
-        with open(path.with_suffix(".pkl"), "wb") as f:
-            pickle.dump(self.meta, f)
+        # write then rename: workers may have the old file memory-mapped, and
+        # truncating it in place would crash them
+        tmp = path.with_name(path.name + ".tmp")
+        faiss.write_index(self.index, str(tmp))
+        os.replace(tmp, path)
+        write_columns(self.meta, meta_path(path))
+
+    def load(self, path: Path, mmap: bool = False) -> None:
+        """load an index and its rows. with mmap the vectors stay in the file's
+        page cache, shared by every process that maps it; such an index is
+        read-only"""
+        if mmap:
+            index = faiss.read_index(str(path), _mmap_flags())
+        else:
+            index = faiss.read_index(str(path))
+        if index.metric_type != faiss.METRIC_INNER_PRODUCT:
+            raise RuntimeError(
+                f"{path.name} is an L2 index from an older build; run "
+                "scripts/build_index.py to convert it (no embedding calls needed)"
+            )
+        self.index = index
+        self.mmapped = mmap
+        # rows stay on disk (memory-mapped) until a search returns them
+        self.meta = ColumnarMeta(meta_path(path))
+        if len(self.meta) != self.index.ntotal:
+            raise RuntimeError(
+                f"{path.name}: {self.index.ntotal} vectors but {len(self.meta)} rows"
+            )
+        self._vectors = None
 
-    def load(self, path: Path) -> None:
-        self.index = faiss.read_index(str(path))
-        with open(path.with_suffix(".pkl"), "rb") as f:
-            self.meta = pickle.load(f)
+    @property
+    def vectors(self) -> np.ndarray:
+        """read-only array of every stored (unit-length) vector.
+
+        for flat indexes this is a zero-copy view of the index's own storage,
+        so a memory-mapped index costs no private memory; other index types
+        are reconstructed once"""
+        if self._vectors is None:
+            if self.index is None:
+                raise RuntimeError("index not initialised")
+            n, d = self.index.ntotal, self.index.d
+            if isinstance(self.index, faiss.IndexFlat) and n:
+                vecs = faiss.rev_swig_ptr(self.index.get_xb(), n * d).reshape(n, d)
+            else:
+                vecs = self.index.reconstruct_n(0, n).reshape(n, d)
+            vecs.setflags(write=False)
+            self._vectors = vecs
+        return self._vectors
+
+    @property
+    def index_type(self) -> str:
+        return index_kind(self.index) if self.index is not None else "flat"
 
     def search(self, query: str, k: int = 3) -> List[Dict]:
+        return [row for row, _ in self.search_scored(query, k)]
+
+    def search_scored(
+        self, query: str, k: int = 3, *, min_score: float | None = None
+    ) -> List[tuple[Dict, float]]:
+        """(row, cosine similarity) pairs, best first; rows scoring below
+        min_score are dropped"""
         if self.index is None:
             raise RuntimeError("index not initialised")
-        emb = embed_batch([query])[0]
-        D, I = self.index.search(np.array([emb], dtype="float32"), k)
-        return [self.meta[i] for i in I[0]]
+        return self.search_vector_scored(embed_query(query), k, min_score=min_score)
+
+    def search_vector(self, emb: np.ndarray, k: int = 3, **kwargs) -> List[Dict]:
+        """search the whole index with an already embedded query"""
+        return [row for row, _ in self.search_vector_scored(emb, k, **kwargs)]
+
+    def search_vector_scored(
+        self,
+        emb: np.ndarray,
+        k: int = 3,
+        *,
+        nprobe: int | None = None,
+        ef_search: int | None = None,
+        min_score: float | None = None,
+    ) -> List[tuple[Dict, float]]:
+        """search_scored with an already embedded query.
+        nprobe / ef_search override the store's defaults for this query"""
+        if self.index is None:
+            raise RuntimeError("index not initialised")
+        params = search_params(
+            self.index, nprobe or self.nprobe, ef_search or self.ef_search
+        )
+        q = _normalise(np.asarray(emb, dtype=np.float32).reshape(1, -1))
+        D, I = self.index.search(q, k, params=params)
+        return [
+            (self.meta[i], float(score))
+            for i, score in zip(I[0], D[0])
+            if i >= 0 and (min_score is None or score >= min_score)
+        ]
+
+    def search_ids(self, query: str, ids: np.ndarray, k: int = 3) -> list[Dict]:
+        """similarity search restricted to the given row ids (positions in meta)"""
+        return [row for row, _ in self.search_ids_scored(query, ids, k)]
+
+    def search_ids_scored(
+        self,
+        query: str,
+        ids: np.ndarray,
+        k: int = 3,
+        *,
+        min_score: float | None = None,
+    ) -> list[tuple[Dict, float]]:
+        """search_ids returning (row, cosine similarity) pairs"""
+        if len(ids) == 0:
+            return []
+        if self.index is None:
+            raise RuntimeError("index not initialised")
+        return self.search_ids_vector_scored(
+            embed_query(query), ids, k, min_score=min_score
+        )
+
+    def search_ids_vector(
+        self, emb: np.ndarray, ids: np.ndarray, k: int = 3
+    ) -> list[Dict]:
+        """search_ids with an already embedded query"""
+        return [row for row, _ in self.search_ids_vector_scored(emb, ids, k)]
+
+    def search_ids_vector_scored(
+        self,
+        emb: np.ndarray,
+        ids: np.ndarray,
+        k: int = 3,
+        *,
+        min_score: float | None = None,
+    ) -> list[tuple[Dict, float]]:
+        if len(ids) == 0:
+            return []
+        top, scores = self.top_k(_normalise(emb), np.asarray(ids, dtype=np.int64), k)
+        return [
+            (self.meta[i], float(score))
+            for i, score in zip(top, scores)
+            if min_score is None or score >= min_score
+        ]
 
     def search_subset(self, query: str, rows: list[Dict], k: int = 3) -> list[Dict]:
         """Similarity search restricted to the supplied metadata rows."""
         if not rows:
             return []
+        ids = np.fromiter((r["__id"] for r in rows), dtype=np.int64, count=len(rows))
+        return self.search_ids(query, ids, k)
+
+    def top_k(
+        self, q: np.ndarray, ids: np.ndarray, k: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """rank the candidate ids by inner product with a normalised query
+        vector, i.e. the same cosine score the index itself returns.
+        returns (ids, scores) best first.
+
+        candidates are scored exactly: an ANN probe restricted to a city's rows
+        would miss those outside the probed cells. non-flat indexes only
+        reconstruct the candidates, never the whole index"""
+        scores = self._rows(ids) @ q
+        order = _rank(scores, k)
+        return ids[order], scores[order]
+
+    def _rows(self, ids: np.ndarray) -> np.ndarray:
+        """stored vectors of the given rows; non-flat indexes only
+        reconstruct those rows"""
+        if isinstance(self.index, faiss.IndexFlat):
+            return self.vectors[ids]
+        return self.index.reconstruct_batch(ids)
 
-        if self.index is None:  # Added null check
+    def search_batch_scored(
+        self,
+        embs: np.ndarray,
+        ids: Sequence[np.ndarray | None],
+        ks: Sequence[int],
+    ) -> List[List[tuple[Dict, float]]]:
+        """several searches in one pass: query embs[i] over the rows ids[i]
+        (None = the whole index), top ks[i] each.
+
+        whole-index queries go through one batched faiss search; restricted
+        ones are scored by one matrix multiply over the union of their
+        candidate rows, so a city shared by many queries is read once"""
+        if self.index is None:
             raise RuntimeError("index not initialised")
+        q = _normalise(np.asarray(embs, dtype=np.float32).reshape(len(ks), -1))
+        out: List[List[tuple[Dict, float]]] = [[] for _ in ks]
+
+        whole = [i for i, c in enumerate(ids) if c is None]
+        if whole:
+            params = search_params(self.index, self.nprobe, self.ef_search)
+            D, I = self.index.search(q[whole], max(ks[i] for i in whole), params=params)
+            for row, i in enumerate(whole):
+                out[i] = [
+                    (self.meta[j], float(s))
+                    for j, s in zip(I[row, : ks[i]], D[row, : ks[i]])
+                    if j >= 0
+                ]
+
+        subset = [i for i, c in enumerate(ids) if c is not None and len(c)]
+        if subset:
+            union = np.unique(np.concatenate([ids[i] for i in subset]))
+            scores = self._rows(union) @ q[subset].T  # (candidates, queries)
+            for col, i in enumerate(subset):
+                cand = np.asarray(ids[i], dtype=np.int64)
+                s = scores[np.searchsorted(union, cand), col]
+                order = _rank(s, ks[i])
+                out[i] = [(self.meta[j], float(v)) for j, v in zip(cand[order], s[order])]
+        return out
+
+
+class AsyncVectorStore:
+    """non-blocking view over a VectorStore.
+
+    the query embedding goes through the shared AsyncOpenAI client and the
+    faiss / numpy scoring runs in the default thread pool, so a search never
+    blocks the event loop.
+    """
 
-        # embeds query once
-        q_emb = embed_batch([query])[0]
+    def __init__(self, store: VectorStore) -> None:
+        self.store = store
 
-        # fetches vectors for the subset rows
-        ids = [self.meta.index(r) for r in rows]
-        vecs = self.index.reconstruct_n(0, self.index.ntotal)
-        sub = [vecs[i] for i in ids]
+    @property
+    def postings(self) -> PostingIndex | None:
+        return self.store.postings
 
-        # computes cosine distance ( because faiss index is L2; cosine is fine for demo)
-        q = np.array([q_emb], dtype="float32")
-        dot = np.dot(vecs, q_emb)
-        nq = np.linalg.norm(q_emb)
-        nv = np.linalg.norm(vecs, axis=1)
-        cosine = 1 - dot / (nv * nq + 1e-8)
+    @property
+    def lexical(self) -> BM25Index | None:
+        return self.store.lexical
 
-        # ranks & returns top-k rows
-        ranked = sorted(zip(rows, cosine), key=lambda t: t[1])
-        return [r for r, _ in ranked[:k]]
+    @property
+    def numeric(self) -> Dict[str, np.ndarray]:
+        return self.store.numeric
+
+    async def search(self, query: str, k: int = 3) -> List[Dict]:
+        return [row for row, _ in await self.search_scored(query, k)]
+
+    async def search_scored(
+        self, query: str, k: int = 3, *, min_score: float | None = None
+    ) -> List[tuple[Dict, float]]:
+        emb = await aembed_query(query)
+        return await asyncio.to_thread(
+            self.store.search_vector_scored, emb, k, min_score=min_score
+        )
+
+    async def search_ids(self, query: str, ids: np.ndarray, k: int = 3) -> list[Dict]:
+        return [row for row, _ in await self.search_ids_scored(query, ids, k)]
+
+    async def search_ids_scored(
+        self,
+        query: str,
+        ids: np.ndarray,
+        k: int = 3,
+        *,
+        min_score: float | None = None,
+    ) -> list[tuple[Dict, float]]:
+        if len(ids) == 0:
+            return []
+        emb = await aembed_query(query)
+        return await asyncio.to_thread(
+            self.store.search_ids_vector_scored, emb, ids, k, min_score=min_score
+        )
@@ -0,0 +1,99 @@
+"""batch advice runner.
+
+takes JSONL input (one {"query": ..., "id": ...} object or bare JSON string per
+line), answers each distinct query once with bounded concurrency and yields
+NDJSON-ready result dicts in completion order. duplicates of a query share
+its answer; bad lines and failed queries become per-item errors.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Iterable
+
+import orjson
+from fastapi import HTTPException
+
+from travel_assistant.models.schemas import TravelAdvice
+from travel_assistant.retrieval.embed_cache import normalise_text
+
+logger = logging.getLogger(__name__)
+
+
+def parse_jsonl(lines: Iterable[bytes]) -> Iterable[tuple[object, str | None, str | None]]:
+    """(item id, query, error) per non-blank line; the id defaults to the line number"""
+    for line_no, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            item = orjson.loads(line)
+        except orjson.JSONDecodeError:
+            yield line_no, None, "invalid JSON"
+            continue
+        if isinstance(item, str):
+            item = {"query": item}
+        if not isinstance(item, dict):
+            yield line_no, None, "expected an object with a 'query' field"
+            continue
+        query = item.get("query")
+        if not isinstance(query, str) or not query.strip():
+            yield item.get("id", line_no), None, "missing 'query'"
+            continue
+        yield item.get("id", line_no), query, None
+
+
+async def run_batch(
+    items: Iterable[tuple[object, str | None, str | None]],
+    answer: Callable[[str], Awaitable[TravelAdvice]],
+    concurrency: int,
+) -> AsyncIterator[dict]:
+    """answer every item, at most `concurrency` queries in flight at once"""
+    semaphore = asyncio.Semaphore(concurrency)
+    results: asyncio.Queue = asyncio.Queue()
+    # normalised query -> {"ids": waiting item ids, "result": shared outcome}
+    groups: dict[str, dict] = {}
+
+    async def work(key: str, query: str) -> None:
+        async with semaphore:
+            try:
+                advice = await answer(query)
+                outcome = {"advice": advice.model_dump()}
+            except HTTPException as e:
+                outcome = {"error": e.detail, "status": e.status_code}
+            except Exception as e:
+                logger.exception(f"Batch item failed: {query}")
+                outcome = {"error": "processing failed", "status": 500}
+        group = groups[key]
+        group["result"] = outcome
+        for item_id in group["ids"]:
+            results.put_nowait({"id": item_id, "query": query, **outcome})
+
+    tasks = []
+    for item_id, query, error in items:
+        if error is not None:
+            results.put_nowait({"id": item_id, "error": error, "status": 400})
+            continue
+        key = normalise_text(query)
+        group = groups.get(key)
+        if group is None:
+            groups[key] = {"ids": [item_id], "result": None}
+            tasks.append(asyncio.create_task(work(key, query)))
+        elif group["result"] is None:
+            group["ids"].append(item_id)
+        else:
+            results.put_nowait({"id": item_id, "query": query, **group["result"]})
+
+    async def close_when_done() -> None:
+        await asyncio.gather(*tasks, return_exceptions=True)
+        results.put_nowait(None)
+
+    closer = asyncio.create_task(close_when_done())
+    try:
+        while (result := await results.get()) is not None:
+            yield result
+    finally:
+        # client went away: stop outstanding work
+        for task in tasks:
+            task.cancel()
+        closer.cancel()
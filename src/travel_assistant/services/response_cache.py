@@ -0,0 +1,213 @@
+"""response cache in front of generate_advice.
+
+two tiers, both scoped to the resolved destination city:
+- exact: normalised query text -> advice (a dict hit, well under 5 ms)
+- semantic: query embedding cosine >= threshold -> advice, so near-duplicates
+  such as "beach trip in July" / "beach holiday july" share one answer
+
+entries expire after a TTL, the cache is a size-bounded LRU, and everything is
+dropped when the chat model, embedding model or seed data changes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from functools import lru_cache
+
+import numpy as np
+
+from travel_assistant.core.config import Settings, get_settings
+from travel_assistant.llm.agent import resolve_destination
+from travel_assistant.models.schemas import TravelAdvice
+from travel_assistant.retrieval.catalogue_loader import catalogue_signature
+from travel_assistant.retrieval.embed_cache import normalise_text
+from travel_assistant.retrieval.vector_store import aembed_query
+
+logger = logging.getLogger(__name__)
+
+# generic apologies are not worth caching
+UNCACHEABLE_DESTINATIONS = {"various destinations"}
+
+
+@dataclass
+class _Entry:
+    expires: float
+    context: str
+    advice: TravelAdvice
+    vec: np.ndarray | None = None
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: float = 3600.0,
+        threshold: float = 0.92,
+        version: tuple = (),
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self.version = version
+        self._entries: OrderedDict[tuple[str, str], _Entry] = OrderedDict()
+        self._by_context: dict[str, set[tuple[str, str]]] = defaultdict(set)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _key(query: str, context: str | None) -> tuple[str, str]:
+        return (context or "").lower(), normalise_text(query)
+
+    def check_version(self, version: tuple) -> None:
+        """drop everything if the model or seed data changed since it was cached"""
+        if version != self.version:
+            self.clear()
+            self.version = version
+
+    def _drop(self, key: tuple[str, str]) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._by_context[entry.context].discard(key)
+
+    def get(self, query: str, context: str | None) -> TravelAdvice | None:
+        """exact tier"""
+        key = self._key(query, context)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.expires < time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.advice.model_copy(deep=True)
+
+    def get_similar(
+        self, vec: np.ndarray, context: str | None
+    ) -> TravelAdvice | None:
+        """semantic tier: best cached answer for the same city above the threshold"""
+        ctx = (context or "").lower()
+        now = time.monotonic()
+        with self._lock:
+            keys = [
+                k
+                for k in self._by_context.get(ctx, ())
+                if self._entries[k].vec is not None and self._entries[k].expires >= now
+            ]
+            if not keys:
+                return None
+            mat = np.stack([self._entries[k].vec for k in keys])
+            q = vec / max(float(np.linalg.norm(vec)), 1e-8)
+            scores = mat @ q
+            best = int(np.argmax(scores))
+            if scores[best] < self.threshold:
+                return None
+            self._entries.move_to_end(keys[best])
+            self.semantic_hits += 1
+            return self._entries[keys[best]].advice.model_copy(deep=True)
+
+    def put(
+        self,
+        query: str,
+        context: str | None,
+        advice: TravelAdvice,
+        vec: np.ndarray | None = None,
+    ) -> None:
+        if (advice.destination or "").lower() in UNCACHEABLE_DESTINATIONS:
+            return
+        key = self._key(query, context)
+        if vec is not None:
+            vec = vec / max(float(np.linalg.norm(vec)), 1e-8)
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = _Entry(
+                expires=time.monotonic() + self.ttl,
+                context=key[0],
+                advice=advice.model_copy(deep=True),
+                vec=vec,
+            )
+            self._by_context[key[0]].add(key)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_context.clear()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+        }
+
+
+def cache_version(settings: Settings) -> tuple:
+    return (settings.openai_model, settings.embed_model, catalogue_signature())
+
+
+@lru_cache
+def get_response_cache() -> ResponseCache:
+    settings = get_settings()
+    return ResponseCache(
+        maxsize=settings.response_cache_size,
+        ttl=settings.response_cache_ttl,
+        threshold=settings.response_cache_threshold,
+        version=cache_version(settings),
+    )
+
+
+@dataclass
+class Lookup:
+    """state of one request's trip through the cache"""
+
+    city: str | None = None
+    advice: TravelAdvice | None = None
+    vec: np.ndarray | None = None
+    enabled: bool = False
+
+
+def lookup_exact(user_query: str, settings: Settings) -> Lookup:
+    """exact tier; cheap enough to run before anything else in the request"""
+    if not settings.response_cache_enabled:
+        return Lookup()
+    cache = get_response_cache()
+    cache.check_version(cache_version(settings))
+    city, _ = resolve_destination(user_query)
+    return Lookup(city=city, advice=cache.get(user_query, city), enabled=True)
+
+
+async def lookup_similar(lookup: Lookup, user_query: str, settings: Settings) -> Lookup:
+    """semantic tier; embeds the query (through the embedding cache) and looks for
+    a close enough cached answer for the same city"""
+    if not lookup.enabled or lookup.advice is not None:
+        return lookup
+    try:
+        lookup.vec = await asyncio.wait_for(
+            aembed_query(user_query), settings.response_cache_embed_timeout
+        )
+    except Exception as e:
+        # the semantic tier is best-effort; the exact tier still works
+        logger.warning(f"Response cache embedding skipped: {e}")
+        return lookup
+    lookup.advice = get_response_cache().get_similar(lookup.vec, lookup.city)
+    return lookup
+
+
+def remember(lookup: Lookup, user_query: str, advice: TravelAdvice) -> None:
+    """store an answer; call only once the query has passed moderation"""
+    if not lookup.enabled:
+        return
+    cache = get_response_cache()
+    if lookup.advice is None:
+        cache.misses += 1
+    cache.put(user_query, lookup.city, advice, lookup.vec)
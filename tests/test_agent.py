@@ -1,20 +1,22 @@
-from unittest.mock import patch, AsyncMock
+from unittest.mock import patch, AsyncMock, MagicMock
+import asyncio
+from types import SimpleNamespace
 import pytest
 from travel_assistant.models.schemas import TravelAdvice
-from travel_assistant.llm.agent import generate_advice
+from travel_assistant.llm.agent import generate_advice, stream_advice
 from travel_assistant.core.config import Settings
 import json
 
 
 @pytest.mark.asyncio
-@patch("travel_assistant.llm.agent.AsyncOpenAI")
+@patch("travel_assistant.llm.agent.get_clients")
 @patch("travel_assistant.retrieval.get_all_cities")  # << Add this
-async def test_generate_advice(mock_get_all_cities, mock_openai):
+async def test_generate_advice(mock_get_all_cities, mock_get_clients):
     # mock valid cities list to include "Test City"
     mock_get_all_cities.return_value = ["Test City", "Los Angeles", "Tokyo"]  # << Add
 
     mock_client = AsyncMock()
-    mock_openai.return_value = mock_client
+    mock_get_clients.return_value.async_openai = mock_client
 
     settings = Settings(
         openai_api_key="sk_test_key",
@@ -54,3 +56,117 @@ async def test_generate_advice(mock_get_all_cities, mock_openai):
     assert (
         advice.destination == "Test City"
     ), f"Expected 'Test City', got '{advice.destination}'"
+
+
+def _tool_call(call_id, name, arguments):
+    call = MagicMock(id=call_id)
+    call.function.name = name
+    call.function._mock_name = None
+    call.function.arguments = json.dumps(arguments)
+    return call
+
+
+def _completion(*tool_calls):
+    return MagicMock(choices=[MagicMock(message=MagicMock(tool_calls=list(tool_calls)))])
+
+
+@pytest.mark.asyncio
+@patch("travel_assistant.llm.agent.get_clients")
+async def test_parallel_tool_calls_keep_order_and_degrade_on_timeout(mock_get_clients):
+    async def slow_hotels(**kwargs):
+        await asyncio.sleep(5)
+
+    async def experiences(**kwargs):
+        return [{"name": "Sunset Kayaking", "city": "Tampa"}]
+
+    mock_client = AsyncMock()
+    mock_get_clients.return_value.async_openai = mock_client
+    mock_client.chat.completions.create.side_effect = [
+        _completion(
+            _tool_call("call_1", "search_hotels", {"query": "hotel"}),
+            _tool_call("call_2", "search_experiences", {"query": "kayak"}),
+        ),
+        _completion(
+            _tool_call(
+                "call_3",
+                "return_advice",
+                {"destination": "Tampa", "reason": "r", "budget": "b", "tips": []},
+            )
+        ),
+    ]
+    settings = Settings(
+        openai_api_key="sk_test_key",
+        openai_project_id="test_project_id",
+        tool_timeout=0.05,
+    )
+
+    with patch(
+        "travel_assistant.llm.agent.parse", return_value=("Tampa", "kayaking")
+    ), patch(
+        "travel_assistant.retrieval.search.asearch_hotels", side_effect=slow_hotels
+    ), patch(
+        "travel_assistant.retrieval.search.asearch_experiences",
+        side_effect=experiences,
+    ):
+        advice = await generate_advice("kayaking in Tampa", settings)
+
+    assert advice.destination == "Tampa"
+    messages = mock_client.chat.completions.create.call_args.kwargs["messages"]
+    tool_msgs = [m for m in messages if isinstance(m, dict) and m["role"] == "tool"]
+    assert [m["tool_call_id"] for m in tool_msgs] == ["call_1", "call_2"]
+    # the timed-out hotel search fell back instead of failing the turn
+    assert json.loads(tool_msgs[0]["content"])[0]["name"] == "Luxury Hotel"
+    assert json.loads(tool_msgs[1]["content"])[0]["name"] == "Sunset Kayaking"
+
+
+def _chunk(index, name=None, arguments=None, call_id=None):
+    function = SimpleNamespace(name=name, arguments=arguments)
+    tool_call = SimpleNamespace(index=index, id=call_id, function=function)
+    delta = SimpleNamespace(content=None, tool_calls=[tool_call])
+    return SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
+
+
+async def _astream(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.asyncio
+@patch("travel_assistant.llm.agent.get_clients")
+async def test_stream_advice_events(mock_get_clients):
+    advice_json = json.dumps(
+        {"destination": "Tampa", "reason": "r", "budget": "b", "tips": ["t"]}
+    )
+    mock_client = AsyncMock()
+    mock_get_clients.return_value.async_openai = mock_client
+    mock_client.chat.completions.create.side_effect = [
+        _astream(
+            [
+                _chunk(0, "search_experiences", '{"query":', "call_1"),
+                _chunk(0, arguments=' "kayak"}'),
+            ]
+        ),
+        _astream(
+            [
+                _chunk(0, "return_advice", advice_json[:20], "call_2"),
+                _chunk(0, arguments=advice_json[20:]),
+            ]
+        ),
+    ]
+    settings = Settings(openai_api_key="sk_test_key", openai_project_id="test_project_id")
+
+    async def experiences(**kwargs):
+        assert kwargs["query"] == "kayak"
+        return [{"name": "Sunset Kayaking", "city": "Tampa"}]
+
+    with patch(
+        "travel_assistant.retrieval.search.asearch_experiences", side_effect=experiences
+    ):
+        events = [e async for e in stream_advice("kayaking in Tampa", settings)]
+
+    names = [name for name, _ in events]
+    assert names == ["destination", "tool_result", "advice_delta", "advice_delta", "advice"]
+    assert events[0][1]["city"] == "Tampa"
+    assert events[1][1]["results"][0]["name"] == "Sunset Kayaking"
+    assert "".join(d["delta"] for n, d in events if n == "advice_delta") == advice_json
+    assert events[-1][1]["destination"] == "Tampa"
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+from travel_assistant.retrieval.ann import (
+    IndexSpec,
+    build_index,
+    factory_string,
+    index_kind,
+    search_params,
+)
+from travel_assistant.retrieval.index_builder import build_incremental, vectors_path
+from travel_assistant.retrieval.vector_store import VectorStore, flatten
+
+D = 16
+
+
+@pytest.fixture(scope="module")
+def vectors():
+    x = np.random.default_rng(0).standard_normal((600, D)).astype(np.float32)
+    # the stores index unit vectors
+    return x / np.linalg.norm(x, axis=1, keepdims=True)
+
+
+def test_factory_strings_fit_the_row_count():
+    assert factory_string(IndexSpec("flat"), 1536, 10) == "Flat"
+    assert factory_string(IndexSpec("hnsw", hnsw_m=16), 1536, 10) == "HNSW16,Flat"
+    # ~4 sqrt(n) cells, but never more than the rows can train
+    assert factory_string(IndexSpec("ivf_flat"), 1536, 10_000) == "IVF256,Flat"
+    assert factory_string(IndexSpec("ivf_flat"), 1536, 100) == "IVF2,Flat"
+    assert factory_string(IndexSpec("ivf_pq", nlist=8), 1536, 190) == "IVF4,PQ64x7"
+    with pytest.raises(ValueError):
+        factory_string(IndexSpec("ivf_pq", pq_m=7), 1536, 1000)
+
+
+@pytest.mark.parametrize("kind", ["flat", "ivf_flat", "hnsw", "ivf_pq"])
+def test_every_type_builds_and_finds_rows(vectors, kind):
+    index = build_index(vectors, IndexSpec(kind, pq_m=4))
+    assert index_kind(index) == kind and index.ntotal == len(vectors)
+    params = search_params(index, nprobe=index_kind(index) != "flat" and 64, ef_search=128)
+    _, ids = index.search(vectors[:20], 1, params=params)
+    hits = np.mean(ids[:, 0] == np.arange(20))
+    assert hits >= (1.0 if kind != "ivf_pq" else 0.5)
+
+
+def test_search_params_match_the_index(vectors):
+    assert search_params(build_index(vectors, IndexSpec("flat")), 8, 8) is None
+    ivf = search_params(build_index(vectors, IndexSpec("ivf_flat")), nprobe=8)
+    assert ivf.nprobe == 8
+    hnsw = search_params(build_index(vectors, IndexSpec("hnsw")), ef_search=99)
+    assert hnsw.efSearch == 99
+
+
+@pytest.mark.parametrize("kind", ["ivf_flat", "hnsw"])
+def test_store_round_trip_and_filtered_search(tmp_path, vectors, kind):
+    rows = [{"city": "Miami" if i % 2 else "Denver", "n": i} for i in range(len(vectors))]
+    store = VectorStore()
+    store.build_from_vectors(rows, vectors, IndexSpec(kind))
+    store.save(tmp_path / "hotels.faiss")
+
+    loaded = VectorStore()
+    loaded.load(tmp_path / "hotels.faiss", mmap=True)
+    loaded.nprobe, loaded.ef_search = 64, 128
+    assert loaded.index_type == kind
+    assert loaded.search_vector(vectors[7], 1)[0]["n"] == 7
+    # subset search scores candidates exactly, whatever the index type
+    odd = np.arange(1, len(vectors), 2)
+    q = vectors[9] / np.linalg.norm(vectors[9])
+    top, scores = loaded.top_k(q, odd, 3)
+    assert top[0] == 9 and scores[0] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_switching_index_type_retrains_without_embedding(tmp_path, vectors):
+    rows = [{"name": f"row {i}"} for i in range(len(vectors))]
+    by_text = {flatten(r): v for r, v in zip(rows, vectors)}
+    calls = []
+
+    def embed(texts):
+        calls.append(texts)
+        return [by_text[t] for t in texts]
+
+    path = tmp_path / "hotels.faiss"
+    kw = dict(embed=embed, model="m")
+    build_incremental("hotels", rows, path, spec=IndexSpec("flat"), **kw)
+    assert len(calls) == 1 and not vectors_path(path).exists()
+
+    report = build_incremental("hotels", rows, path, spec=IndexSpec("ivf_pq", pq_m=4), **kw)
+    assert report.written and report.index.startswith("IVF") and len(calls) == 1
+    assert vectors_path(path).exists()
+
+    # PQ codes are lossy: new rows reuse the exact sidecar vectors
+    report = build_incremental("hotels", rows + [{"name": "new"}], path,
+                               spec=IndexSpec("ivf_pq", pq_m=4),
+                               embed=lambda t: [vectors[0]], model="m")
+    assert report.embedded == 1 and report.reused == len(rows)
+    # (up to the float rounding of re-normalising the flat index's unit vectors)
+    np.testing.assert_allclose(np.load(vectors_path(path))[: len(rows)], vectors, atol=1e-6)
+
+    report = build_incremental("hotels", rows + [{"name": "new"}], path,
+                               spec=IndexSpec("ivf_pq", pq_m=4), **kw)
+    assert not report.written
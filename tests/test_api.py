@@ -1,4 +1,6 @@
 # tests/test_api.py
+from unittest.mock import AsyncMock, patch
+
 import pytest
 from fastapi.testclient import TestClient
 from travel_assistant.main import app
@@ -109,3 +111,23 @@ def test_unknown_destination(client):
 # assert data["reason"] == "Test reason"
 # assert data["budget"] == "Low"
 # assert "tips" in data and isinstance(data["tips"], list)
+
+
+def test_stream_endpoint_emits_sse(client):
+    async def fake_stream(query, settings):
+        yield "destination", {"city": "Miami", "theme": "beach"}
+        yield "advice", {"destination": "Miami", "reason": "", "budget": "", "tips": []}
+
+    with patch(
+        "travel_assistant.api.routes.stream_advice", side_effect=fake_stream
+    ), patch(
+        "travel_assistant.api.routes.amoderate_content",
+        new_callable=AsyncMock,
+        return_value=False,
+    ):
+        resp = client.post("/travel-assistant/stream", json={"query": "Miami beach"})
+
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/event-stream")
+    assert resp.text.startswith('event: destination\ndata: {"city":"Miami"')
+    assert "event: advice\n" in resp.text
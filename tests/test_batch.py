@@ -0,0 +1,76 @@
+import asyncio
+import json
+from unittest.mock import AsyncMock, patch
+
+from travel_assistant.api.routes import moderated_advice
+from travel_assistant.core.config import get_settings
+from travel_assistant.models.schemas import TravelAdvice
+from travel_assistant.services.batch import run_batch
+
+
+@patch("travel_assistant.api.routes.amoderate_content", new_callable=AsyncMock)
+@patch("travel_assistant.api.routes.lookup_similar", new_callable=AsyncMock)
+@patch("travel_assistant.api.routes.generate_advice", new_callable=AsyncMock)
+def test_batch_dedupes_and_reports_item_errors(
+    mock_generate, mock_similar, mock_moderate, client
+):
+    mock_moderate.return_value = False
+    mock_generate.side_effect = lambda query, settings: TravelAdvice(
+        destination="Orlando", reason=query, budget="Mid", tips=[]
+    )
+
+    body = "\n".join(
+        [
+            json.dumps({"id": "a", "query": "theme parks with the kids"}),
+            json.dumps({"id": "b", "query": "Theme parks  with the kids"}),
+            "not json",
+            json.dumps("golf weekend in Orlando"),
+        ]
+    )
+    resp = client.post("/travel-assistant/batch?concurrency=2", content=body)
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+
+    results = {r["id"]: r for r in map(json.loads, resp.text.splitlines())}
+    assert set(results) == {"a", "b", 3, 4}
+    assert results["a"]["advice"] == results["b"]["advice"]
+    assert results[3]["status"] == 400 and "error" in results[3]
+    assert results[4]["advice"]["destination"] == "Orlando"
+    # duplicate queries were only answered once
+    assert mock_generate.await_count == 2
+
+
+@patch("travel_assistant.api.routes.amoderate_content")
+@patch("travel_assistant.api.routes.lookup_similar", new_callable=AsyncMock)
+@patch("travel_assistant.api.routes.generate_advice")
+def test_closed_batch_cancels_advice_still_waiting_on_moderation(
+    mock_generate, mock_similar, mock_moderate
+):
+    started, cancelled = asyncio.Event(), asyncio.Event()
+
+    async def slow_moderation(query, settings):
+        await asyncio.sleep(60)
+        return False
+
+    async def generate(query, settings):
+        started.set()
+        try:
+            await asyncio.sleep(60)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    mock_moderate.side_effect = slow_moderation
+    mock_generate.side_effect = generate
+    settings = get_settings()
+
+    async def scenario():
+        items = [("bad", None, "not json"), ("a", "rainy day ideas in Boston", None)]
+        stream = run_batch(items, lambda q: moderated_advice(q, settings), 2)
+        assert (await stream.__anext__())["id"] == "bad"
+        await asyncio.wait_for(started.wait(), 1)
+        # the client disconnects while the item is still being moderated
+        await stream.aclose()
+        await asyncio.wait_for(cancelled.wait(), 1)
+
+    asyncio.run(scenario())
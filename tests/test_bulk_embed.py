@@ -0,0 +1,184 @@
+import asyncio
+import json
+
+import httpx
+import numpy as np
+import openai
+import pytest
+from openai import AsyncOpenAI
+from travel_assistant.core.config import get_settings
+from travel_assistant.retrieval.bulk_embed import (
+    AdaptiveLimit,
+    EmbeddingCheckpoint,
+    abulk_embed,
+    count_tokens,
+    plan_batches,
+    truncate_tokens,
+)
+
+
+def vector(text):
+    return [float(len(text)), float(sum(map(ord, text)) % 101), 1.0]
+
+
+class StubEmbeddings:
+    """in-process stand-in for /v1/embeddings (same contract as
+    scripts/stub_embed_server.py): optional 429s and failures, and a record of
+    each batch and of the peak number of requests in flight"""
+
+    def __init__(self, rate_limit=(), fail_after=None, latency=0.01):
+        self.rate_limit = set(rate_limit)  # request numbers answered with 429
+        self.fail_after = fail_after  # requests after this many return 400
+        self.latency = latency
+        self.requests = 0
+        self.batches = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        self.requests += 1
+        n = self.requests
+        if n in self.rate_limit:
+            return httpx.Response(
+                429,
+                json={"error": {"message": "slow down", "type": "requests"}},
+                headers={"retry-after-ms": "20"},
+            )
+        if self.fail_after is not None and n > self.fail_after:
+            return httpx.Response(400, json={"error": {"message": "bad"}})
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(self.latency)
+        self.in_flight -= 1
+        self.batches.append(body["input"])
+        data = [
+            {"object": "embedding", "index": i, "embedding": vector(t)}
+            for i, t in reversed(list(enumerate(body["input"])))
+        ]
+        return httpx.Response(
+            200,
+            json={
+                "object": "list",
+                "data": data,
+                "model": body["model"],
+                "usage": {"prompt_tokens": 1, "total_tokens": 1},
+            },
+        )
+
+    def client(self):
+        return AsyncOpenAI(
+            api_key="sk-test",
+            base_url="http://stub/v1",
+            http_client=httpx.AsyncClient(transport=httpx.MockTransport(self)),
+        )
+
+
+TEXTS = [f"hotel number {i} with a sea view" for i in range(40)]
+
+
+def run(stub, texts=TEXTS, **kw):
+    kw.setdefault("concurrency", 4)
+    kw.setdefault("max_batch_tokens", count_tokens(texts[0]) * 5)
+    return asyncio.run(
+        abulk_embed(texts, client=stub.client(), model="m", progress=None, **kw)
+    )
+
+
+def test_plan_batches_respects_token_and_input_limits():
+    texts = ["a" * 30, "b" * 30, "c" * 300, "d" * 30, "e" * 30, "f" * 30]
+    budget = count_tokens("a" * 30) * 2
+    batches = plan_batches(texts, budget, max_inputs=10)
+    assert [i for b in batches for i in b] == list(range(6))
+    assert [2] in batches  # oversized text sits alone
+    for b in batches:
+        assert len(b) == 1 or sum(count_tokens(texts[i]) for i in b) <= budget
+    assert all(len(b) <= 1 for b in plan_batches(texts, 10_000, max_inputs=1))
+
+
+def test_default_budget_packs_whole_catalogues_per_request():
+    settings = get_settings()
+    # a per-request budget, well above the model's per-input limit
+    assert settings.embed_batch_tokens > 10 * settings.embed_input_tokens
+    texts = [f"flight VS{i} from LHR to JFK, seven hours fifty" for i in range(3000)]
+    batches = plan_batches(
+        texts, settings.embed_batch_tokens, settings.embed_batch_inputs
+    )
+    assert [len(b) for b in batches] == [2048, 952]  # the input cap, not tokens
+
+
+def test_oversized_inputs_are_truncated_not_sent_whole():
+    assert truncate_tokens("short", 10) == "short"
+    cut = truncate_tokens("é" * 500, 50)
+    assert count_tokens(cut) <= 50 and "é" * 10 in cut
+
+    stub = StubEmbeddings()
+    long_text = "word " * 2000
+    out = run(stub, texts=["a", long_text], max_input_tokens=100)
+    sent = [t for b in stub.batches for t in b]
+    assert sent[0] == "a" and count_tokens(sent[1]) <= 100
+    # results stay at the original positions, embedded from the cut text
+    assert out == [vector("a"), vector(sent[1])]
+
+
+def test_results_keep_input_order_with_concurrent_batches():
+    stub = StubEmbeddings()
+    out = run(stub)
+    assert out == [vector(t) for t in TEXTS]
+    assert len(stub.batches) == 8
+    assert stub.peak > 1
+
+
+def test_duplicate_texts_are_embedded_once():
+    stub = StubEmbeddings()
+    out = run(stub, texts=["same", "other", "same"])
+    assert out == [vector("same"), vector("other"), vector("same")]
+    assert sum(len(b) for b in stub.batches) == 2
+
+
+def test_rate_limits_are_retried():
+    stub = StubEmbeddings(rate_limit={1, 2, 5})
+    out = run(stub)
+    assert out == [vector(t) for t in TEXTS]
+
+
+def test_gives_up_after_max_attempts():
+    stub = StubEmbeddings(rate_limit=set(range(1, 100)))
+    with pytest.raises(openai.RateLimitError):
+        run(stub, max_attempts=2)
+
+
+def test_checkpoint_resumes_after_failure(tmp_path):
+    path = tmp_path / "ckpt.sqlite"
+    failing = StubEmbeddings(fail_after=3)
+    with pytest.raises(openai.BadRequestError):
+        run(failing, checkpoint=path, concurrency=1)
+    done = [t for b in failing.batches for t in b]
+    assert len(failing.batches) == 3
+
+    stub = StubEmbeddings()
+    out = run(stub, checkpoint=path)
+    assert out == [vector(t) for t in TEXTS]
+    again = [t for b in stub.batches for t in b]
+    assert not set(again) & set(done)
+    assert len(again) == len(TEXTS) - len(done)
+    assert not path.exists()  # removed once everything is embedded
+
+
+def test_checkpoint_round_trip(tmp_path):
+    ckpt = EmbeddingCheckpoint(tmp_path / "c.sqlite", "m")
+    ckpt.put_many(["a", "b"], [[1.0, 2.0], [3.0, 4.0]])
+    got = ckpt.get_many(["a", "b", "c"])
+    assert set(got) == {"a", "b"}
+    np.testing.assert_array_equal(got["b"], [3.0, 4.0])
+    assert EmbeddingCheckpoint(tmp_path / "c.sqlite", "other").get_many(["a"]) == {}
+
+
+def test_adaptive_limit_halves_and_recovers():
+    limit = AdaptiveLimit(8, recover=2)
+    limit.throttle(0)
+    limit.throttle(0)
+    assert limit.limit == 2
+    for _ in range(4):
+        limit.succeeded()
+    assert limit.limit == 4
@@ -0,0 +1,144 @@
+import datetime as dt
+from unittest.mock import MagicMock, patch
+
+import pytest
+from travel_assistant.core.config import Settings
+from travel_assistant.llm.agent import _build_messages
+from travel_assistant.retrieval.bundles import (
+    BUNDLES_FILE,
+    build_bundles,
+    bundle_prompt,
+    default_as_of,
+    get_bundle,
+    write_bundles,
+)
+from travel_assistant.retrieval.registry import StoreRegistry
+
+
+def hotel(name, tier, rating, price="[object Object]", city="Miami"):
+    return {
+        "hotel_name": name,
+        "city": city,
+        "pricing_tier": tier,
+        "rating": rating,
+        "room_pricing": price,
+    }
+
+
+def tour(title, tags, price, city="Miami"):
+    return {"title": title, "city": city, "tags": tags, "base_price": price}
+
+
+def flight(n, date, price="[object Object]", depart="LHR"):
+    return {
+        "flight_number": f"VS{n}",
+        "airport_depart": depart,
+        "airport_arrive": "MIA",
+        "city_arrive": "Miami",
+        "depart_date": date,
+        "flight_duration": "PT9H30M",
+        "cabin_type_price": price,
+    }
+
+
+CATALOGUES = {
+    "hotels": [
+        hotel("Palms", "standard", 4.0),
+        hotel("Grand", "member", 5.0, "£400"),
+        hotel("Grand", "standard", 5.0),
+        hotel("Breakers", "member", 5.0, "£250"),
+        hotel("Motel", "member", 3.0),
+        hotel("Loft", "standard", 4.5, city="Denver"),
+    ],
+    "experiences": [
+        tour("Reef Dive", "adventure,nature", 120),
+        tour("Kayak", "adventure", 40),
+        tour("Glades Walk", "nature", 30),
+        tour("Jazz Night", "music", 25),
+    ],
+    "flights": [
+        flight(1, "2025-06-30", "£300"),
+        flight(2, "2025-07-02", "£520"),
+        flight(3, "2025-07-04", "£480"),
+        flight(4, "2025-07-05"),
+        flight(5, "2025-07-03", "£100", depart="JFK"),
+    ],
+}
+AS_OF = dt.date(2025, 7, 1)
+
+
+def test_bundle_picks():
+    bundles = build_bundles(CATALOGUES, as_of=AS_OF, hotels_per_tier=2, tags=2)
+    assert set(bundles) == {"miami", "denver"}
+    miami = bundles["miami"]
+    # best rated per tier, cheaper first on a tie, each hotel once
+    assert [(h["name"], h["tier"]) for h in miami["hotels"]] == [
+        ("Breakers", "member"),
+        ("Grand", "member"),
+        ("Palms", "standard"),
+    ]
+    assert miami["hotels"][0]["price"] == 250
+    assert "price" not in miami["hotels"][2]  # unknown, not guessed
+    # upcoming LHR departures, cheapest first, unknown prices last
+    assert [f["flight_number"] for f in miami["flights"]] == ["VS3", "VS2", "VS4"]
+    assert miami["flights"][0]["duration_hours"] == 9.5
+    # most common tags first, cheapest experience for each, no repeats
+    assert [(e["tag"], e["title"]) for e in miami["experiences"]] == [
+        ("adventure", "Kayak"),
+        ("nature", "Glades Walk"),
+    ]
+    assert bundles["denver"]["flights"] == [] and bundles["denver"]["experiences"] == []
+
+
+def test_as_of_falls_back_to_the_schedule_start_once_it_has_ended(caplog):
+    flights = CATALOGUES["flights"]
+    assert default_as_of(flights, today=dt.date(2025, 7, 3)) == dt.date(2025, 7, 3)
+    assert default_as_of(flights, today=dt.date(2026, 10, 17)) == dt.date(2025, 6, 30)
+    assert "schedule ends on 2025-07-05" in caplog.text
+    assert default_as_of([], today=AS_OF) == AS_OF
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    bundles = build_bundles(CATALOGUES, as_of=AS_OF)
+    write_bundles(bundles, tmp_path / BUNDLES_FILE, as_of=AS_OF)
+    with patch(
+        "travel_assistant.retrieval.bundles.get_store_registry",
+        return_value=StoreRegistry(tmp_path),
+    ):
+        yield tmp_path
+
+
+def test_get_bundle_and_prompt(data_dir):
+    bundle = get_bundle(" MIAMI ")
+    assert bundle["as_of"] == "2025-07-01" and bundle["origin"] == "LHR"
+    assert get_bundle("Atlantis") is None and get_bundle(None) is None
+    prompt = bundle_prompt(bundle)
+    assert prompt.startswith("Catalogue picks for Miami (as of 2025-07-01):")
+    assert "Breakers (member, rated 5, £250)" in prompt
+    assert "VS3 LHR-MIA on 2025-07-04, 9.5h, £480" in prompt
+    assert "Jazz Night (music, £25)" in prompt
+
+
+def settings(**kw):
+    return Settings(
+        openai_api_key="sk_test_key", openai_project_id="test_project_id", **kw
+    )
+
+
+def test_system_prompt_carries_the_bundle(data_dir):
+    system = _build_messages("beach trip", "Miami", settings())[0]["content"]
+    assert "Catalogue picks for Miami" in system
+    unknown = _build_messages("q", "Atlantis", settings())[0]["content"]
+    assert "Catalogue picks" not in unknown
+    off = _build_messages("q", "Miami", settings(advice_bundles=False))[0]["content"]
+    assert "Catalogue picks" not in off
+
+
+def test_missing_bundles_leave_the_prompt_alone(tmp_path):
+    registry = MagicMock(data_dir=tmp_path)
+    with patch(
+        "travel_assistant.retrieval.bundles.get_store_registry", return_value=registry
+    ):
+        system = _build_messages("q", "Miami", settings())[0]["content"]
+    assert system.endswith("(Destination context: Miami)")
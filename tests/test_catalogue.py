@@ -0,0 +1,30 @@
+import json
+import os
+
+from travel_assistant.retrieval import catalogue_loader
+
+
+def _write(path, rows):
+    path.write_text(json.dumps(rows), encoding="utf-8")
+
+
+def test_catalogue_parsed_once_and_reloaded_on_change(tmp_path, monkeypatch):
+    monkeypatch.setattr(catalogue_loader, "SEED_DIR", tmp_path)
+    monkeypatch.setattr(catalogue_loader, "_cache", {})
+    _write(tmp_path / "hotel_catalogue.json", [{"city": "Miami", "country": "USA"}])
+    _write(tmp_path / "flight_catalogue.json", [{"city_arrive": "Boston"}])
+    _write(tmp_path / "experiences_catalogue.json", [{"city": "Tampa"}])
+
+    first = catalogue_loader.load_json("hotel")
+    assert catalogue_loader.load_json("hotel") is first
+    assert catalogue_loader.load_cities() == {"miami", "tampa"}
+    assert catalogue_loader.load_countries() == {"usa"}
+
+    path = tmp_path / "hotel_catalogue.json"
+    _write(path, [{"city": "Miami"}, {"city": "Orlando"}])
+    # force a visible mtime change even on coarse-grained filesystems
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    assert len(catalogue_loader.load_json("hotel")) == 2
+    assert "orlando" in catalogue_loader.load_cities()
@@ -0,0 +1,92 @@
+import faiss
+import numpy as np
+import pytest
+from travel_assistant.retrieval.columnar import ColumnarMeta, meta_path, write_columns
+from travel_assistant.retrieval.postings import PostingIndex
+from travel_assistant.retrieval.vector_store import VectorStore
+
+ROWS = [
+    {"name": "Beach Resort", "city": "Miami", "rating": 4.5, "rooms": 120, "pool": True,
+     "amenities": "spa, pool", "tags": ["beach"], "__id": 0},
+    {"name": "Cabin", "city": "Denver", "rating": 3.0, "rooms": 8, "pool": False,
+     "amenities": None, "tags": {"kind": "mountain"}, "__id": 1},
+    {"name": "Ünïcødé Hotel", "city": "New York", "rating": None, "rooms": 300,
+     "pool": True, "amenities": "", "tags": None, "__id": 2},
+]
+
+
+@pytest.fixture
+def meta(tmp_path):
+    write_columns(ROWS, tmp_path / "rows.meta")
+    return ColumnarMeta(tmp_path / "rows.meta")
+
+
+def test_rows_round_trip(meta):
+    assert len(meta) == 3
+    assert meta.columns == ["name", "city", "rating", "rooms", "pool", "amenities", "tags"]
+    assert list(meta) == ROWS
+    assert meta[-1] == ROWS[2]
+    assert meta[1:] == ROWS[1:]
+    with pytest.raises(IndexError):
+        meta[3]
+
+
+def test_values_keep_their_types(meta):
+    row = meta[0]
+    assert type(row["rooms"]) is int and type(row["rating"]) is float
+    assert row["pool"] is True
+    # the stored text round-trips exactly, so flatten() hashes are stable
+    assert str(row["rating"]) == "4.5"
+
+
+def test_rows_are_fresh_dicts(meta):
+    meta[0]["city"] = "changed"
+    assert meta[0]["city"] == "Miami"
+
+
+def test_columns_are_memory_mapped(meta):
+    rooms = meta.column("rooms")
+    assert isinstance(rooms, np.memmap) or isinstance(rooms.base, np.memmap)
+    assert rooms.tolist() == [120, 8, 300]
+    assert meta.column("rating") == [4.5, 3.0, None]
+    assert meta.column("city") == ["Miami", "Denver", "New York"]
+
+
+def test_partial_rows_for_postings(meta):
+    assert next(meta.rows(["city", "missing"])) == {"city": "Miami", "__id": 0}
+    postings = PostingIndex.from_meta(meta)
+    assert postings.city_ids("denver").tolist() == [1]
+
+
+def test_rewrite_replaces_previous_columns(tmp_path):
+    path = tmp_path / "rows.meta"
+    write_columns(ROWS, path)
+    write_columns([{"city": "Austin"}], path)
+    assert list(ColumnarMeta(path)) == [{"city": "Austin", "__id": 0}]
+    assert not (tmp_path / "rows.meta.tmp").exists()
+
+
+def test_vector_store_save_load(tmp_path):
+    store = VectorStore()
+    store.build_from_vectors(
+        [{k: v for k, v in r.items() if k != "__id"} for r in ROWS], np.eye(3)
+    )
+    path = tmp_path / "hotels.faiss"
+    store.save(path)
+    assert meta_path(path).is_dir()
+    assert not path.with_suffix(".pkl").exists()
+
+    loaded = VectorStore()
+    loaded.load(path)
+    assert isinstance(loaded.meta, ColumnarMeta)
+    assert loaded.search_vector(np.array([0.0, 1.0, 0.0]), k=1) == [ROWS[1]]
+
+
+def test_load_rejects_mismatched_rows(tmp_path):
+    path = tmp_path / "hotels.faiss"
+    index = faiss.IndexFlatIP(2)
+    index.add(np.eye(2, dtype=np.float32))
+    faiss.write_index(index, str(path))
+    write_columns(ROWS, meta_path(path))
+    with pytest.raises(RuntimeError):
+        VectorStore().load(path)
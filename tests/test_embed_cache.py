@@ -0,0 +1,46 @@
+from unittest.mock import patch
+
+import numpy as np
+
+from travel_assistant.retrieval.embed_cache import EmbeddingCache, get_embedding_cache
+from travel_assistant.retrieval.vector_store import embed_query
+
+
+def test_cache_normalises_text_and_counts():
+    cache = EmbeddingCache()
+    assert cache.get("m", "Beach  Trip") is None
+    cache.put("m", "Beach  Trip", [1.0, 2.0])
+
+    vec = cache.get("m", " beach trip ")
+    assert vec.tolist() == [1.0, 2.0]
+    # a different model never shares vectors
+    assert cache.get("other", "beach trip") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 2
+
+
+def test_lru_evicts_over_byte_budget():
+    cache = EmbeddingCache(max_bytes=2 * 4 * 4)  # two 4-dim float32 vectors
+    for text in ["a", "b", "c"]:
+        cache.put("m", text, np.ones(4))
+    assert cache.get("m", "a") is None
+    assert cache.get("m", "c") is not None
+    assert cache.stats()["bytes"] <= cache.max_bytes
+
+
+def test_disk_tier_survives_restart(tmp_path):
+    path = tmp_path / "embeddings.sqlite"
+    EmbeddingCache(path=path).put("m", "kayaking", [0.5, 0.25])
+
+    restarted = EmbeddingCache(path=path)
+    assert restarted.get("m", "kayaking").tolist() == [0.5, 0.25]
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_embed_query_calls_api_once_per_text():
+    get_embedding_cache().clear()
+    with patch("travel_assistant.retrieval.vector_store.embed_batch") as mock_embed:
+        mock_embed.return_value = [[1.0, 0.0]]
+        embed_query("food tour")
+        embed_query("Food  tour")
+        assert mock_embed.call_count == 1
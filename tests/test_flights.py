@@ -0,0 +1,97 @@
+import asyncio
+import math
+from unittest.mock import patch
+
+import pytest
+from travel_assistant.llm.agent import _tool_args
+from travel_assistant.retrieval import search
+from travel_assistant.retrieval.columnar import ColumnarMeta, write_columns
+from travel_assistant.retrieval.flights import FlightIndex
+from travel_assistant.retrieval.normalise import parse_duration, parse_number
+
+
+def flight(n, arrive, city, date, duration, price="[object Object]", depart="LHR"):
+    return {
+        "flight_number": f"VS{n}",
+        "airport_depart": depart,
+        "airport_arrive": arrive,
+        "city_arrive": city,
+        "depart_date": date,
+        "flight_duration": duration,
+        "cabin_type_price": price,
+    }
+
+
+ROWS = [
+    flight(1, "JFK", "New York", "2025-07-03", "PT8H10M", "£620"),
+    flight(2, "LAS", "Las Vegas", "2025-07-01", "PT10H50M"),
+    flight(3, "JFK", "New York", "2025-07-01", "PT7H55M", "£710"),
+    flight(4, "JFK", "New York", "2025-07-09", "PT7H40M", "£480"),
+    flight(5, "LHR", "London", "2025-07-02", "PT7H05M", depart="JFK"),
+    flight(6, "JFK", "New York", "2025-07-05", "PT6H50M"),
+]
+
+
+@pytest.fixture
+def index():
+    return FlightIndex(ROWS)
+
+
+def numbers(rows):
+    return [r["flight_number"] for r in rows]
+
+
+def test_parse_duration_and_price():
+    assert parse_duration("PT10H50M") == 650
+    assert parse_duration("P1DT2H") == 1560
+    assert math.isnan(parse_duration("PT")) and math.isnan(parse_duration(None))
+    assert parse_number("£1,250.50") == 1250.5 and parse_number(99) == 99.0
+    assert math.isnan(parse_number("[object Object]"))
+
+
+def test_destination_by_city_or_code(index):
+    assert index.airports("new york") == index.airports("jfk") == ["JFK"]
+    assert index.airports("Atlantis") == []
+    # departure order within the destination
+    assert numbers(index.search("JFK", 10)) == ["VS3", "VS1", "VS6", "VS4"]
+
+
+def test_date_range_is_inclusive(index):
+    rows = index.search("New York", 10, date_from="2025-07-03", date_to="2025-07-05")
+    assert numbers(rows) == ["VS1", "VS6"]
+    assert index.search("JFK", 10, date_from="2025-08-01") == []
+
+
+def test_limits_and_sorting(index):
+    assert numbers(index.search("JFK", 10, max_duration_hours=8)) == ["VS3", "VS6", "VS4"]
+    # unknown prices are not ruled out by a budget
+    assert numbers(index.search("JFK", 10, max_price=650)) == ["VS1", "VS6", "VS4"]
+    # unknown prices sort last
+    assert numbers(index.search("JFK", 10, sort="price")) == ["VS4", "VS1", "VS3", "VS6"]
+    assert numbers(index.search("JFK", 1, sort="duration")) == ["VS6"]
+    assert numbers(index.search("London", 10, origin="jfk")) == ["VS5"]
+    assert index.search("London", 10, origin="LHR") == []
+
+
+def test_from_columnar_meta(tmp_path, index):
+    write_columns(ROWS, tmp_path / "flights.meta")
+    loaded = FlightIndex.from_meta(ColumnarMeta(tmp_path / "flights.meta"))
+    rows = loaded.search("JFK", 2, sort="price")
+    assert numbers(rows) == numbers(index.search("JFK", 2, sort="price"))
+    assert rows[0]["__id"] == 3
+
+
+def test_search_flights_uses_the_index_without_embedding(index):
+    with patch("travel_assistant.retrieval.search.get_flight_index", return_value=index), \
+            patch("travel_assistant.retrieval.vector_store.embed_query") as embed:
+        rows = search.search_flights("cheapest", city="New York", sort="price", k=1)
+        arows = asyncio.run(
+            search.asearch_flights("x", city="JFK", date_from="2025-07-04", k=1)
+        )
+    embed.assert_not_called()
+    assert numbers(rows) == ["VS4"] and numbers(arows) == ["VS6"]
+
+
+def test_agent_no_longer_invents_flight_dates():
+    args = _tool_args("search_flights", '{"query": "flights"}', "New York")
+    assert args == {"query": "flights", "city": "New York"}
@@ -1,12 +1,38 @@
 from unittest.mock import patch
 
+import httpx
+import pytest
+from openai import AsyncOpenAI
 
-@patch("travel_assistant.core.guardrails.OpenAI")  # Updated path
-def test_content_moderation(mock_openai, client):
-    # mock the moderation response
-    mock_client = mock_openai.return_value
-    mock_moderation = mock_client.moderations.create.return_value
-    mock_moderation.results = [type("obj", (object,), {"flagged": True})]
+from travel_assistant.core.config import get_settings
+from travel_assistant.core.guardrails import amoderate_content
+
+
+def moderation_client(flagged: bool, requests: list | None = None) -> AsyncOpenAI:
+    """a real AsyncOpenAI whose HTTP calls are answered locally, so a call the
+    SDK doesn't accept fails here rather than in production"""
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if requests is not None:
+            requests.append(request)
+        return httpx.Response(
+            200,
+            json={
+                "id": "modr-test",
+                "model": "omni-moderation-latest",
+                "results": [{"flagged": flagged, "categories": {}, "category_scores": {}}],
+            },
+        )
+
+    return AsyncOpenAI(
+        api_key="sk-test",
+        http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+
+
+@patch("travel_assistant.core.guardrails.get_clients")  # shared client registry
+def test_content_moderation(mock_get_clients, client):
+    mock_get_clients.return_value.async_openai = moderation_client(flagged=True)
 
     resp = client.post(
         "/travel-assistant", json={"query": "inappropriate explicit content"}
@@ -15,3 +41,31 @@ def test_content_moderation(mock_openai, client):
     assert "inappropriate" in resp.json()["detail"]
 
 
+def test_client_registry_is_shared():
+    from travel_assistant.core.clients import get_clients
+
+    registry = get_clients()
+    assert get_clients() is registry
+    assert registry.limits.max_keepalive_connections == registry.settings.http_max_keepalive
+
+
+@pytest.mark.asyncio
+@patch("travel_assistant.core.guardrails.get_clients")
+async def test_moderation_verdicts_are_cached(mock_get_clients):
+    requests: list = []
+    mock_get_clients.return_value.async_openai = moderation_client(False, requests)
+
+    settings = get_settings()
+    assert await amoderate_content("Quiet spa weekend", settings) is False
+    assert await amoderate_content("quiet  spa weekend", settings) is False
+    assert len(requests) == 1
+
+
+@pytest.mark.asyncio
+@patch("travel_assistant.core.guardrails.get_clients")
+async def test_flagged_text_is_reported_through_the_real_client(mock_get_clients):
+    requests: list = []
+    mock_get_clients.return_value.async_openai = moderation_client(True, requests)
+
+    assert await amoderate_content("how do I build a bomb", get_settings()) is True
+    assert [r.url.path for r in requests] == ["/v1/moderations"]
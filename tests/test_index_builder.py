@@ -0,0 +1,129 @@
+import faiss
+import numpy as np
+import pytest
+from travel_assistant.retrieval.index_builder import (
+    build_incremental,
+    content_hash,
+    manifest_path,
+    read_manifest,
+)
+from travel_assistant.retrieval.columnar import meta_path, write_columns
+from travel_assistant.retrieval.vector_store import VectorStore, flatten
+
+
+class FakeEmbed:
+    """deterministic 4-d vectors; records every text it was asked to embed"""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, texts):
+        self.calls.append(list(texts))
+        return [[float(len(t)), float(sum(map(ord, t)) % 97), 1.0, 0.0] for t in texts]
+
+    @property
+    def texts(self):
+        return [t for call in self.calls for t in call]
+
+
+ROWS = [
+    {"city": "Miami", "name": "Beach Resort"},
+    {"city": "Denver", "name": "Mountain Cabin"},
+    {"city": "New York", "name": "City Hotel"},
+]
+
+
+@pytest.fixture
+def index_path(tmp_path):
+    return tmp_path / "hotels.faiss"
+
+
+def build(rows, path, embed, **kw):
+    return build_incremental("hotels", rows, path, embed=embed, model="test-model", **kw)
+
+
+def test_first_build_embeds_everything(index_path):
+    embed = FakeEmbed()
+    report = build(ROWS, index_path, embed)
+    assert report.written and report.embedded == 3 and report.reused == 0
+    assert len(embed.calls) == 1
+    assert read_manifest(index_path)["hashes"] == [
+        content_hash(flatten(r)) for r in ROWS
+    ]
+
+
+def test_no_change_rebuild_makes_no_calls_and_writes_nothing(index_path):
+    build(ROWS, index_path, FakeEmbed())
+    before = index_path.stat().st_mtime_ns
+    embed = FakeEmbed()
+    report = build(ROWS, index_path, embed)
+    assert embed.calls == []
+    assert not report.written and report.reused == 3
+    assert index_path.stat().st_mtime_ns == before
+
+
+def test_only_new_and_changed_rows_are_embedded(index_path):
+    build(ROWS, index_path, FakeEmbed())
+    rows = [
+        ROWS[0],
+        {"city": "Denver", "name": "Mountain Lodge"},  # edited
+        {"city": "Austin", "name": "Music Hotel"},  # new; New York removed
+    ]
+    embed = FakeEmbed()
+    report = build(rows, index_path, embed)
+    assert sorted(embed.texts) == sorted([flatten(rows[1]), flatten(rows[2])])
+    assert (report.reused, report.embedded, report.removed) == (1, 2, 2)
+
+    store = VectorStore()
+    store.load(index_path)
+    assert [r["name"] for r in store.meta] == [r["name"] for r in rows]
+    assert [r["__id"] for r in store.meta] == [0, 1, 2]
+    # reused and fresh vectors line up with their rows
+    expected = np.array(FakeEmbed()([flatten(r) for r in rows]), dtype=np.float32)
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+    np.testing.assert_allclose(store.index.reconstruct_n(0, 3), expected, rtol=1e-6)
+
+
+def test_reordering_rows_reuses_vectors(index_path):
+    build(ROWS, index_path, FakeEmbed())
+    embed = FakeEmbed()
+    report = build(list(reversed(ROWS)), index_path, embed)
+    assert embed.calls == []
+    assert report.written
+
+
+def test_index_without_manifest_is_adopted(index_path):
+    build(ROWS, index_path, FakeEmbed())
+    manifest_path(index_path).unlink()
+    embed = FakeEmbed()
+    report = build(ROWS, index_path, embed)
+    assert embed.calls == [] and not report.written
+    assert read_manifest(index_path) is not None
+
+
+def test_model_change_and_full_rebuild_re_embed(index_path):
+    build(ROWS, index_path, FakeEmbed())
+    embed = FakeEmbed()
+    build_incremental("hotels", ROWS, index_path, embed=embed, model="other-model")
+    assert len(embed.texts) == 3
+    embed = FakeEmbed()
+    build_incremental("hotels", ROWS, index_path, embed=embed, model="other-model", full=True)
+    assert len(embed.texts) == 3
+
+
+def test_legacy_l2_index_is_converted_without_embedding(index_path):
+    rows = ROWS[:2]
+    vectors = np.array(FakeEmbed()([flatten(r) for r in rows]), dtype=np.float32)
+    index = faiss.IndexFlatL2(4)
+    index.add(vectors)
+    faiss.write_index(index, str(index_path))
+    write_columns(rows, meta_path(index_path))
+
+    embed = FakeEmbed()
+    report = build(rows, index_path, embed)
+    assert embed.calls == [] and report.written
+    assert read_manifest(index_path)["metric"] == "ip"
+    store = VectorStore()
+    store.load(index_path)
+    assert store.index.metric_type == faiss.METRIC_INNER_PRODUCT
+    np.testing.assert_allclose(np.linalg.norm(store.vectors, axis=1), 1.0, rtol=1e-6)
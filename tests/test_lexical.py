@@ -0,0 +1,96 @@
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from travel_assistant.retrieval import search
+from travel_assistant.retrieval.index_builder import build_incremental
+from travel_assistant.retrieval.lexical import BM25Index, lexical_path, rrf, tokenize
+from travel_assistant.retrieval.postings import PostingIndex
+from travel_assistant.retrieval.vector_store import VectorStore
+
+TEXTS = [
+    "Sunset Kayaking in Tampa Bay kayaking tour",
+    "Rooftop Bar with skyline views New York",
+    "VS1545 Virgin Atlantic LHR London LAS Las Vegas",
+    "Harbour kayaking adventure Bridgetown",
+]
+
+
+@pytest.fixture
+def bm25():
+    return BM25Index.build(TEXTS)
+
+
+def test_tokenize_keeps_codes_whole():
+    assert tokenize("VS1545, Rooftop-Bar!") == ["vs1545", "rooftop", "bar"]
+
+
+def test_search_ranks_term_matches(bm25):
+    ids, scores = bm25.search("kayaking", 5)
+    # more occurrences in a text of similar length score higher
+    assert ids.tolist() == [0, 3] and scores[0] > scores[1] > 0
+    assert bm25.search("vs1545", 5)[0].tolist() == [2]
+    assert len(bm25.search("snorkelling", 5)[0]) == 0
+    # restricted to candidate rows
+    assert bm25.search("kayaking", 5, np.array([1, 3]))[0].tolist() == [3]
+
+
+def test_save_load_round_trip(tmp_path, bm25):
+    bm25.save(tmp_path / "x.bm25")
+    loaded = BM25Index.load(tmp_path / "x.bm25")
+    np.testing.assert_array_equal(loaded.scores("rooftop kayaking"), bm25.scores("rooftop kayaking"))
+
+
+def test_rrf_rewards_agreement():
+    fused = rrf([[1, 2, 3], [3, 1]], k=60)
+    assert [i for i, _ in fused] == [1, 3, 2]
+
+
+@pytest.fixture
+def store():
+    rows = [{"text": t, "city": "Tampa" if i == 0 else "Elsewhere"} for i, t in enumerate(TEXTS)]
+    store = VectorStore()
+    store.build_from_vectors(rows, np.eye(4))
+    store.postings = PostingIndex.from_rows(store.meta)
+    store.lexical = BM25Index.build(TEXTS)
+    return store
+
+
+def test_lexical_mode_makes_no_embedding_call(store):
+    with patch("travel_assistant.retrieval.vector_store.embed_query") as embed:
+        rows = search._search_in_city(store, "kayaking", 3, "", "lexical")
+    embed.assert_not_called()
+    assert [r["__id"] for r in rows] == [0, 3]
+
+
+def test_hybrid_fuses_both_rankings(store):
+    # the vector side prefers row 1, the keyword side rows 0 and 3
+    with patch(
+        "travel_assistant.retrieval.vector_store.embed_query",
+        return_value=np.array([0.1, 1.0, 0.0, 0.2], dtype=np.float32),
+    ):
+        vector = search._search_in_city(store, "kayaking", 2, "", "vector")
+        hybrid = search._search_in_city(store, "kayaking", 2, "", "hybrid")
+        in_city = search._search_in_city(store, "kayaking", 2, "Tampa", "hybrid")
+    assert [r["__id"] for r in vector] == [1, 3]
+    assert [r["__id"] for r in hybrid] == [0, 3]
+    assert [r["__id"] for r in in_city] == [0]
+
+
+def test_store_without_bm25_searches_by_vector(store):
+    store.lexical = None
+    with patch(
+        "travel_assistant.retrieval.vector_store.embed_query",
+        return_value=np.array([0.0, 0.0, 1.0, 0.0], dtype=np.float32),
+    ):
+        rows = search._search_in_city(store, "kayaking", 1, "", "lexical")
+    assert [r["__id"] for r in rows] == [2]
+
+
+def test_index_build_writes_bm25(tmp_path):
+    rows = [{"text": t} for t in TEXTS]
+    path = tmp_path / "experiences.faiss"
+    build_incremental(
+        "experiences", rows, path, embed=lambda texts: np.eye(4)[: len(texts)], model="m"
+    )
+    assert BM25Index.load(lexical_path(path)).search("vs1545", 1)[0].tolist() == [2]
@@ -0,0 +1,44 @@
+from travel_assistant.llm.agent import parse
+from travel_assistant.nlp.matcher import PlaceMatcher, get_place_matcher
+
+
+def test_leftmost_longest_match_is_independent_of_catalogue_order():
+    cities = {
+        "washington": ("Washington", "United States"),
+        "washington dc": ("Washington DC", "United States"),
+        "miami": ("Miami", "United States"),
+    }
+    for ordering in (cities, dict(reversed(list(cities.items())))):
+        matcher = PlaceMatcher(ordering, {}, {})
+        match = matcher.find("museums in Washington DC, then Miami")
+        assert match.city == "Washington DC"
+
+
+def test_airport_codes_and_countries():
+    matcher = get_place_matcher()
+    assert matcher.find_city("LHR to JFK next week").city == "New York"
+    # codes are case-sensitive so ordinary words are not read as airports
+    assert matcher.find_city("las vegas strip").kind == "city"
+    assert matcher.find_city("the mia farrow biography") is None
+
+    country = matcher.find("beach holiday in Jamaica")
+    assert country.kind == "country" and country.country == "Jamaica"
+
+
+def test_capitalised_words_do_not_beat_a_named_city():
+    matcher = get_place_matcher()
+    # "SEA" is Seattle's code, but the query names Miami
+    assert matcher.find_city("SEA views in Miami").city == "Miami"
+    assert parse("SEA VIEWS IN MIAMI")[0] == "Miami"
+    # in a route, or with no place named, the code still counts
+    assert matcher.find_city("FLIGHTS TO SEA FROM MIAMI").city == "Seattle"
+    assert matcher.find_city("LHR-JFK, then Miami").city == "New York"
+    assert matcher.find_city("JFK hotels").city == "New York"
+
+
+def test_agent_parse_returns_city_and_theme():
+    assert parse("Boutique hotel in San Francisco") == (
+        "San Francisco",
+        "boutique hotel in",
+    )
+    assert parse("foodie trip in Asia") == (None, "foodie trip in Asia")
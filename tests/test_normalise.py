@@ -0,0 +1,106 @@
+import asyncio
+import math
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from travel_assistant.retrieval import search
+from travel_assistant.retrieval.columnar import ColumnarMeta, write_columns
+from travel_assistant.retrieval.index_builder import build_incremental
+from travel_assistant.retrieval.normalise import (
+    numeric_columns,
+    numeric_from_meta,
+    numeric_mask,
+    numeric_path,
+    parse_hours,
+    read_numeric,
+)
+from travel_assistant.retrieval.postings import PostingIndex
+from travel_assistant.retrieval.registry import StoreRegistry
+from travel_assistant.retrieval.vector_store import VectorStore
+
+ROWS = [
+    {"name": "Grand", "city": "Miami", "rating": 4.8, "room_pricing": "£320 per night"},
+    {"name": "Budget", "city": "Miami", "rating": 3.1, "room_pricing": "£85"},
+    {"name": "Mystery", "city": "Miami", "rating": 4.2, "room_pricing": "[object Object]"},
+    {"name": "Loft", "city": "Denver", "rating": 4.6, "room_pricing": 150},
+]
+
+
+def test_numeric_columns_parse_each_catalogue_shape():
+    cols = numeric_columns(ROWS)
+    assert set(cols) == {"price", "rating"}
+    assert cols["price"].dtype == np.float32
+    np.testing.assert_array_equal(cols["price"], [320, 85, np.nan, 150])
+    flights = numeric_columns([{"flight_duration": "PT7H30M"}, {"duration_hours": 3}])
+    np.testing.assert_array_equal(flights["duration_hours"], [7.5, 3.0])
+    assert math.isnan(parse_hours("soon"))
+
+
+def test_mask_keeps_unknown_values():
+    cols = numeric_columns(ROWS)
+    assert numeric_mask(cols) is None
+    assert numeric_mask(cols, max_duration_hours=2) is None  # no such column
+    assert numeric_mask(cols, max_price=200).tolist() == [False, True, True, True]
+    mask = numeric_mask(cols, max_price=200, min_rating=4)
+    assert mask.tolist() == [False, False, True, True]
+
+
+def test_columnar_meta_reads_only_source_columns(tmp_path):
+    write_columns(ROWS, tmp_path / "hotels.meta")
+    meta = ColumnarMeta(tmp_path / "hotels.meta")
+    for name, col in numeric_columns(ROWS).items():
+        np.testing.assert_array_equal(numeric_from_meta(meta)[name], col)
+
+
+@pytest.fixture
+def store():
+    store = VectorStore()
+    store.build_from_vectors(ROWS, np.eye(4))
+    store.postings = PostingIndex.from_rows(store.meta)
+    store.numeric = numeric_columns(ROWS)
+    return store
+
+
+def names(rows):
+    return [r["name"] for r in rows]
+
+
+def test_limits_are_applied_before_ranking(store):
+    # the query is closest to Grand, which is over budget
+    with patch(
+        "travel_assistant.retrieval.vector_store.embed_query",
+        return_value=np.array([1.0, 0.1, 0.2, 0.3], dtype=np.float32),
+    ):
+        in_city = search._search_in_city(store, "q", 2, "Miami", "vector", max_price=200)
+        everywhere = search._search_in_city(store, "q", 5, "", "vector", min_rating=4.5)
+        none = search._search_in_city(store, "q", 2, "Denver", "vector", max_price=100)
+    assert names(in_city) == ["Mystery", "Budget"]
+    assert names(everywhere) == ["Grand", "Loft"]
+    assert none == []
+
+
+def test_build_writes_numeric_columns_and_registry_loads_them(tmp_path):
+    path = tmp_path / "hotels.faiss"
+    build_incremental("hotels", ROWS, path, embed=lambda t: np.eye(4)[: len(t)], model="m")
+    ratings = read_numeric(numeric_path(path))["rating"]
+    np.testing.assert_allclose(ratings, [4.8, 3.1, 4.2, 4.6], rtol=1e-6)
+
+    registry = StoreRegistry(tmp_path, names=("hotels",))
+    with patch("travel_assistant.retrieval.search.get_store_registry", return_value=registry), \
+            patch(
+                "travel_assistant.retrieval.vector_store.aembed_query",
+                return_value=np.array([1.0, 0, 0, 0], dtype=np.float32),
+            ):
+        rows = asyncio.run(
+            search.asearch_hotels("q", k=1, city="Miami", mode="vector", max_price=100)
+        )
+    assert names(rows) == ["Budget"]
+
+
+def test_registry_parses_rows_when_columns_are_missing(tmp_path):
+    path = tmp_path / "hotels.faiss"
+    build_incremental("hotels", ROWS, path, embed=lambda t: np.eye(4)[: len(t)], model="m")
+    numeric_path(path).unlink()
+    store = StoreRegistry(tmp_path, names=("hotels",)).get("hotels")
+    np.testing.assert_array_equal(store.numeric["price"], [320, 85, np.nan, 150])
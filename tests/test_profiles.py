@@ -0,0 +1,25 @@
+from unittest.mock import patch
+
+from travel_assistant.llm.agent import pick_city
+from travel_assistant.retrieval.profiles import get_profile_table
+
+
+def test_profiles_normalise_countries_and_continents():
+    table = get_profile_table()
+    tampa = table.get("tampa")
+    assert tampa.country == "United States"  # hotels file it under "Florida"
+    assert tampa.continent == "North America"
+    assert "TPA" in tampa.airports
+    assert {p.city for p in table.country("USA")} >= {"New York", "Miami"}
+    assert all(p.continent == "Asia" for p in table.continent("asian"))
+
+
+@patch("travel_assistant.retrieval.search.search_hotels")
+def test_pick_city_uses_profiles_without_search(mock_search):
+    table = get_profile_table()
+
+    city = pick_city("foodie trip in Asia")
+    assert table.get(city).continent == "Asia"
+    assert table.get(pick_city("safari in South Africa")).country == "South Africa"
+    assert pick_city("something nobody offers") in {p.city for p in table.by_city.values()}
+    mock_search.assert_not_called()
@@ -0,0 +1,78 @@
+import asyncio
+import subprocess
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from travel_assistant.api import deps
+from travel_assistant.main import app
+from travel_assistant.retrieval.registry import StoreRegistry, get_store_registry
+from travel_assistant.retrieval.vector_store import VectorStore
+
+ROWS = [{"city": "Miami", "name": "a"}, {"city": "Denver", "name": "b"}]
+
+
+@pytest.fixture
+def data_dir(tmp_path):
+    for name in ("hotels", "flights"):
+        store = VectorStore()
+        store.build_from_vectors(ROWS, np.eye(2))
+        store.save(tmp_path / f"{name}.faiss")
+    return tmp_path
+
+
+def test_stores_load_on_first_use_and_are_shared(data_dir):
+    registry = StoreRegistry(data_dir, names=("hotels", "flights"))
+    assert registry.status() == {"ready": False, "loaded": [], "errors": {}}
+    hotels = registry.get("hotels")
+    assert registry.get("hotels") is hotels
+    assert hotels.postings.city_ids("miami").tolist() == [0]
+    assert asyncio.run(registry.aget("hotels")).store is hotels
+    assert registry.status()["loaded"] == ["hotels"]
+    with pytest.raises(KeyError):
+        registry.get("cars")
+
+
+def test_background_warm_up_sets_ready(data_dir):
+    registry = StoreRegistry(data_dir, names=("hotels", "flights"))
+    thread = registry.start_warm_up()
+    assert registry.start_warm_up() is thread
+    thread.join(5)
+    assert registry.ready
+
+
+def test_load_errors_are_reported(data_dir):
+    registry = StoreRegistry(data_dir, names=("hotels", "experiences"))
+    registry.warm_up()
+    status = registry.status()
+    assert not status["ready"] and status["loaded"] == ["hotels"]
+    assert "experiences" in status["errors"]
+
+
+def test_ready_endpoint(data_dir):
+    registry = StoreRegistry(data_dir, names=("hotels", "flights"))
+    with patch("travel_assistant.main.get_store_registry", return_value=registry):
+        client = TestClient(app)
+        assert client.get("/ready").status_code == 503
+        registry.warm_up()
+        resp = client.get("/ready")
+    assert resp.status_code == 200
+    assert resp.json()["loaded"] == ["hotels", "flights"]
+
+
+def test_api_deps_share_the_registry_stores():
+    assert deps.hotels_store_dep() is get_store_registry().get("hotels")
+
+
+def test_importing_search_loads_nothing():
+    src = Path(__file__).resolve().parents[1] / "src"
+    code = (
+        "import sys; sys.path.insert(0, %r)\n"
+        "import travel_assistant.main\n"
+        "from travel_assistant.retrieval.registry import get_store_registry\n"
+        "assert get_store_registry().status()['loaded'] == []\n"
+    ) % str(src)
+    subprocess.run([sys.executable, "-c", code], check=True)
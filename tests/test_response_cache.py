@@ -0,0 +1,64 @@
+import time
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+
+from travel_assistant.models.schemas import TravelAdvice
+from travel_assistant.services.response_cache import ResponseCache, get_response_cache
+
+
+def _advice(destination="Bridgetown"):
+    return TravelAdvice(destination=destination, reason="sun", budget="Mid", tips=[])
+
+
+def test_exact_tier_normalises_and_scopes_by_city():
+    cache = ResponseCache()
+    cache.put("Beach trip in July", "Bridgetown", _advice())
+    assert cache.get("beach  trip in july", "bridgetown").destination == "Bridgetown"
+    assert cache.get("beach trip in july", "Miami") is None
+
+
+def test_semantic_tier_threshold():
+    cache = ResponseCache(threshold=0.9)
+    cache.put("beach trip in july", "Bridgetown", _advice(), np.array([1.0, 0.0]))
+    assert cache.get_similar(np.array([0.95, 0.1]), "Bridgetown") is not None
+    assert cache.get_similar(np.array([0.5, 0.5]), "Bridgetown") is None
+    assert cache.get_similar(np.array([1.0, 0.0]), "Miami") is None
+
+
+def test_ttl_lru_and_version_invalidation():
+    cache = ResponseCache(maxsize=2, ttl=0.01, version=("gpt-4o",))
+    cache.put("a", "x", _advice())
+    time.sleep(0.02)
+    assert cache.get("a", "x") is None
+
+    cache.ttl = 60
+    for q in ["a", "b", "c"]:
+        cache.put(q, "x", _advice())
+    assert cache.get("a", "x") is None and cache.get("c", "x") is not None
+
+    cache.check_version(("gpt-4.1",))
+    assert cache.get("c", "x") is None
+
+
+def test_generic_apologies_are_not_cached():
+    cache = ResponseCache()
+    cache.put("trip to mars", None, _advice("Various destinations"))
+    assert cache.get("trip to mars", None) is None
+
+
+@patch("travel_assistant.api.routes.amoderate_content", new_callable=AsyncMock)
+@patch("travel_assistant.api.routes.generate_advice", new_callable=AsyncMock)
+@patch(
+    "travel_assistant.services.response_cache.aembed_query", new_callable=AsyncMock
+)
+def test_repeat_query_served_from_cache(mock_embed, mock_generate, mock_moderate, client):
+    get_response_cache().clear()
+    mock_embed.return_value = np.array([0.0, 1.0])
+    mock_moderate.return_value = False
+    mock_generate.return_value = _advice("Montego Bay")
+
+    for _ in range(2):
+        resp = client.post("/travel-assistant", json={"query": "Montego Bay reggae"})
+        assert resp.json()["destination"] == "Montego Bay"
+    assert mock_generate.await_count == 1
@@ -0,0 +1,133 @@
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+from travel_assistant.retrieval import search
+from travel_assistant.retrieval.embed_cache import get_embedding_cache
+from travel_assistant.retrieval.index_builder import build_incremental
+from travel_assistant.retrieval.lexical import BM25Index
+from travel_assistant.retrieval.postings import PostingIndex
+from travel_assistant.retrieval.registry import StoreRegistry
+from travel_assistant.retrieval.search import SearchRequest, asearch_many, search_many
+from travel_assistant.retrieval.vector_store import VectorStore, flatten
+
+D = 8
+CITIES = ("Miami", "Denver", "Austin")
+
+
+def rows(kind, n=30):
+    return [
+        {"name": f"{kind} {i}", "city": CITIES[i % 3], "rating": 3 + (i % 5) / 2}
+        for i in range(n)
+    ]
+
+
+def fake_vectors(texts):
+    """deterministic per-text vectors"""
+    return [
+        np.random.default_rng(sum(map(ord, t))).standard_normal(D).tolist() for t in texts
+    ]
+
+
+def make_store(kind):
+    store = VectorStore()
+    data = rows(kind)
+    store.build_from_vectors(data, np.array(fake_vectors([flatten(r) for r in data])))
+    store.postings = PostingIndex.from_rows(store.meta)
+    store.lexical = BM25Index.build(flatten(r) for r in data)
+    return store
+
+
+@pytest.fixture
+def stores():
+    get_embedding_cache().clear()
+    stores = {"hotels": make_store("hotel"), "experiences": make_store("tour")}
+    with patch("travel_assistant.retrieval.search.load_store", side_effect=stores.get):
+        yield stores
+    get_embedding_cache().clear()
+
+
+REQUESTS = [
+    SearchRequest("hotels", "quiet spa", "Miami", 3),
+    SearchRequest("experiences", "quiet spa", "Miami", 2),
+    SearchRequest("hotels", "quiet spa", "Denver", 4),
+    SearchRequest("hotels", "rooftop", "", 5),
+    SearchRequest("experiences", "night tour", "Atlantis", 3),
+]
+
+
+def one_by_one(stores, requests, mode):
+    return [
+        search._search_in_city(stores[r.store], r.query, r.k, r.city, mode)
+        for r in requests
+    ]
+
+
+@pytest.mark.parametrize("mode", ["vector", "hybrid"])
+def test_batch_matches_per_call_results_with_one_embedding_call(stores, mode):
+    with patch(
+        "travel_assistant.retrieval.vector_store.embed_batch", side_effect=fake_vectors
+    ) as embed:
+        batched = search_many(REQUESTS, mode=mode)
+        assert embed.call_count == 1
+        # the three distinct texts, once each
+        assert sorted(embed.call_args.args[0]) == ["night tour", "quiet spa", "rooftop"]
+        expected = one_by_one(stores, REQUESTS, mode)
+    assert batched == expected
+    assert [len(r) for r in batched] == [3, 2, 4, 5, 3]
+
+
+def test_lexical_batches_embed_nothing(stores):
+    with patch("travel_assistant.retrieval.vector_store.embed_batch") as embed:
+        results = search_many([SearchRequest("hotels", "hotel 4", "Denver")], mode="lexical")
+    embed.assert_not_called()
+    assert results[0][0]["name"] == "hotel 4"
+
+
+def test_filters_apply_per_request(stores):
+    stores["hotels"].numeric = {"rating": np.array([r["rating"] for r in rows("hotel")])}
+    requests = [
+        SearchRequest("hotels", "q", "Miami", 10, min_rating=4.5),
+        SearchRequest("hotels", "q", "Miami", 10, min_rating=9),
+    ]
+    with patch(
+        "travel_assistant.retrieval.vector_store.embed_batch", side_effect=fake_vectors
+    ):
+        strict, impossible = search_many(requests, mode="vector")
+    assert strict and all(r["rating"] >= 4.5 and r["city"] == "Miami" for r in strict)
+    assert impossible == []
+
+
+def test_store_batch_scores_match_single_searches(stores):
+    store = stores["hotels"]
+    q = np.array(fake_vectors(["a", "b", "c"]), dtype=np.float32)
+    miami = store.postings.city_ids("miami")
+    batched = store.search_batch_scored(q, [None, miami, miami[:4]], [3, 2, 10])
+    singles = [
+        store.search_vector_scored(q[0], 3),
+        store.search_ids_vector_scored(q[1], miami, 2),
+        store.search_ids_vector_scored(q[2], miami[:4], 10),
+    ]
+    for got, want in zip(batched, singles):
+        assert [r for r, _ in got] == [r for r, _ in want]
+        np.testing.assert_allclose([s for _, s in got], [s for _, s in want], rtol=1e-5)
+
+
+def test_async_batch(tmp_path):
+    get_embedding_cache().clear()
+    for name in ("hotels", "experiences"):
+        data = rows(name)
+        build_incremental(name, data, tmp_path / f"{name}.faiss", embed=fake_vectors, model="m")
+    registry = StoreRegistry(tmp_path, names=("hotels", "experiences"))
+    requests = [SearchRequest("hotels", "q", "Austin", 2), SearchRequest("experiences", "q")]
+    with patch("travel_assistant.retrieval.search.get_store_registry", return_value=registry), \
+            patch(
+                "travel_assistant.retrieval.vector_store.aembed_batch",
+                new=AsyncMock(side_effect=fake_vectors),
+            ) as embed:
+        results = asyncio.run(asearch_many(requests, mode="vector"))
+    assert embed.await_count == 1
+    assert [r["city"] for r in results[0]] == ["Austin", "Austin"]
+    assert len(results[1]) == 3
+    get_embedding_cache().clear()
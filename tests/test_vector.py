@@ -1,12 +1,16 @@
 import faiss
 import numpy as np
-from unittest.mock import patch
+from unittest.mock import AsyncMock, patch
 import pytest
-from travel_assistant.retrieval.vector_store import VectorStore
+from travel_assistant.retrieval.embed_cache import get_embedding_cache
+from travel_assistant.retrieval.postings import PostingIndex
+from travel_assistant.retrieval.vector_store import AsyncVectorStore, VectorStore
 
 
 @pytest.fixture
 def vector_store():
+    # every test patches embed_batch, so start without cached query vectors
+    get_embedding_cache().clear()
     vs = VectorStore()
     vs.meta = [
         {"text": "beach resort", "city": "Miami", "__id": 0},
@@ -14,7 +18,7 @@ def vector_store():
         {"text": "city hotel", "city": "New York", "__id": 2},
     ]
     dim = 3  # Match the number of documents
-    vs.index = faiss.IndexFlatL2(dim)
+    vs.index = faiss.IndexFlatIP(dim)
     embeddings = np.array(
         [
             [1.0, 0.0, 0.0],  # beach
@@ -40,3 +44,110 @@ def test_search_subset(vector_store):
         subset = [r for r in vector_store.meta if r["city"] == "Miami"]
         results = vector_store.search_subset("beach", subset, k=1)
         assert results[0]["city"] == "Miami"
+
+
+def test_search_subset_scores_align_with_rows(vector_store):
+    with patch("travel_assistant.retrieval.vector_store.embed_batch") as mock_embed:
+        mock_embed.return_value = [[0.0, 0.0, 1.0]]
+        # subset order deliberately differs from index order
+        subset = [vector_store.meta[2], vector_store.meta[0]]
+        results = vector_store.search_subset("city", subset, k=2)
+        assert [r["city"] for r in results] == ["New York", "Miami"]
+
+
+def test_search_ids_k_larger_than_candidates(vector_store):
+    with patch("travel_assistant.retrieval.vector_store.embed_batch") as mock_embed:
+        mock_embed.return_value = [[0.1, 1.0, 0.0]]
+        results = vector_store.search_ids("mountain", np.array([0, 1]), k=5)
+        assert [r["__id"] for r in results] == [1, 0]
+
+
+def test_posting_index_city_and_country():
+    rows = [
+        {"city": "Miami", "country": "USA", "__id": 0},
+        {"city_arrive": "Miami", "country_arrive": "United States", "__id": 1},
+        {"city": "Toronto", "country": "Canada", "__id": 2},
+    ]
+    postings = PostingIndex.from_rows(rows)
+    assert postings.city_ids("miami ").tolist() == [0, 1]
+    assert postings.country_ids("CANADA").tolist() == [2]
+    assert postings.city_ids("Atlantis").size == 0
+    assert postings.city_ids("").size == 0
+
+
+@pytest.mark.asyncio
+async def test_async_vector_store_search_ids(vector_store):
+    with patch(
+        "travel_assistant.retrieval.vector_store.aembed_batch", new_callable=AsyncMock
+    ) as mock_embed:
+        mock_embed.return_value = [[0.0, 1.0, 0.0]]
+        avs = AsyncVectorStore(vector_store)
+        results = await avs.search_ids("mountain", np.array([0, 1, 2]), k=1)
+        assert results[0]["city"] == "Denver"
+        assert (await avs.search("mountain", k=1))[0]["city"] == "Denver"
+        # second search reused the cached query vector
+        assert mock_embed.await_count == 1
+
+
+def _saved_store(tmp_path, vectors):
+    store = VectorStore()
+    rows = [{"city": c} for c in ("Miami", "Denver", "New York")]
+    store.build_from_vectors(rows, vectors)
+    path = tmp_path / "hotels.faiss"
+    store.save(path)
+    return path
+
+
+def test_mmap_load_matches_private_load(tmp_path):
+    vecs = np.array([[1.0, 0.0, 0.0], [0.0, 2.0, 0.0], [0.0, 0.0, 3.0]])
+    path = _saved_store(tmp_path, vecs)
+    private, mapped = VectorStore(), VectorStore()
+    private.load(path)
+    mapped.load(path, mmap=True)
+    assert mapped.mmapped and not private.mmapped
+    # stored unit-length, so the norms don't sway the ranking
+    np.testing.assert_array_equal(mapped.vectors, np.eye(3))
+    assert not mapped.vectors.flags.writeable
+    q = np.array([0.0, 0.6, 0.8], dtype=np.float32)
+    ids = np.array([0, 1, 2])
+    top, scores = mapped.top_k(q, ids, 2)
+    assert top.tolist() == [2, 1]
+    np.testing.assert_allclose(scores, [0.8, 0.6], rtol=1e-6)
+    assert private.top_k(q, ids, 2)[0].tolist() == top.tolist()
+    assert mapped.search_vector(q, 1) == private.search_vector(q, 1)
+
+
+def test_rebuild_does_not_break_a_mapped_store(tmp_path):
+    path = _saved_store(tmp_path, np.eye(3))
+    mapped = VectorStore()
+    mapped.load(path, mmap=True)
+    # a rebuild replaces the file; the mapped copy keeps the old one
+    _saved_store(tmp_path, np.eye(3)[::-1])
+    np.testing.assert_array_equal(mapped.vectors, np.eye(3))
+    assert not path.with_name("hotels.faiss.tmp").exists()
+    fresh = VectorStore()
+    fresh.load(path, mmap=True)
+    np.testing.assert_array_equal(fresh.vectors, np.eye(3)[::-1])
+
+
+def test_index_and_subset_paths_return_the_same_cosine_scores(tmp_path):
+    vecs = np.array([[3.0, 0.0, 0.0], [1.0, 1.0, 0.0], [0.0, 0.0, 0.5]])
+    store = VectorStore()
+    store.load(_saved_store(tmp_path, vecs))
+    q = np.array([2.0, 1.0, 0.0])
+    full = store.search_vector_scored(q, 3)
+    subset = store.search_ids_vector_scored(q, np.arange(3), 3)
+    assert [r["__id"] for r, _ in full] == [r["__id"] for r, _ in subset] == [1, 0, 2]
+    cosine = [3 / np.sqrt(10), 2 / np.sqrt(5), 0.0]
+    np.testing.assert_allclose([s for _, s in full], cosine, atol=1e-6)
+    np.testing.assert_allclose([s for _, s in subset], cosine, atol=1e-6)
+    assert len(store.search_vector_scored(q, 3, min_score=0.5)) == 2
+
+
+def test_load_rejects_l2_indexes(tmp_path):
+    path = _saved_store(tmp_path, np.eye(3))
+    index = faiss.IndexFlatL2(3)
+    index.add(np.eye(3, dtype=np.float32))
+    faiss.write_index(index, str(path))
+    with pytest.raises(RuntimeError, match="build_index"):
+        VectorStore().load(path)